@@ -7,6 +7,8 @@ from litestar.config.cors import CORSConfig
 from litestar.openapi import OpenAPIConfig
 from litestar.static_files import create_static_files_router
 
+from .executor import EXECUTOR
+from .jobs import JOBS
 from .routes import api_router
 
 ASSETS_DIR = pathlib.Path("frontend/dist")
@@ -21,4 +23,6 @@ app = Litestar(
     compression_config=CompressionConfig(backend="gzip", gzip_compress_level=9),
     cors_config=CORSConfig(allow_origins=ALLOW_ORIGINS) if ALLOW_ORIGINS else None,
     openapi_config=OpenAPIConfig(title="mRNArchitect API", version="0.0.1"),
+    on_startup=[EXECUTOR.start, JOBS.start],
+    on_shutdown=[JOBS.stop, EXECUTOR.shutdown],
 )
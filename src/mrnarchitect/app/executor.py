@@ -0,0 +1,226 @@
+"""A bounded process pool that runs CPU-bound work off the event loop."""
+
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+import typing
+
+import msgspec
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the executor has no room to queue more work."""
+
+
+class ExecutorTimeoutError(Exception):
+    """Raised when work does not complete within its timeout."""
+
+
+class ExecutorStats(msgspec.Struct, kw_only=True):
+    in_process: bool
+    """Whether work is run in a thread of the server process, rather than in worker
+    processes."""
+    max_workers: int
+    max_pending: int
+    running: int
+    """The number of tasks being run by a worker."""
+    queued: int
+    """The number of tasks waiting for a worker."""
+    utilization: float
+    """The ratio of busy workers."""
+    completed: int
+    failed: int
+    rejected: int
+    timed_out: int
+
+
+def _initialize_worker():
+    """Warm up a worker process, so the first request it serves does not pay for
+    the imports and data loading.
+    """
+    import dnachisel  # noqa: F401
+    import RNA  # noqa: F401
+
+    from mrnarchitect.data import (
+        load_codon_usage_table,
+        load_manufacture_restriction_sites,
+        load_microrna_seed_sites,
+        load_trna_adaptation_index_log_weights,
+    )
+
+    load_codon_usage_table("homo-sapiens").log_weights
+    load_trna_adaptation_index_log_weights("homo-sapiens")
+    load_microrna_seed_sites()
+    load_manufacture_restriction_sites()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ProcessExecutor:
+    """Runs functions in a pool of worker processes, with a bounded number of tasks
+    waiting for a worker and a per-task timeout.
+
+    Work that times out while still waiting for a worker is cancelled. Work that has
+    already started can not be interrupted, so it still occupies its worker (and a
+    slot in the executor) until it completes.
+
+    With `max_workers` set to 0, or where worker processes can not be started (such
+    as on AWS Lambda, which has no shared memory for their semaphores), work is run
+    one task at a time in a thread of this process instead.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        timeout: float | None = None,
+        retry_after: int = 5,
+    ):
+        self.max_workers = (
+            os.process_cpu_count() or 1 if max_workers is None else max_workers
+        )
+        """The number of worker processes (0 to run work in a thread instead)."""
+        self.max_pending = (
+            max(self.max_workers, 1) if max_pending is None else max_pending
+        )
+        """The maximum number of tasks waiting for a worker."""
+        self.timeout = timeout
+        """The default timeout (in seconds) of each task, or None for no timeout."""
+        self.retry_after = retry_after
+        """The number of seconds clients are asked to wait when saturated."""
+        self._executor: concurrent.futures.Executor | None = None
+        self._in_process = False
+        self._in_flight = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ProcessExecutor":
+        """Configure an executor from `MRNARCHITECT_EXECUTOR_*` environment variables."""
+        max_workers = os.getenv("MRNARCHITECT_EXECUTOR_MAX_WORKERS")
+        max_pending = os.getenv("MRNARCHITECT_EXECUTOR_MAX_PENDING")
+        timeout = os.getenv("MRNARCHITECT_EXECUTOR_TIMEOUT_SECONDS", "300")
+        return cls(
+            max_workers=int(max_workers) if max_workers else None,
+            max_pending=int(max_pending) if max_pending else None,
+            timeout=float(timeout) if timeout else None,
+            retry_after=int(os.getenv("MRNARCHITECT_EXECUTOR_RETRY_AFTER_SECONDS", 5)),
+        )
+
+    def start(self):
+        """Start the worker processes, and wait until all of them are warmed up (or
+        start a thread, if there are no worker processes or they can not be started).
+        """
+        if self._executor is not None:
+            return
+        if self.max_workers > 0:
+            executor = None
+            try:
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                    initializer=_initialize_worker,
+                )
+                for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+                    future.result()
+            except (OSError, concurrent.futures.process.BrokenProcessPool):
+                logger.warning(
+                    "Could not start the worker processes, running work in a thread.",
+                    exc_info=True,
+                )
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                self._executor, self._in_process = executor, False
+                return
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            1, initializer=_initialize_worker
+        )
+        self._in_process = True
+        self._executor.submit(_ping).result()
+
+    @property
+    def _workers(self) -> int:
+        return 1 if self._in_process else max(self.max_workers, 1)
+
+    def shutdown(self):
+        """Stop the worker processes, cancelling any work that has not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(
+        self,
+        func: typing.Callable,
+        *args: typing.Any,
+        timeout: float | None = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        """Run `func(*args, **kwargs)` in a worker process (or the thread).
+
+        Raises an `ExecutorSaturatedError` when there are already `max_pending` tasks
+        waiting for a worker, and an `ExecutorTimeoutError` when the task takes longer
+        than `timeout` seconds (or the executor default).
+        """
+        if self._executor is None:
+            raise RuntimeError("Executor has not been started.")
+        with self._lock:
+            if self._in_flight >= self._workers + self.max_pending:
+                self._stats["rejected"] += 1
+                raise ExecutorSaturatedError(
+                    f"All {self._workers} workers are busy and {self.max_pending} tasks are queued."
+                )
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=self.timeout if timeout is None else timeout,
+            )
+        except TimeoutError as e:
+            with self._lock:
+                self._stats["timed_out"] += 1
+            raise ExecutorTimeoutError(
+                f"Task did not complete within {timeout or self.timeout} seconds."
+            ) from e
+
+    def stats(self) -> ExecutorStats:
+        """A snapshot of the executor's queue depth and worker utilization."""
+        with self._lock:
+            running = min(self._in_flight, self._workers)
+            return ExecutorStats(
+                in_process=self._in_process,
+                max_workers=self._workers,
+                max_pending=self.max_pending,
+                running=running,
+                queued=self._in_flight - running,
+                utilization=running / self._workers,
+                **self._stats,
+            )
+
+    def _on_done(self, future: concurrent.futures.Future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self._stats["completed"] += 1
+            else:
+                self._stats["failed"] += 1
+
+
+EXECUTOR = ProcessExecutor.from_env()
+"""The executor used by the API for CPU-bound routes."""
@@ -0,0 +1,487 @@
+"""Asynchronous optimization jobs, persisted in a local SQLite store."""
+
+import asyncio
+import contextlib
+import logging
+import os
+import pathlib
+import sqlite3
+import tempfile
+import time
+import typing
+import uuid
+
+import msgspec
+
+from mrnarchitect.optimize import (
+    DEFAULT_EARLY_STOPPING,
+    OPTIMIZATION_CACHE,
+    EarlyStopping,
+    Engine,
+    OptimizationCache,
+    OptimizationParameter,
+    OptimizationResult,
+    optimize,
+)
+from mrnarchitect.sequence import Sequence
+
+from .executor import (
+    EXECUTOR,
+    ExecutorSaturatedError,
+    ExecutorTimeoutError,
+    ProcessExecutor,
+)
+
+logger = logging.getLogger(__name__)
+
+JobStatus = typing.Literal["queued", "running", "completed", "failed"]
+
+
+class Job(msgspec.Struct, kw_only=True):
+    id: str
+    status: JobStatus
+    progress: float
+    """The ratio (from 0 to 1) of the optimization that has completed."""
+    created_at: float
+    """The time the job was submitted (seconds since the epoch)."""
+    updated_at: float
+    """The time the job was last updated (seconds since the epoch)."""
+    expires_at: float | None
+    """The time a finished job is removed from the store (seconds since the epoch)."""
+    result: OptimizationResult | None = None
+    error: str | None = None
+
+
+class JobRequest(msgspec.Struct, kw_only=True):
+    """The inputs of a job, passed to `optimize`."""
+
+    sequence: str
+    parameters: list[OptimizationParameter]
+    random_seed: int | None = None
+    time_budget_seconds: float | None = None
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING
+    engine: Engine = "dnachisel"
+    beam_width: int = 64
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    request BLOB NOT NULL,
+    result BLOB,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+"""
+
+
+class JobStore:
+    """Persists optimization jobs in a SQLite database, so that queued and finished
+    jobs survive a restart of the server.
+
+    Finished jobs are kept for `ttl` seconds, after which they are removed by
+    `compact`.
+    """
+
+    def __init__(self, path: pathlib.Path | str, ttl: float = 86_400):
+        if str(path) == ":memory:":
+            raise ValueError(
+                "The job store must be a file, so it can be shared between processes."
+            )
+        self.path = pathlib.Path(path)
+        """The path of the SQLite database."""
+        self.ttl = ttl
+        """The number of seconds finished jobs are kept."""
+        self._initialized = False
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        """Configure a job store from `MRNARCHITECT_JOBS_*` environment variables."""
+        return cls(
+            path=os.getenv(
+                "MRNARCHITECT_JOBS_DB",
+                pathlib.Path(tempfile.gettempdir()) / "mrnarchitect-jobs.db",
+            ),
+            ttl=float(os.getenv("MRNARCHITECT_JOBS_TTL_SECONDS", 86_400)),
+        )
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        if not self._initialized:
+            # `auto_vacuum` must be set before the tables are created to take effect
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(_SCHEMA)
+            self._initialized = True
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def create(
+        self,
+        sequence: str,
+        parameters: typing.Sequence[OptimizationParameter],
+        random_seed: int | None = None,
+        time_budget_seconds: float | None = None,
+        early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+        engine: Engine = "dnachisel",
+        beam_width: int = 64,
+    ) -> Job:
+        """Queue a new optimization job."""
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            status="queued",
+            progress=0.0,
+            created_at=now,
+            updated_at=now,
+            expires_at=None,
+        )
+        request = msgspec.json.encode(
+            JobRequest(
+                sequence=sequence,
+                parameters=list(parameters),
+                random_seed=random_seed,
+                time_budget_seconds=time_budget_seconds,
+                early_stopping=early_stopping,
+                engine=engine,
+                beam_width=beam_width,
+            )
+        )
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, request, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, request, now, now),
+            )
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Get a job, or None if it does not exist or has expired."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE id = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (job_id, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row["id"],
+            status=row["status"],
+            progress=row["progress"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            expires_at=row["expires_at"],
+            result=msgspec.json.decode(row["result"], type=OptimizationResult)
+            if row["result"] is not None
+            else None,
+            error=row["error"],
+        )
+
+    def claim(self, limit: int) -> list[str]:
+        """Mark up to `limit` of the oldest queued jobs as running, returning their
+        IDs.
+        """
+        if limit <= 0:
+            return []
+        with self._connect() as connection:
+            ids = [
+                row["id"]
+                for row in connection.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued'"
+                    " ORDER BY created_at LIMIT ?",
+                    (limit,),
+                )
+            ]
+            connection.executemany(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?",
+                [(time.time(), it) for it in ids],
+            )
+        return ids
+
+    def request(self, job_id: str) -> JobRequest:
+        """The inputs of a job."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT request FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        return msgspec.json.decode(row["request"], type=JobRequest)
+
+    def set_progress(self, job_id: str, progress: float):
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ?"
+                " WHERE id = ? AND status = 'running'",
+                (progress, time.time(), job_id),
+            )
+
+    def complete(self, job_id: str, result: OptimizationResult):
+        """Store the result of a running job."""
+        self._finish(job_id, "completed", result=msgspec.json.encode(result))
+
+    def fail(self, job_id: str, error: str):
+        """Mark a running job as failed."""
+        self._finish(job_id, "failed", error=error)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: bytes | None = None,
+        error: str | None = None,
+    ):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, progress = 1, result = ?, error = ?,"
+                " updated_at = ?, expires_at = ? WHERE id = ? AND status = 'running'",
+                (status, result, error, now, now + self.ttl, job_id),
+            )
+
+    def requeue(self, *job_ids: str):
+        """Put running jobs back in the queue."""
+        with self._connect() as connection:
+            connection.executemany(
+                "UPDATE jobs SET status = 'queued', progress = 0, updated_at = ?"
+                " WHERE id = ? AND status = 'running'",
+                [(time.time(), it) for it in job_ids],
+            )
+
+    def recover(self) -> int:
+        """Put all running jobs back in the queue, returning the number of jobs.
+
+        Call this on startup, when jobs marked as running were interrupted by a
+        previous shutdown.
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                "UPDATE jobs SET status = 'queued', progress = 0, updated_at = ?"
+                " WHERE status = 'running'",
+                (time.time(),),
+            ).rowcount
+
+    def compact(self) -> int:
+        """Remove expired jobs and reclaim their space, returning the number of jobs
+        removed.
+        """
+        with self._connect() as connection:
+            removed = connection.execute(
+                "DELETE FROM jobs WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+        if removed:
+            with self._connect() as connection:
+                connection.execute("PRAGMA incremental_vacuum")
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+
+def _cache_key(request: JobRequest) -> str:
+    return OptimizationCache.key(
+        Sequence.create(request.sequence),
+        request.parameters,
+        random_seed=request.random_seed,
+        time_budget_seconds=request.time_budget_seconds,
+        early_stopping=request.early_stopping,
+        engine=request.engine,
+        beam_width=request.beam_width,
+    )
+
+
+def _run_job(
+    store: JobStore, job_id: str, progress_interval: float = 1.0
+) -> OptimizationResult | None:
+    """Run a job in a worker process, writing its progress and result to the store.
+    The result is returned too, or None if the job failed.
+    """
+    request = store.request(job_id)
+    last_update = 0.0
+
+    def _progress(value: float):
+        nonlocal last_update
+        now = time.monotonic()
+        if now - last_update >= progress_interval:
+            last_update = now
+            store.set_progress(job_id, value)
+
+    try:
+        result = optimize(
+            Sequence.create(request.sequence),
+            request.parameters,
+            progress=_progress,
+            random_seed=request.random_seed,
+            time_budget_seconds=request.time_budget_seconds,
+            early_stopping=request.early_stopping,
+            engine=request.engine,
+            beam_width=request.beam_width,
+        )
+    except Exception as e:
+        store.fail(job_id, f"{type(e).__name__}: {e}")
+        return None
+    store.complete(job_id, result)
+    return result
+
+
+class JobRunner:
+    """Dispatches queued jobs from a `JobStore` to a `ProcessExecutor`.
+
+    At most `max_running` jobs are run at a time, leaving the remaining workers
+    free for synchronous requests. If a `cache` is given, seeded jobs are completed
+    from it when possible, and their results are added to it (from this process,
+    as the workers do not share an in-memory cache).
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor: ProcessExecutor,
+        max_running: int | None = None,
+        timeout: float | None = None,
+        poll_interval: float = 5.0,
+        compact_interval: float = 600.0,
+        cache: OptimizationCache | None = None,
+    ):
+        self.store = store
+        self.executor = executor
+        self.cache = cache
+        self.max_running = max_running or max(executor.max_workers // 2, 1)
+        """The maximum number of jobs run at a time."""
+        self.timeout = timeout
+        """The timeout (in seconds) of each job, or None for the executor default."""
+        self.poll_interval = poll_interval
+        """The number of seconds between checks for queued jobs."""
+        self.compact_interval = compact_interval
+        """The number of seconds between compactions of the store."""
+        self._running: set[asyncio.Task] = set()
+        self._dispatcher: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    @classmethod
+    def from_env(
+        cls,
+        store: JobStore,
+        executor: ProcessExecutor,
+        cache: OptimizationCache | None = None,
+    ) -> "JobRunner":
+        """Configure a job runner from `MRNARCHITECT_JOBS_*` environment variables."""
+        max_running = os.getenv("MRNARCHITECT_JOBS_MAX_RUNNING")
+        timeout = os.getenv("MRNARCHITECT_JOBS_TIMEOUT_SECONDS", "3600")
+        return cls(
+            store,
+            executor,
+            max_running=int(max_running) if max_running else None,
+            timeout=float(timeout) if timeout else None,
+            cache=cache,
+        )
+
+    async def submit(
+        self,
+        sequence: str,
+        parameters: typing.Sequence[OptimizationParameter],
+        random_seed: int | None = None,
+        time_budget_seconds: float | None = None,
+        early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+        engine: Engine = "dnachisel",
+        beam_width: int = 64,
+    ) -> Job:
+        """Queue an optimization job."""
+        job = await asyncio.to_thread(
+            self.store.create,
+            sequence,
+            parameters,
+            random_seed,
+            time_budget_seconds,
+            early_stopping,
+            engine,
+            beam_width,
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def start(self):
+        """Requeue any jobs interrupted by a previous shutdown, and start dispatching
+        queued jobs.
+        """
+        if self._dispatcher is not None:
+            return
+        await asyncio.to_thread(self.store.recover)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        """Stop dispatching jobs. Jobs that are still running are requeued on the next
+        start.
+        """
+        tasks = [*self._running, *([self._dispatcher] if self._dispatcher else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._wakeup = None
+
+    async def _dispatch(self):
+        assert self._wakeup is not None
+        last_compaction = -float("inf")
+        while True:
+            # The store is a blocking SQLite database, so is used from a thread
+            try:
+                if time.monotonic() - last_compaction >= self.compact_interval:
+                    await asyncio.to_thread(self.store.compact)
+                    last_compaction = time.monotonic()
+                self._wakeup.clear()
+                job_ids = await asyncio.to_thread(
+                    self.store.claim, self.max_running - len(self._running)
+                )
+            except Exception:
+                # An error (such as a locked database) must not stop the dispatcher
+                logger.exception("Failed to dispatch jobs.")
+                job_ids = []
+            for job_id in job_ids:
+                task = asyncio.create_task(self._run(job_id))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+
+    async def _run(self, job_id: str):
+        try:
+            key, random_seed = None, None
+            if self.cache is not None:
+                request = await asyncio.to_thread(self.store.request, job_id)
+                key, random_seed = _cache_key(request), request.random_seed
+                cached = await asyncio.to_thread(self.cache.get, key, random_seed)
+                if cached is not None:
+                    await asyncio.to_thread(self.store.complete, job_id, cached)
+                    return
+            result = await self.executor.run(
+                _run_job, self.store, job_id, timeout=self.timeout
+            )
+            if self.cache is not None and key is not None and result is not None:
+                await asyncio.to_thread(self.cache.put, key, result, random_seed)
+        except ExecutorSaturatedError:
+            await asyncio.to_thread(self.store.requeue, job_id)
+            await asyncio.sleep(self.executor.retry_after)
+        except ExecutorTimeoutError as e:
+            await asyncio.to_thread(self.store.fail, job_id, str(e))
+        except Exception as e:
+            await asyncio.to_thread(self.store.fail, job_id, f"{type(e).__name__}: {e}")
+        finally:
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+
+JOBS = JobRunner.from_env(JobStore.from_env(), EXECUTOR, OPTIMIZATION_CACHE)
+"""The job runner used by the API for asynchronous optimizations."""
@@ -1,10 +1,19 @@
+import asyncio
 import hashlib
+import typing
 
 import msgspec
-from litestar import Router, post
+from litestar import Router, get, post
+from litestar.exceptions import HTTPException, NotFoundException
+from litestar.params import FromPath
 
 from mrnarchitect.analyze import Analysis, analyze
 from mrnarchitect.optimize import (
+    DEFAULT_EARLY_STOPPING,
+    OPTIMIZATION_CACHE,
+    EarlyStopping,
+    Engine,
+    OptimizationCacheStats,
     OptimizationParameter,
     OptimizationResult,
     optimize,
@@ -12,6 +21,30 @@ from mrnarchitect.optimize import (
 from mrnarchitect.organism import Organism, search_organisms
 from mrnarchitect.sequence import Sequence, SequenceType
 
+from .executor import (
+    EXECUTOR,
+    ExecutorSaturatedError,
+    ExecutorStats,
+    ExecutorTimeoutError,
+)
+from .jobs import JOBS, Job
+
+
+async def _run_in_executor(
+    func: typing.Callable, *args: typing.Any, **kwargs: typing.Any
+) -> typing.Any:
+    """Run CPU-bound work in the executor, so the event loop is never blocked."""
+    try:
+        return await EXECUTOR.run(func, *args, **kwargs)
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(EXECUTOR.retry_after)},
+        ) from e
+    except ExecutorTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+
 
 class ConvertRequest(msgspec.Struct):
     sequence: str
@@ -38,6 +71,11 @@ async def post_convert(data: ConvertRequest) -> ConvertResponse:
 class OptimizeRequest(msgspec.Struct):
     sequence: str
     parameters: list[OptimizationParameter]
+    random_seed: int | None = None
+    time_budget_seconds: float | None = None
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING
+    engine: Engine = "dnachisel"
+    beam_width: int = 64
 
 
 @post(
@@ -49,7 +87,29 @@ async def post_optimize(
     data: OptimizeRequest,
     headers: dict,
 ) -> OptimizationResult:
-    result = optimize(Sequence.create(data.sequence), parameters=data.parameters)
+    sequence = Sequence.create(data.sequence)
+    key = OPTIMIZATION_CACHE.key(
+        sequence,
+        data.parameters,
+        random_seed=data.random_seed,
+        time_budget_seconds=data.time_budget_seconds,
+        early_stopping=data.early_stopping,
+        engine=data.engine,
+        beam_width=data.beam_width,
+    )
+    result = OPTIMIZATION_CACHE.get(key, data.random_seed)
+    if result is None:
+        result = await _run_in_executor(
+            optimize,
+            sequence,
+            data.parameters,
+            random_seed=data.random_seed,
+            time_budget_seconds=data.time_budget_seconds,
+            early_stopping=data.early_stopping,
+            engine=data.engine,
+            beam_width=data.beam_width,
+        )
+        OPTIMIZATION_CACHE.put(key, result, data.random_seed)
     # Log the optimization
     print(
         msgspec.json.encode(
@@ -80,6 +140,37 @@ async def post_optimize(
     return result
 
 
+@post(
+    "/jobs/optimize",
+    summary="Submit optimization job.",
+    description="Queue an optimization of the given sequence, returning the job to poll for its result.",
+)
+async def post_jobs_optimize(data: OptimizeRequest) -> Job:
+    # Validate the sequence before it is queued
+    Sequence.create(data.sequence)
+    return await JOBS.submit(
+        data.sequence,
+        data.parameters,
+        data.random_seed,
+        time_budget_seconds=data.time_budget_seconds,
+        early_stopping=data.early_stopping,
+        engine=data.engine,
+        beam_width=data.beam_width,
+    )
+
+
+@get(
+    "/jobs/{job_id:str}",
+    summary="Get job.",
+    description="Return the status, progress and (once completed) result of a job.",
+)
+async def get_job(job_id: FromPath[str]) -> Job:
+    job = await asyncio.to_thread(JOBS.store.get, job_id)
+    if job is None:
+        raise NotFoundException(f"Job {job_id} does not exist or has expired.")
+    return job
+
+
 class AnalyzeRequest(msgspec.Struct):
     sequence: str
     organism: Organism | str = "homo-sapiens"
@@ -93,7 +184,7 @@ class AnalyzeRequest(msgspec.Struct):
 )
 async def post_analyze(data: AnalyzeRequest) -> Analysis:
     sequence = Sequence.create(data.sequence)
-    return analyze(sequence, data.organism)
+    return await _run_in_executor(analyze, sequence, data.organism)
 
 
 class CompareRequest(msgspec.Struct):
@@ -135,12 +226,34 @@ async def post_search_organisms(
     return SearchOrganismsResponse(organisms=search_organisms(data.terms))
 
 
+@get(
+    "/executor",
+    summary="Executor statistics.",
+    description="Return the queue depth and worker utilization of the executor.",
+)
+async def get_executor() -> ExecutorStats:
+    return EXECUTOR.stats()
+
+
+@get(
+    "/optimization-cache",
+    summary="Optimization cache statistics.",
+    description="Return the size and hit rate of the optimization result cache.",
+)
+async def get_optimization_cache() -> OptimizationCacheStats:
+    return OPTIMIZATION_CACHE.stats()
+
+
 api_router = Router(
     path="/api",
     route_handlers=[
+        get_executor,
+        get_job,
+        get_optimization_cache,
         post_analyze,
         post_compare,
         post_convert,
+        post_jobs_optimize,
         post_optimize,
         post_search_organisms,
     ],
@@ -0,0 +1,519 @@
+"""Bounded, observable caches used to memoize expensive computations."""
+
+import builtins
+import collections
+import contextlib
+import functools
+import pathlib
+import sqlite3
+import sys
+import threading
+import time
+import typing
+
+import msgspec
+
+_MISSING = object()
+_NOT_FOUND = object()
+
+
+class CacheStats(msgspec.Struct, kw_only=True):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of lookups that were served from the cache.
+
+        >>> CacheStats(hits=3, misses=1).hit_rate
+        0.75
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def sizeof(value: typing.Any) -> int:
+    """Approximate the memory footprint (in bytes) of a cached value.
+
+    >>> sizeof("ACGT") > sizeof("A")
+    True
+    """
+    if isinstance(value, msgspec.Struct):
+        return sys.getsizeof(value) + sum(
+            sizeof(getattr(value, field)) for field in value.__struct_fields__
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(it) for it in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sizeof(k) + sizeof(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """A thread-safe least-recently-used cache bounded by entry count and bytes.
+
+    >>> cache = LRUCache(max_entries=2)
+    >>> cache.put("a", 1)
+    []
+    >>> cache.put("b", 2)
+    []
+    >>> cache.get("a")
+    1
+    >>> cache.put("c", 3)
+    ['b']
+    >>> cache.get("b", None) is None
+    True
+    >>> cache.stats()
+    CacheStats(hits=1, misses=1, evictions=1)
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        sizeof: typing.Callable[[typing.Any], int] = sizeof,
+    ):
+        self.max_entries = max_entries
+        """Maximum number of entries, or None for no limit."""
+        self.max_bytes = max_bytes
+        """Maximum approximate size of all entries, or None for no limit."""
+        self._sizeof = sizeof
+        self._entries: collections.OrderedDict[typing.Hashable, tuple[typing.Any, int]]
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def bytes(self) -> int:
+        """The approximate size of all cached entries."""
+        return self._bytes
+
+    def get(self, key: typing.Hashable, default: typing.Any = _MISSING) -> typing.Any:
+        """Get a cached value, marking it as recently used.
+
+        Raises a `KeyError` if the key is missing and no default is given.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return self._entries[key][0]
+            self._stats.misses += 1
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> list[typing.Hashable]:
+        """Cache a value, returning the keys of any evicted entries."""
+        size = self._sizeof(key) + self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Never cache entries that can not fit in the cache
+                return []
+            self._entries[key] = (value, size)
+            self._bytes += size
+            return self._evict()
+
+    def configure(
+        self, max_entries: int | None = None, max_bytes: int | None = None
+    ) -> list[typing.Hashable]:
+        """Update the cache limits, returning the keys of any evicted entries."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            return self._evict()
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats = CacheStats()
+
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache statistics."""
+        with self._lock:
+            return msgspec.structs.replace(self._stats)
+
+    def _evict(self) -> list[typing.Hashable]:
+        evicted = []
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._stats.evictions += 1
+            evicted.append(key)
+        return evicted
+
+
+class CacheBackend(typing.Protocol):
+    """The interface shared by `LRUCache` and `SQLiteCache`."""
+
+    max_entries: int | None
+    max_bytes: int | None
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, key: typing.Any) -> bool: ...
+
+    @property
+    def bytes(self) -> int: ...
+
+    def get(self, key: typing.Any, default: typing.Any = ...) -> typing.Any: ...
+
+    def put(self, key: typing.Any, value: typing.Any) -> list[typing.Any]: ...
+
+    def configure(
+        self, max_entries: int | None = None, max_bytes: int | None = None
+    ) -> list[typing.Any]: ...
+
+    def clear(self): ...
+
+    def stats(self) -> CacheStats: ...
+
+
+_SQLITE_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at);
+CREATE TABLE IF NOT EXISTS cache_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_totals VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_totals SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN
+    UPDATE cache_totals SET bytes = bytes - OLD.size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_totals SET entries = entries - 1, bytes = bytes - OLD.size;
+END;
+"""
+
+_SQLITE_MAX_VARIABLES = 500
+"""The number of keys looked up per query, well below SQLite's variable limit."""
+
+
+class SQLiteCache:
+    """A least-recently-used cache of bytes, bounded by entry count and bytes, and
+    persisted in a SQLite database so it is shared between processes and survives
+    restarts.
+
+    The database is in WAL mode, so readers do not block the (single) writer.
+    Statistics are only kept for the lookups made through this instance.
+
+    >>> import tempfile
+    >>> cache = SQLiteCache(pathlib.Path(tempfile.mkdtemp()) / "cache.db", max_entries=2)
+    >>> cache.put("a", b"1")
+    []
+    >>> cache.put("b", b"2")
+    []
+    >>> cache.get("a")
+    b'1'
+    >>> cache.put("c", b"3")
+    ['b']
+    >>> cache.get("b", None) is None
+    True
+    >>> cache.stats()
+    CacheStats(hits=1, misses=1, evictions=1)
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path | str,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.path = pathlib.Path(path)
+        """The path of the SQLite database."""
+        self.max_entries = max_entries
+        """Maximum number of entries, or None for no limit."""
+        self.max_bytes = max_bytes
+        """Maximum size of all entries, or None for no limit."""
+        self._initialized = False
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_lock": None}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state, _lock=threading.Lock())
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(_SQLITE_CACHE_SCHEMA)
+            self._initialized = True
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _totals(self, connection: sqlite3.Connection) -> tuple[int, int]:
+        return connection.execute("SELECT entries, bytes FROM cache_totals").fetchone()
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return self._totals(connection)[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._connect() as connection:
+            row = connection.execute("SELECT 1 FROM cache WHERE key = ?", (key,))
+            return row.fetchone() is not None
+
+    @property
+    def bytes(self) -> int:
+        """The size of all cached entries."""
+        with self._connect() as connection:
+            return self._totals(connection)[1]
+
+    def get(self, key: str, default: typing.Any = _MISSING) -> typing.Any:
+        """Get a cached value, marking it as recently used.
+
+        Raises a `KeyError` if the key is missing and no default is given.
+        """
+        value = self.get_many([key]).get(key, _NOT_FOUND)
+        if value is not _NOT_FOUND:
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def get_many(self, keys: typing.Iterable[str]) -> dict[str, builtins.bytes]:
+        """Get the cached values of many keys in a single transaction, marking them as
+        recently used. Missing keys are left out of the result.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connect() as connection:
+            now = time.time()
+            for i in range(0, len(keys), _SQLITE_MAX_VARIABLES):
+                batch = keys[i : i + _SQLITE_MAX_VARIABLES]
+                found.update(
+                    connection.execute(
+                        "UPDATE cache SET accessed_at = ?"
+                        f" WHERE key IN ({', '.join('?' * len(batch))})"
+                        " RETURNING key, value",
+                        (now, *batch),
+                    ).fetchall()
+                )
+        with self._lock:
+            self._stats.hits += len(found)
+            self._stats.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, value: builtins.bytes) -> list[str]:
+        """Cache a value, returning the keys of any evicted entries."""
+        return self.put_many({key: value})
+
+    def put_many(self, items: typing.Mapping[str, builtins.bytes]) -> list[str]:
+        """Cache many values in a single transaction, returning the keys of any
+        evicted entries.
+        """
+        now = time.time()
+        fits = {
+            key: value
+            for key, value in items.items()
+            if self.max_bytes is None or len(value) <= self.max_bytes
+        }
+        with self._connect() as connection:
+            # Never cache entries that can not fit in the cache
+            connection.executemany(
+                "DELETE FROM cache WHERE key = ?",
+                [(key,) for key in items.keys() - fits.keys()],
+            )
+            connection.executemany(
+                "INSERT INTO cache (key, value, size, accessed_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value,"
+                " size = excluded.size, accessed_at = excluded.accessed_at",
+                [(key, value, len(value), now) for key, value in fits.items()],
+            )
+            return self._evict(connection)
+
+    def configure(
+        self, max_entries: int | None = None, max_bytes: int | None = None
+    ) -> list[str]:
+        """Update the cache limits, returning the keys of any evicted entries."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        with self._connect() as connection:
+            return self._evict(connection)
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache")
+        with self._lock:
+            self._stats = CacheStats()
+
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache statistics."""
+        with self._lock:
+            return msgspec.structs.replace(self._stats)
+
+    def _evict(self, connection: sqlite3.Connection) -> list[str]:
+        entries, size = self._totals(connection)
+        evicted = []
+        # Walk the least recently used entries (by index) until within both limits
+        rows = connection.execute(
+            "SELECT key, size FROM cache ORDER BY accessed_at, rowid"
+        )
+        while (self.max_entries is not None and entries > self.max_entries) or (
+            self.max_bytes is not None and size > self.max_bytes
+        ):
+            key, entry_size = rows.fetchone()
+            evicted.append(key)
+            entries -= 1
+            size -= entry_size
+        rows.close()
+        connection.executemany(
+            "DELETE FROM cache WHERE key = ?", [(key,) for key in evicted]
+        )
+        with self._lock:
+            self._stats.evictions += len(evicted)
+        return evicted
+
+
+class MetricCacheStats(msgspec.Struct, kw_only=True):
+    entries: int
+    bytes: int
+    max_entries: int | None
+    max_bytes: int | None
+    hits: int
+    misses: int
+    evictions: int
+    metrics: dict[str, CacheStats]
+    disabled: list[str]
+
+
+class MetricCache:
+    """Memoizes named metrics of hashable objects in a shared `LRUCache`.
+
+    Each metric may be switched on or off, and hit/miss/eviction counters
+    are kept per metric.
+
+    >>> metric_cache = MetricCache(max_entries=10)
+    >>> class Word(str):
+    ...     @property
+    ...     @metric_cache.memoize
+    ...     def vowels(self):
+    ...         return sum(it in "aeiou" for it in self)
+    >>> Word("banana").vowels, Word("banana").vowels
+    (3, 3)
+    >>> metric_cache.stats().metrics["vowels"]
+    CacheStats(hits=1, misses=1, evictions=0)
+    """
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None):
+        self._cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._metrics: dict[str, CacheStats] = {}
+        self._disabled: set[str] = set()
+        self._lock = threading.RLock()
+
+    def memoize(self, func: typing.Callable) -> typing.Callable:
+        """Decorate a method so its results are memoized under its name."""
+        name = func.__name__
+        self._metrics.setdefault(name, CacheStats())
+
+        @functools.wraps(func)
+        def _wrapper(instance, *args, **kwargs):
+            if name in self._disabled:
+                return func(instance, *args, **kwargs)
+            key = (name, instance, args, tuple(sorted(kwargs.items())))
+            value = self._cache.get(key, _NOT_FOUND)
+            if value is not _NOT_FOUND:
+                with self._lock:
+                    self._metrics[name].hits += 1
+                return value
+            value = func(instance, *args, **kwargs)
+            evicted = self._cache.put(key, value)
+            with self._lock:
+                self._metrics[name].misses += 1
+            self._record_evictions(evicted)
+            return value
+
+        return _wrapper
+
+    def configure(self, max_entries: int | None = None, max_bytes: int | None = None):
+        """Update the size and byte budget of the cache."""
+        evicted = self._cache.configure(max_entries=max_entries, max_bytes=max_bytes)
+        self._record_evictions(evicted)
+
+    def _check_metrics(self, names: typing.Iterable[str]):
+        unknown = set(names).difference(self._metrics)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+
+    def enable(self, *names: str):
+        """Enable memoization for the given metrics."""
+        self._check_metrics(names)
+        self._disabled.difference_update(names)
+
+    def disable(self, *names: str):
+        """Disable memoization for the given metrics.
+
+        Results that were previously cached are left to be evicted.
+        """
+        self._check_metrics(names)
+        self._disabled.update(names)
+
+    def is_enabled(self, name: str) -> bool:
+        return name not in self._disabled
+
+    def clear(self):
+        """Remove all cached results and reset the statistics."""
+        self._cache.clear()
+        with self._lock:
+            self._metrics = {name: CacheStats() for name in self._metrics}
+
+    def stats(self) -> MetricCacheStats:
+        """A snapshot of the cache statistics, in total and per metric."""
+        with self._lock:
+            metrics = {
+                name: msgspec.structs.replace(stats)
+                for name, stats in self._metrics.items()
+            }
+        return MetricCacheStats(
+            entries=len(self._cache),
+            bytes=self._cache.bytes,
+            max_entries=self._cache.max_entries,
+            max_bytes=self._cache.max_bytes,
+            hits=sum(it.hits for it in metrics.values()),
+            misses=sum(it.misses for it in metrics.values()),
+            evictions=sum(it.evictions for it in metrics.values()),
+            metrics=metrics,
+            disabled=sorted(self._disabled),
+        )
+
+    def _record_evictions(self, keys: list[typing.Hashable]):
+        with self._lock:
+            for key in keys:
+                name = typing.cast(tuple, key)[0]
+                self._metrics[name].evictions += 1
@@ -1,14 +1,55 @@
 import argparse
+import contextlib
+import csv
 import importlib.metadata
+import os
+import pathlib
+import sys
 
 import msgspec
 
 from .analyze import analyze
-from .optimize import OptimizationParameter, optimize
+from .cache import SQLiteCache
+from .optimize import (
+    EarlyStopping,
+    Location,
+    OptimizationCache,
+    OptimizationParameter,
+    optimize,
+    optimize_many,
+    reoptimize,
+)
 from .organism import build_database
 from .sequence import Sequence
+from .sweep import sweep
+from .utils.fasta import parse_fasta_file
 
 ORGANISMS = ["homo-sapiens", "mus-musculus"]
+OPTIMIZATION_CACHE_DB = pathlib.Path(
+    os.getenv("MRNARCHITECT_OPTIMIZATION_CACHE_DB")
+    or pathlib.Path(os.getenv("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache")
+    / "mrnarchitect"
+    / "optimizations.db"
+)
+BATCH_CSV_COLUMNS = [
+    "name",
+    "success",
+    "sequence",
+    "time_in_seconds",
+    "iterations",
+    "error",
+]
+SWEEP_CSV_COLUMNS = [
+    "success",
+    "cached",
+    "pareto",
+    "codon_adaptation_index",
+    "gc_deviation",
+    "minimum_free_energy",
+    "time_in_seconds",
+    "sequence",
+    "error",
+]
 
 
 def _parse_sequence(args):
@@ -22,40 +63,194 @@ def _print(output, args):
         print(msgspec.yaml.encode(output).decode())
 
 
+def _parameters(args) -> list[OptimizationParameter]:
+    if args.config:
+        return msgspec.json.decode(args.config, type=list[OptimizationParameter])
+    return [
+        OptimizationParameter(
+            optimize_cai=True,
+            organism=args.organism,
+            avoid_repeat_length=args.avoid_repeat_length,
+            enable_uridine_depletion=args.enable_uridine_depletion,
+            avoid_ribosome_slip=args.avoid_ribosome_slip,
+            avoid_micro_rna_seed_sites=args.avoid_micro_rna_seed_sites,
+            avoid_manufacture_restriction_sites=args.avoid_manufacture_restriction_sites,
+            gc_content_global_min=args.gc_content_global_min,
+            gc_content_global_max=args.gc_content_global_max,
+            gc_content_window_min=args.gc_content_window_min,
+            gc_content_window_max=args.gc_content_window_max,
+            gc_content_window_size=args.gc_content_window_size,
+            avoid_restriction_sites=args.avoid_restriction_sites or [],
+            avoid_sequences=args.avoid_sequences or [],
+            avoid_poly_a=args.avoid_poly_a,
+            avoid_poly_c=args.avoid_poly_c,
+            avoid_poly_g=args.avoid_poly_g,
+            avoid_poly_t=args.avoid_poly_t,
+            hairpin_stem_size=args.hairpin_stem_size,
+            hairpin_window=args.hairpin_window,
+        )
+    ]
+
+
+def _early_stopping(args) -> EarlyStopping | None:
+    return (
+        EarlyStopping(
+            patience=args.early_stopping_patience,
+            min_delta=args.early_stopping_min_delta,
+        )
+        if args.early_stopping_patience
+        else None
+    )
+
+
+def _cache(args) -> OptimizationCache | None:
+    if not args.cache:
+        return None
+    return OptimizationCache(SQLiteCache(args.cache_db, max_entries=10_000))
+
+
 def _optimize(args):
     sequence = _parse_sequence(args)
-    if args.config:
-        parameters = msgspec.json.decode(args.config, type=list[OptimizationParameter])
-    else:
-        parameters = [
-            OptimizationParameter(
-                optimize_cai=True,
-                organism=args.organism,
-                avoid_repeat_length=args.avoid_repeat_length,
-                enable_uridine_depletion=args.enable_uridine_depletion,
-                avoid_ribosome_slip=args.avoid_ribosome_slip,
-                avoid_micro_rna_seed_sites=args.avoid_micro_rna_seed_sites,
-                avoid_manufacture_restriction_sites=args.avoid_manufacture_restriction_sites,
-                gc_content_global_min=args.gc_content_global_min,
-                gc_content_global_max=args.gc_content_global_max,
-                gc_content_window_min=args.gc_content_window_min,
-                gc_content_window_max=args.gc_content_window_max,
-                gc_content_window_size=args.gc_content_window_size,
-                avoid_restriction_sites=args.avoid_restriction_sites or [],
-                avoid_sequences=args.avoid_sequences or [],
-                avoid_poly_a=args.avoid_poly_a,
-                avoid_poly_c=args.avoid_poly_c,
-                avoid_poly_g=args.avoid_poly_g,
-                avoid_poly_t=args.avoid_poly_t,
-                hairpin_stem_size=args.hairpin_stem_size,
-                hairpin_window=args.hairpin_window,
-            )
-        ]
-
-    result = optimize(sequence, parameters=parameters)
+    parameters = _parameters(args)
+
+    cache = _cache(args)
+    result = optimize(
+        sequence,
+        parameters=parameters,
+        random_seed=args.random_seed,
+        cache=cache,
+        restarts=args.restarts,
+        workers=args.workers,
+        target_score=args.target_score,
+        time_budget_seconds=args.time_budget_seconds,
+        segment_length=args.segment_length,
+        segment_overlap=args.segment_overlap,
+        early_stopping=_early_stopping(args),
+        profile=args.profile,
+        engine=args.engine,
+        beam_width=args.beam_width,
+    )
     _print(result, args)
 
 
+def _optimize_batch(args):
+    records = parse_fasta_file(
+        sys.stdin if str(args.input) == "-" else args.input, args.sequence_type
+    )
+
+    def sequences():
+        for name, _, sequence, error in records:
+            if sequence is None:
+                print(f"Skipping {name}: {error}", file=sys.stderr)
+                continue
+            yield name, sequence
+
+    results = optimize_many(
+        sequences(),
+        parameters=_parameters(args),
+        random_seed=args.random_seed,
+        workers=args.workers,
+        ordered=not args.completion_order,
+        time_budget_seconds=args.time_budget_seconds,
+        early_stopping=_early_stopping(args),
+        engine=args.engine,
+        beam_width=args.beam_width,
+    )
+    with (
+        open(args.output, "w", newline="")
+        if args.output
+        else contextlib.nullcontext(sys.stdout)
+    ) as output:
+        writer = csv.writer(output)
+        if args.format == "csv":
+            writer.writerow(BATCH_CSV_COLUMNS)
+        for name, result in results:
+            if args.format == "csv":
+                writer.writerow(
+                    [
+                        name,
+                        result.success,
+                        str(result.result.sequence) if result.result else "",
+                        f"{result.time_in_seconds:.3f}",
+                        result.iterations if result.iterations is not None else "",
+                        result.error.message if result.error else "",
+                    ]
+                )
+            else:
+                output.write(
+                    msgspec.json.encode({"name": name, "result": result}).decode()
+                    + "\n"
+                )
+            # Write each result as it completes, so a long batch can be followed
+            output.flush()
+
+
+def _region(value: str) -> Location:
+    start, _, end = value.partition("-")
+    return Location(start_coordinate=int(start), end_coordinate=int(end))
+
+
+def _reoptimize(args):
+    sequence = _parse_sequence(args)
+    result = reoptimize(
+        sequence,
+        parameters=_parameters(args),
+        previous_parameters=msgspec.json.decode(
+            args.previous_config, type=list[OptimizationParameter]
+        )
+        if args.previous_config
+        else None,
+        edited=args.edited,
+        margin=args.margin,
+        random_seed=args.random_seed,
+        time_budget_seconds=args.time_budget_seconds,
+        early_stopping=_early_stopping(args),
+        engine=args.engine,
+        beam_width=args.beam_width,
+    )
+    _print(result, args)
+
+
+def _sweep(args):
+    sequence = _parse_sequence(args)
+    grid = msgspec.json.decode(args.grid, type=dict[str, list])
+    cache = _cache(args)
+    result = sweep(
+        sequence,
+        grid,
+        parameters=_parameters(args),
+        samples=args.samples,
+        random_seed=args.random_seed,
+        workers=args.workers,
+        cache=cache,
+        early_stopping=_early_stopping(args),
+        engine=args.engine,
+        beam_width=args.beam_width,
+    )
+    if args.format != "csv":
+        _print(result, args)
+        return
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow([*grid, *SWEEP_CSV_COLUMNS])
+    pareto_front = set(result.pareto_front)
+    for index, point in enumerate(result.points):
+        writer.writerow(
+            [
+                *(msgspec.json.encode(point.values[it]).decode() for it in grid),
+                point.success,
+                point.cached,
+                index in pareto_front,
+                point.codon_adaptation_index,
+                point.gc_deviation,
+                point.minimum_free_energy,
+                f"{point.time_in_seconds:.3f}",
+                str(point.sequence) if point.sequence else "",
+                point.error or "",
+            ]
+        )
+
+
 def _analyze(args):
     sequence = _parse_sequence(args)
     result = analyze(sequence=sequence, codon_usage_table=args.organism)
@@ -80,99 +275,359 @@ def _version(_):
     print(importlib.metadata.version("mrnarchitect"))
 
 
-def cli(args=None):
-    parser = argparse.ArgumentParser(
-        description="A toolkit to optimize mRNA sequences."
-    )
-    subparsers = parser.add_subparsers(required=True, help="Command to execute.")
-
-    # Optimize
-    optimize = subparsers.add_parser("optimize", help="Optimize a sequence.")
-    optimize.add_argument("sequence", type=str, help="The sequence to optimize.")
-    optimize.add_argument(
-        "--sequence-type",
-        type=str,
-        choices=["nucleic-acid", "amino-acid"],
-        default="nucleic-acid",
-        help="The type of sequence.",
-    )
-    optimize.add_argument(
+def _add_parameter_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
         "--config",
         type=str,
         default="",
         help="The optimization configuration given as a JSON structure. Other command line options are ignored.",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--organism",
         type=str,
         choices=ORGANISMS,
         default="homo-sapiens",
         help="The organism to use.",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--enable-uridine-depletion",
         action=argparse.BooleanOptionalAction,
+        default=False,
         help="If set, will enable uridine depletion.",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--avoid-ribosome-slip",
         action=argparse.BooleanOptionalAction,
+        default=False,
         help="If set, will avoid sequences that may cause ribosome slippage.",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--avoid-micro-rna-seed-sites",
         action=argparse.BooleanOptionalAction,
+        default=False,
         help="If set, will avoid common microRNA seed sites.",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--avoid-manufacture-restriction-sites",
         action=argparse.BooleanOptionalAction,
+        default=False,
         help="If set, will avoid manufacture restriction sites.",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--gc-content-global-min",
         type=float,
         default=0.4,
         help="The minimum GC-ratio (global).",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--gc-content-global-max",
         type=float,
         default=0.7,
         help="The maximum GC-ratio (global).",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--gc-content-window-min",
         type=float,
         default=0.3,
         help="The minimum GC-ratio (windowed).",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--gc-content-window-max",
         type=float,
         default=0.7,
         help="The maximum GC-ratio (windowed).",
     )
-    optimize.add_argument(
+    parser.add_argument(
         "--gc-content-window-size",
         type=int,
         default=40,
         help="The GC-ratio window size.",
     )
-    optimize.add_argument("--avoid-restriction-sites", type=str, action="append")
-    optimize.add_argument("--avoid-sequences", type=str, action="append")
-    optimize.add_argument("--avoid-repeat-length", type=int, default=10)
-    optimize.add_argument("--avoid-poly-a", type=int, default=9)
-    optimize.add_argument("--avoid-poly-c", type=int, default=6)
-    optimize.add_argument("--avoid-poly-g", type=int, default=6)
-    optimize.add_argument("--avoid-poly-t", type=int, default=9)
-    optimize.add_argument("--hairpin-stem-size", type=int, default=10)
-    optimize.add_argument("--hairpin-window", type=int, default=60)
+    parser.add_argument("--avoid-restriction-sites", type=str, action="append")
+    parser.add_argument("--avoid-sequences", type=str, action="append")
+    parser.add_argument("--avoid-repeat-length", type=int, default=10)
+    parser.add_argument("--avoid-poly-a", type=int, default=9)
+    parser.add_argument("--avoid-poly-c", type=int, default=6)
+    parser.add_argument("--avoid-poly-g", type=int, default=6)
+    parser.add_argument("--avoid-poly-t", type=int, default=9)
+    parser.add_argument("--hairpin-stem-size", type=int, default=10)
+    parser.add_argument("--hairpin-window", type=int, default=60)
+
+
+def _add_search_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--early-stopping-patience",
+        type=int,
+        default=100,
+        help="Stop each search of the objectives after this many iterations without improvement (0 to run every iteration).",
+    )
+    parser.add_argument(
+        "--early-stopping-min-delta",
+        type=float,
+        default=0.0,
+        help="The increase in objective score over the patience below which a search is stopped.",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=["dnachisel", "codon", "beam"],
+        default="dnachisel",
+        help="The search to optimize with (the codon and beam engines leave the parameters they do not support to DnaChisel).",
+    )
+    parser.add_argument(
+        "--beam-width",
+        type=int,
+        default=64,
+        help="The number of partial designs kept by the beam engine (wider is slower, but finds a better CAI).",
+    )
+
+
+def cli(args=None):
+    parser = argparse.ArgumentParser(
+        description="A toolkit to optimize mRNA sequences."
+    )
+    subparsers = parser.add_subparsers(required=True, help="Command to execute.")
+
+    # Optimize
+    optimize = subparsers.add_parser("optimize", help="Optimize a sequence.")
+    optimize.add_argument("sequence", type=str, help="The sequence to optimize.")
+    optimize.add_argument(
+        "--sequence-type",
+        type=str,
+        choices=["nucleic-acid", "amino-acid"],
+        default="nucleic-acid",
+        help="The type of sequence.",
+    )
+    _add_parameter_arguments(optimize)
+    optimize.add_argument(
+        "--random-seed",
+        type=int,
+        default=None,
+        help="The random seed, to make the optimization reproducible.",
+    )
+    optimize.add_argument(
+        "--restarts",
+        type=int,
+        default=1,
+        help="The number of independently seeded optimizations to run, keeping the best.",
+    )
+    optimize.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of processes to run the restarts in (defaults to the number of CPUs).",
+    )
+    optimize.add_argument(
+        "--target-score",
+        type=float,
+        default=None,
+        help="Stop the remaining restarts once one reaches this objective score.",
+    )
+    optimize.add_argument(
+        "--time-budget-seconds",
+        type=float,
+        default=None,
+        help="Stop the optimization after this many seconds, returning the best sequence so far.",
+    )
+    optimize.add_argument(
+        "--segment-length",
+        type=int,
+        default=None,
+        help="If set, will optimize segments of this many nucleotides in parallel (for long sequences).",
+    )
+    optimize.add_argument(
+        "--segment-overlap",
+        type=int,
+        default=90,
+        help="The number of nucleotides each segment overlaps the next.",
+    )
+    optimize.add_argument(
+        "--profile",
+        action=argparse.BooleanOptionalAction,
+        help="If set, will report where the time of the optimization went.",
+    )
+    _add_search_arguments(optimize)
+    optimize.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="If set, will reuse the result of a previous optimization with the same inputs (only seeded optimizations are cached).",
+    )
+    optimize.add_argument(
+        "--cache-db",
+        type=pathlib.Path,
+        default=OPTIMIZATION_CACHE_DB,
+        help="The path of the optimization cache.",
+    )
     optimize.add_argument(
         "--format", type=str, choices=["yaml", "json"], default="yaml"
     )
     optimize.set_defaults(func=_optimize)
 
+    # Optimize a batch
+    optimize_batch = subparsers.add_parser(
+        "optimize-batch", help="Optimize each sequence of a FASTA file."
+    )
+    optimize_batch.add_argument(
+        "input",
+        type=pathlib.Path,
+        help="The FASTA file of sequences to optimize ('-' to read from stdin).",
+    )
+    optimize_batch.add_argument(
+        "--sequence-type",
+        type=str,
+        choices=["nucleic-acid", "amino-acid", "auto-detect"],
+        default="auto-detect",
+        help="The type of the sequences.",
+    )
+    _add_parameter_arguments(optimize_batch)
+    optimize_batch.add_argument(
+        "--random-seed",
+        type=int,
+        default=None,
+        help="The random seed of each optimization, to make them reproducible.",
+    )
+    optimize_batch.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of processes to optimize the sequences in (defaults to the number of CPUs).",
+    )
+    optimize_batch.add_argument(
+        "--completion-order",
+        action=argparse.BooleanOptionalAction,
+        help="If set, will write the results as they complete, rather than in the order of the input.",
+    )
+    optimize_batch.add_argument(
+        "--time-budget-seconds",
+        type=float,
+        default=None,
+        help="Stop each optimization after this many seconds, returning the best sequence so far.",
+    )
+    _add_search_arguments(optimize_batch)
+    optimize_batch.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=None,
+        help="The file to write the results to (defaults to stdout).",
+    )
+    optimize_batch.add_argument(
+        "--format",
+        type=str,
+        choices=["ndjson", "csv"],
+        default="ndjson",
+        help="Write a JSON object per line, or a CSV row, for each sequence.",
+    )
+    optimize_batch.set_defaults(func=_optimize_batch)
+
+    # Re-optimize
+    reoptimize_parser = subparsers.add_parser(
+        "reoptimize",
+        help="Optimize a previously optimized sequence again, only where needed.",
+    )
+    reoptimize_parser.add_argument(
+        "sequence", type=str, help="The previously optimized (and edited) sequence."
+    )
+    reoptimize_parser.add_argument(
+        "--sequence-type",
+        type=str,
+        choices=["nucleic-acid", "amino-acid"],
+        default="nucleic-acid",
+        help="The type of sequence.",
+    )
+    reoptimize_parser.add_argument(
+        "--edited",
+        type=_region,
+        action="append",
+        help="A region of the sequence that was edited, given as START-END (1-based, inclusive).",
+    )
+    reoptimize_parser.add_argument(
+        "--previous-config",
+        type=str,
+        default="",
+        help="The configuration the sequence was optimized with, given as a JSON structure (to also optimize where the objectives changed).",
+    )
+    reoptimize_parser.add_argument(
+        "--margin",
+        type=int,
+        default=30,
+        help="The number of nucleotides around each region to optimize.",
+    )
+    _add_parameter_arguments(reoptimize_parser)
+    reoptimize_parser.add_argument(
+        "--random-seed",
+        type=int,
+        default=None,
+        help="The random seed, to make the optimization reproducible.",
+    )
+    reoptimize_parser.add_argument(
+        "--time-budget-seconds",
+        type=float,
+        default=None,
+        help="Stop the optimization after this many seconds, returning the best sequence so far.",
+    )
+    _add_search_arguments(reoptimize_parser)
+    reoptimize_parser.add_argument(
+        "--format", type=str, choices=["yaml", "json"], default="yaml"
+    )
+    reoptimize_parser.set_defaults(func=_reoptimize)
+
+    # Sweep
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Optimize a sequence over a grid of parameters, and find the best trade-offs.",
+    )
+    sweep_parser.add_argument("sequence", type=str, help="The sequence to optimize.")
+    sweep_parser.add_argument(
+        "--sequence-type",
+        type=str,
+        choices=["nucleic-acid", "amino-acid"],
+        default="nucleic-acid",
+        help="The type of sequence.",
+    )
+    sweep_parser.add_argument(
+        "--grid",
+        type=str,
+        required=True,
+        help='The values of each parameter field to sweep, given as a JSON structure (e.g. \'{"gc_content_global_max": [0.6, 0.7], "optimize_mfe": [-20, -40]}\').',
+    )
+    sweep_parser.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="If set, will only optimize a random sample of this many points of the grid.",
+    )
+    _add_parameter_arguments(sweep_parser)
+    sweep_parser.add_argument(
+        "--random-seed",
+        type=int,
+        default=None,
+        help="The random seed of each optimization (and of the sample), to make them reproducible.",
+    )
+    sweep_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of processes to optimize the points in (defaults to the number of CPUs).",
+    )
+    _add_search_arguments(sweep_parser)
+    sweep_parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="If set, will reuse the results of previous optimizations with the same inputs (only seeded optimizations are cached).",
+    )
+    sweep_parser.add_argument(
+        "--cache-db",
+        type=pathlib.Path,
+        default=OPTIMIZATION_CACHE_DB,
+        help="The path of the optimization cache.",
+    )
+    sweep_parser.add_argument(
+        "--format", type=str, choices=["yaml", "json", "csv"], default="yaml"
+    )
+    sweep_parser.set_defaults(func=_sweep)
+
     # Analyze
     analyze = subparsers.add_parser("analyze", help="Analyze a sequence.")
     analyze.add_argument("sequence", type=str, help="The sequence to analyze.")
@@ -1,11 +1,14 @@
 import functools
+import math
 import pathlib
 
 import msgspec
+import numpy as np
 
 from .constants import (
     AMINO_ACIDS,
     CODONS,
+    ORDERED_CODONS,
     CodonTable,
 )
 from .types import AminoAcid, Codon
@@ -72,6 +75,69 @@ class CodonUsageTable(msgspec.Struct, frozen=True):
         amino_acid = CodonTable.amino_acid(codon)
         return self.usage[codon].frequency / self.most_frequent(amino_acid).frequency
 
+    @property
+    @functools.cache
+    def weights(self) -> np.ndarray:
+        """The weight of each codon, indexed as in `ORDERED_CODONS`.
+        Codons of amino acids that are never used by the table have a `nan` weight.
+        """
+
+        def _weight(codon: Codon) -> float:
+            try:
+                return self.weight(codon)
+            except ZeroDivisionError:
+                return math.nan
+
+        weights = np.array([_weight(codon) for codon in ORDERED_CODONS])
+        weights.flags.writeable = False
+        return weights
+
+    @property
+    @functools.cache
+    def log_weights(self) -> np.ndarray:
+        """The natural logarithm of `weights` (`-inf` for zero weights)."""
+
+        def _log(weight: float) -> float:
+            if weight == 0:
+                return -math.inf
+            return math.log(weight) if weight > 0 else math.nan
+
+        log_weights = np.array([_log(weight) for weight in self.weights.tolist()])
+        log_weights.flags.writeable = False
+        return log_weights
+
+    @property
+    @functools.cache
+    def preferred_codons(self) -> np.ndarray:
+        """A mask of the most frequent codon of each amino acid, indexed as in `ORDERED_CODONS`."""
+        mask = np.array(
+            [
+                self.most_frequent(CodonTable.amino_acid(codon)).codon == codon
+                for codon in ORDERED_CODONS
+            ]
+        )
+        mask.flags.writeable = False
+        return mask
+
+    @property
+    @functools.cache
+    def rare_codons(self) -> np.ndarray:
+        """A mask of the least frequent codon of each amino acid (unless it is also
+        the most frequent), indexed as in `ORDERED_CODONS`.
+        """
+
+        def _is_rare(codon: Codon) -> bool:
+            amino_acid = CodonTable.amino_acid(codon)
+            least_frequent = self.least_frequent(amino_acid).codon
+            return (
+                codon == least_frequent
+                and least_frequent != self.most_frequent(amino_acid).codon
+            )
+
+        mask = np.array([_is_rare(codon) for codon in ORDERED_CODONS])
+        mask.flags.writeable = False
+        return mask
+
     def to_dnachisel_dict(self) -> dict[str, dict[str, float]]:
         return {
             amino_acid: {
@@ -1,3 +1,17 @@
-from .codon_table import AMINO_ACID_TO_CODONS_MAP, AMINO_ACIDS, CODONS, CodonTable
+from .codon_table import (
+    AMINO_ACID_TO_CODONS_MAP,
+    AMINO_ACIDS,
+    CODONS,
+    NUCLEOTIDES,
+    ORDERED_CODONS,
+    CodonTable,
+)
 
-__all__ = ["CodonTable", "CODONS", "AMINO_ACIDS", "AMINO_ACID_TO_CODONS_MAP"]
+__all__ = [
+    "CodonTable",
+    "CODONS",
+    "AMINO_ACIDS",
+    "AMINO_ACID_TO_CODONS_MAP",
+    "NUCLEOTIDES",
+    "ORDERED_CODONS",
+]
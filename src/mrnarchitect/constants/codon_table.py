@@ -1,3 +1,4 @@
+import itertools
 import typing
 
 from mrnarchitect.types import AminoAcid, AminoAcid3, AminoAcidName, Codon
@@ -5,6 +6,16 @@ from mrnarchitect.types import AminoAcid, AminoAcid3, AminoAcidName, Codon
 AMINO_ACIDS = set(typing.get_args(AminoAcid))
 
 
+NUCLEOTIDES = "ACGT"
+"""The nucleotides, in the order used when encoding sequences as integers."""
+
+
+ORDERED_CODONS: list[Codon] = [
+    typing.cast(Codon, "".join(it)) for it in itertools.product(NUCLEOTIDES, repeat=3)
+]
+"""All codons, ordered by their integer encoding (`16 * n1 + 4 * n2 + n3`)."""
+
+
 CODONS = set(typing.get_args(Codon))
 
 
@@ -1,9 +1,12 @@
 import csv
 import functools
+import math
 import pathlib
 
+import numpy as np
+
 from mrnarchitect.codon_table import CodonUsageTable
-from mrnarchitect.constants import CODONS
+from mrnarchitect.constants import CODONS, ORDERED_CODONS
 from mrnarchitect.organism import (
     Organism,
     load_organism_from_database,
@@ -66,6 +69,26 @@ def load_trna_adaptation_index_dataset(
     return load_organism_from_database(organism).trna_dataset
 
 
+@functools.cache
+def load_trna_adaptation_index_log_weights(
+    organism: str = "homo-sapiens",
+) -> np.ndarray | None:
+    """Load the natural logarithm of the tAI weights for an organism, indexed as in
+    `ORDERED_CODONS`. Codons without a weight (methionine and stop codons) are `nan`.
+    """
+    trna_weights = load_trna_adaptation_index_dataset(organism)
+    if not trna_weights:
+        return None
+    log_weights = np.array(
+        [
+            math.log(trna_weights[codon]) if codon in trna_weights else math.nan
+            for codon in ORDERED_CODONS
+        ]
+    )
+    log_weights.flags.writeable = False
+    return log_weights
+
+
 @functools.cache
 def load_microrna_seed_sites() -> list[str]:
     """Load microRNA seed sites from file.
@@ -1,7 +1,20 @@
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import importlib.metadata
+import itertools
+import multiprocessing
+import os
+import re
+import time
 import timeit
 import typing
 
 import msgspec
+import numpy as np
+import proglog
 from dnachisel import Location as DnaChiselLocation
 from dnachisel.builtin_specifications import (
     AvoidHairpins,
@@ -14,7 +27,10 @@ from dnachisel.builtin_specifications import (
 )
 from dnachisel.builtin_specifications.codon_optimization import CodonOptimize
 from dnachisel.DnaOptimizationProblem import DnaOptimizationProblem, NoSolutionError
+from dnachisel.SequencePattern import SequencePattern
+from dnachisel.Specification import Specification
 
+from mrnarchitect.cache import CacheBackend, CacheStats, LRUCache, SQLiteCache
 from mrnarchitect.constants import AMINO_ACIDS, CodonTable
 from mrnarchitect.data import (
     load_codon_usage_table,
@@ -24,11 +40,22 @@ from mrnarchitect.data import (
 from mrnarchitect.organism import Organism
 from mrnarchitect.sequence import Sequence
 
-from .specifications.constraints import CAIRange
-from .specifications.objectives import OptimizeTAI, TargetPseudoMFE
+from .codon_engine import CodonBeamSearch, CodonSearch
+from .profiling import OptimizationProfile, Profiler
+from .specifications.constraints import AvoidPatterns, CAIRange, PatternAutomaton
+from .specifications.objectives import OptimizeTAI, TargetPseudoMFE, TargetWindowedMFE
 
 OptimizationError = NoSolutionError
 
+SpecificationTemplate = typing.Callable[[DnaChiselLocation | None], Specification]
+"""Creates a specification over a location (or the whole sequence)."""
+
+SPECIFICATION_TEMPLATE_CACHE = LRUCache(max_entries=256)
+"""The templates of the specifications of each `OptimizationParameter` (without its
+location). Building the specifications involves loading codon usage tables (from
+the organism database) and compiling the avoided patterns, so it is only done once,
+and each optimization binds the templates to its locations."""
+
 
 class Location(msgspec.Struct, frozen=True, kw_only=True):
     start_coordinate: int | None = None
@@ -68,6 +95,10 @@ class OptimizationParameter(
     organism: Organism | str | None = None
     optimize_cai: bool = False
     optimize_mfe: float | None = None
+    optimize_windowed_mfe: float | None = None
+    windowed_mfe_window_size: int = 40
+    windowed_mfe_step: int = 4
+    windowed_mfe_max_bp_span: int | None = None
     optimize_tai: float | None = None
     avoid_repeat_length: int | None = None
     enable_uridine_depletion: bool = False
@@ -110,6 +141,9 @@ class OptimizationParameter(
                 "GC content window minimum must be less than window maximum."
             )
 
+        if self.windowed_mfe_window_size < 1 or self.windowed_mfe_step < 1:
+            raise ValueError("Windowed MFE window size and step must be at least 1.")
+
     def dnachisel(self, nucleic_acid_sequence: str) -> tuple[list, list]:
         location = self.dnachisel_location
         if self.enforce_sequence:
@@ -122,18 +156,45 @@ class OptimizationParameter(
                 )
             ], []
 
-        constraints: list = [EnforceTranslation()]
-        objectives: list = []
+        constraints, objectives = self.templates()
+        return [it(location) for it in constraints], [it(location) for it in objectives]
+
+    def templates(
+        self,
+    ) -> tuple[list[SpecificationTemplate], list[SpecificationTemplate]]:
+        """The (cached) templates of the constraints and objectives."""
+        # Parameters that only differ by location share their templates
+        key = msgspec.json.encode(
+            msgspec.structs.replace(self, start_coordinate=None, end_coordinate=None)
+        )
+        templates = SPECIFICATION_TEMPLATE_CACHE.get(key, None)
+        if templates is None:
+            templates = self._compile_specifications()
+            SPECIFICATION_TEMPLATE_CACHE.put(key, templates)
+        return templates
+
+    def _compile_specifications(
+        self,
+    ) -> tuple[list[SpecificationTemplate], list[SpecificationTemplate]]:
+        """Build the templates of the constraints and objectives, with all of their
+        (location-independent) inputs prepared.
+        """
+
+        def template(cls, *args, **kwargs) -> SpecificationTemplate:
+            return lambda location: cls(*args, location=location, **kwargs)
+
+        constraints: list[SpecificationTemplate] = [lambda _: EnforceTranslation()]
+        objectives: list[SpecificationTemplate] = []
 
         if (
             self.gc_content_global_min is not None
             and self.gc_content_global_max is not None
         ):
             constraints.append(
-                EnforceGCContent(
-                    mini=self.gc_content_global_min,  # type: ignore
+                template(
+                    EnforceGCContent,
+                    mini=self.gc_content_global_min,
                     maxi=self.gc_content_global_max,
-                    location=location,
                 )
             )
         if (
@@ -142,38 +203,31 @@ class OptimizationParameter(
             and self.gc_content_window_size is not None
         ):
             constraints.append(
-                EnforceGCContent(
-                    mini=self.gc_content_window_min,  # type: ignore
+                template(
+                    EnforceGCContent,
+                    mini=self.gc_content_window_min,
                     maxi=self.gc_content_window_max,
                     window=self.gc_content_window_size,
-                    location=location,
                 )
             )
 
         if self.hairpin_stem_size is not None and self.hairpin_window is not None:
             constraints.append(
-                AvoidHairpins(
+                template(
+                    AvoidHairpins,
                     stem_size=self.hairpin_stem_size,
                     hairpin_window=self.hairpin_window,
-                    location=location,
                 )
             )
+        avoid_patterns: list[str] = []
         if self.avoid_poly_a is not None:
-            constraints.append(
-                AvoidPattern(f"{self.avoid_poly_a}xA", location=location)
-            )
+            avoid_patterns.append(f"{self.avoid_poly_a}xA")
         if self.avoid_poly_c is not None:
-            constraints.append(
-                AvoidPattern(f"{self.avoid_poly_c}xC", location=location)
-            )
+            avoid_patterns.append(f"{self.avoid_poly_c}xC")
         if self.avoid_poly_g is not None:
-            constraints.append(
-                AvoidPattern(f"{self.avoid_poly_g}xG", location=location)
-            )
+            avoid_patterns.append(f"{self.avoid_poly_g}xG")
         if self.avoid_poly_t is not None:
-            constraints.append(
-                AvoidPattern(f"{self.avoid_poly_t}xT", location=location)
-            )
+            avoid_patterns.append(f"{self.avoid_poly_t}xT")
 
         if self.enable_uridine_depletion:
             uridine_depletion_codon_usage_table = {
@@ -184,99 +238,355 @@ class OptimizationParameter(
                 for amino_acid in AMINO_ACIDS
             }
             constraints.append(
-                AvoidRareCodons(
+                template(
+                    AvoidRareCodons,
                     0.5,
                     codon_usage_table=uridine_depletion_codon_usage_table,
-                    location=location,
                 )
             )
 
         if self.avoid_ribosome_slip:
-            constraints.append(AvoidPattern("3xT", location=location))
+            avoid_patterns.append("3xT")
 
         if self.avoid_micro_rna_seed_sites:
-            micro_rna_sites = load_microrna_seed_sites()
-            for site in micro_rna_sites:
-                constraints.append(AvoidPattern(site, location=location))
+            avoid_patterns.extend(load_microrna_seed_sites())
 
         if self.avoid_manufacture_restriction_sites:
-            manufacture_restriction_sites = load_manufacture_restriction_sites()
-            for site in manufacture_restriction_sites:
-                constraints.append(AvoidPattern(site, location=location))
-
-        cut_site_constraints = [
-            AvoidPattern(f"{site}_site", location=location)
-            for site in self.avoid_restriction_sites
-            if site
-        ]
-        constraints.extend(cut_site_constraints)
+            avoid_patterns.extend(load_manufacture_restriction_sites())
 
-        custom_pattern_constraints = [
-            AvoidPattern(it, location=location) for it in self.avoid_sequences if it
+        avoid_patterns.extend(
+            f"{site}_site" for site in self.avoid_restriction_sites if site
+        )
+
+        avoid_patterns.extend(it for it in self.avoid_sequences if it)
+
+        # Fixed patterns are all found by a single automaton, any others (e.g.
+        # regular expressions) are avoided individually
+        sequence_patterns = [SequencePattern.from_string(it) for it in avoid_patterns]
+        automaton_patterns = [
+            it for it in sequence_patterns if PatternAutomaton.supports(it)
         ]
-        constraints.extend(custom_pattern_constraints)
+        if automaton_patterns:
+            constraints.append(
+                template(AvoidPatterns, PatternAutomaton(automaton_patterns))
+            )
+        constraints.extend(
+            template(AvoidPattern, it)
+            for it in sequence_patterns
+            if not PatternAutomaton.supports(it)
+        )
 
         if self.organism and self.cai_min is not None and self.cai_max is not None:
             constraints.append(
-                CAIRange(
+                template(
+                    CAIRange,
                     codon_usage_table=load_codon_usage_table(self.organism),
                     cai_min=self.cai_min,
                     cai_max=self.cai_max,
-                    location=location,
                 )
             )
 
         if self.organism and self.optimize_cai:
             objectives.append(
-                CodonOptimize(
+                template(
+                    CodonOptimize,
                     codon_usage_table=load_codon_usage_table(
                         self.organism
                     ).to_dnachisel_dict(),
                     method="use_best_codon",
-                    location=location,
                 )
             )
 
         if self.optimize_mfe:
             objectives.append(
-                TargetPseudoMFE(
-                    target_pseudo_mfe=self.optimize_mfe,
-                    location=location,
+                template(TargetPseudoMFE, target_pseudo_mfe=self.optimize_mfe)
+            )
+
+        if self.optimize_windowed_mfe is not None:
+            objectives.append(
+                template(
+                    TargetWindowedMFE,
+                    target_mfe=self.optimize_windowed_mfe,
+                    window_size=self.windowed_mfe_window_size,
+                    step=self.windowed_mfe_step,
+                    max_bp_span=self.windowed_mfe_max_bp_span,
                 )
             )
 
         if self.optimize_tai:
             objectives.append(
-                OptimizeTAI(
+                template(
+                    OptimizeTAI,
                     target_tai=self.optimize_tai,
-                    location=location,
+                    organism=self.organism or "homo-sapiens",
                 )
             )
 
         if self.avoid_repeat_length is not None:
-            objectives.append(
-                UniquifyAllKmers(k=self.avoid_repeat_length, location=location)
-            )
+            objectives.append(template(UniquifyAllKmers, k=self.avoid_repeat_length))
 
         return constraints, objectives
 
 
-class OptimizationResult(msgspec.Struct, kw_only=True):
+class EarlyStopping(msgspec.Struct, frozen=True, kw_only=True):
+    """Stops each random search of the objectives once it stops improving, rather
+    than running all of its `max_random_iters` iterations.
+
+    A search is stopped once its objective score increased by no more than
+    `min_delta` over the last `patience` iterations. With the default `min_delta`,
+    that is after `patience` iterations without any improvement (or `patience + 1`
+    from the start of the search, as in DnaChisel).
+
+    The `DEFAULT_EARLY_STOPPING` policy (100 iterations without improvement) is the
+    one DnaChisel applies by default.
+    """
+
+    patience: int
+    """The number of iterations over which the score must improve."""
+    min_delta: float = 0.0
+    """The increase in score over `patience` iterations below which the search
+    stops."""
+
+    def __post_init__(self):
+        if self.patience < 1:
+            raise ValueError("`patience` must be at least 1.")
+        if self.min_delta < 0:
+            raise ValueError("`min_delta` must not be negative.")
+
+
+DEFAULT_EARLY_STOPPING = EarlyStopping(patience=100)
+
+StopReason = typing.Literal["completed", "converged", "stopped"]
+
+Engine = typing.Literal["dnachisel", "codon", "beam"]
+
+
+class OptimizationResult(msgspec.Struct, kw_only=True, omit_defaults=True):
     class Error(msgspec.Struct, kw_only=True):
         message: str
         problem: str | None
         constraint: str | None
         location: str | None
 
+        @classmethod
+        def from_exception(cls, e: OptimizationError) -> "OptimizationResult.Error":
+            return cls(
+                message=str(e.message),
+                problem=str(e.problem),
+                location=str(e.location),
+                constraint=str(e.constraint),
+            )
+
     class Result(msgspec.Struct, kw_only=True):
         sequence: Sequence
         constraints: str | None
         objectives: str | None
 
+    class Run(msgspec.Struct, kw_only=True):
+        random_seed: int
+        success: bool
+        score: float | None
+        """The sum of the objective scores, or None if the run did not complete."""
+        stopped: bool
+        """Whether the run was stopped before it completed."""
+        time_in_seconds: float
+
+    class Segment(msgspec.Struct, kw_only=True):
+        start_coordinate: int
+        """The start coordinate (1-based)."""
+        end_coordinate: int
+        """The end coordinate (1-based, inclusive)."""
+        success: bool
+        time_in_seconds: float
+
     success: bool
     result: Result | None
     error: Error | None
     time_in_seconds: float
+    runs: list[Run] | None = None
+    """The runs of a multi-start optimization, in the order they completed."""
+    segments: list[Segment] | None = None
+    """The segments of a segmented optimization."""
+    global_check_passed: bool | None = None
+    """Whether the stitched segments passed the constraints over the whole sequence."""
+    partial: bool = False
+    """Whether the optimization was stopped (by its time budget) before it completed,
+    so the result is the best sequence found so far."""
+    iterations: int | None = None
+    """The number of mutations evaluated by the search."""
+    stop_reason: StopReason | None = None
+    """Why the optimization ended: `completed` if every search ran until it reached
+    its `max_random_iters` (or the best possible score), `converged` if any search
+    was stopped early by the `early_stopping` policy, and `stopped` if the
+    optimization was stopped before it completed (see `partial`)."""
+    profile: OptimizationProfile | None = None
+    """Where the time of the optimization went, if it was profiled."""
+    unsupported: list[str] | None = None
+    """The constraints and objectives not supported by the codon (or beam) engine,
+    which were left to DnaChisel."""
+    mutable_regions: list[Location] | None = None
+    """The regions a re-optimization was allowed to change (see `reoptimize`)."""
+
+
+class _OptimizationStopped(Exception):
+    """Raised from the logger to stop an optimization from within DnaChisel."""
+
+
+class _OptimizationLogger(proglog.ProgressBarLogger):
+    """Follows an optimization from within DnaChisel's search loops.
+
+    Reports the progress of the optimization as a ratio from 0 to 1 (resolving the
+    constraints accounts for the first half, and optimizing the objectives for the
+    second half), counts the search iterations, and stops the optimization once
+    `should_stop` returns True or the `deadline` passes.
+    """
+
+    _PHASES = {"constraint": 0.0, "objective": 0.5}
+
+    def __init__(
+        self,
+        callback: typing.Callable[[float], None] | None = None,
+        should_stop: typing.Callable[[], bool] | None = None,
+    ):
+        super().__init__(logged_bars=None)
+        self._callback = callback
+        self._should_stop = should_stop
+        self.deadline: float | None = None
+        """The time (of `time.monotonic`) after which the optimization is stopped."""
+        self.iterations = 0
+        """The number of mutations evaluated by the searches."""
+        self.accepted = 0
+        """The number of mutations kept by the searches."""
+        self._sequence: str | None = None
+        self.converged = False
+        """Whether any search was stopped early by its `EarlyStopping` policy."""
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if (self.deadline is not None and time.monotonic() >= self.deadline) or (
+            self._should_stop is not None and self._should_stop()
+        ):
+            raise _OptimizationStopped()
+        if bar == "mutation" and attr == "message" and value == "converged":
+            self.converged = True
+        if attr != "index":
+            return
+        if bar == "mutation":
+            # Each index is set before its mutation is evaluated, and a search that
+            # exits early jumps straight to the end of the bar (which DnaChisel
+            # sometimes sets to a range rather than an int). A search that exits as
+            # it finds a solution has evaluated (and kept) one more mutation.
+            sequence = self.stored["local_problem"].sequence
+            if value == 0:
+                self._sequence = sequence
+                return
+            changed = sequence is not self._sequence and sequence != self._sequence
+            if changed:
+                self.accepted += 1
+                self._sequence = sequence
+            if changed or (isinstance(value, int) and value - 1 == old_value):
+                self.iterations += 1
+        elif self._callback is not None and bar in self._PHASES:
+            total = self.bars[bar]["total"]
+            if total:
+                self._callback(self._PHASES[bar] + 0.5 * min(value / total, 1.0))
+
+    def store_callback(self, **kw):
+        # DnaChisel creates the local problems (whose searches run the mutations)
+        # with a logger of their own, and without the settings it does not know of,
+        # so take over from it.
+        if (local_problem := kw.get("local_problem")) is not None:
+            local_problem.logger = self
+            if isinstance(local_problem, _DnaOptimizationProblem):
+                local_problem.early_stopping = kw["problem"].early_stopping
+
+
+class _DnaOptimizationProblem(DnaOptimizationProblem):
+    """A DnaChisel problem whose random searches stop early following an
+    `EarlyStopping` policy (in place of DnaChisel's stagnation tolerance), or run
+    all of their iterations without one.
+    """
+
+    early_stopping: EarlyStopping | None = None
+
+    def optimize_by_random_mutations(self):
+        if not self.all_constraints_pass():
+            raise ValueError(
+                self.constraints_text_summary()
+                + "Optimization can only be done when all constraints are verified"
+            )
+
+        score = self.objective_scores_sum()
+        if all(it.best_possible_score is not None for it in self.objectives):
+            best_possible_score = sum(
+                it.best_possible_score * it.boost for it in self.objectives
+            )
+        else:
+            best_possible_score = None
+        # The scores after each of the last `patience + 1` iterations. The score
+        # before the search is left out, so that a search which never improves
+        # runs `patience + 1` iterations, as DnaChisel's do.
+        early_stopping = self.early_stopping
+        scores = collections.deque(
+            maxlen=early_stopping.patience + 1 if early_stopping else 1
+        )
+        iters = self.max_random_iters
+        for _ in self.logger.iter_bar(mutation=range(iters)):
+            if best_possible_score is not None and score >= best_possible_score:
+                self.logger(mutation__index=iters)
+                break
+            if (
+                early_stopping is not None
+                and len(scores) == scores.maxlen
+                and scores[-1] - scores[0] <= early_stopping.min_delta
+            ):
+                self.logger(mutation__message="converged")
+                break
+
+            previous_sequence = self.sequence
+            self.sequence = self.mutation_space.apply_random_mutations(  # type: ignore
+                n_mutations=self.mutations_per_iteration, sequence=self.sequence
+            )
+            if self.all_constraints_pass():
+                new_score = self.objective_scores_sum()
+                if new_score > score:
+                    score = new_score
+                else:
+                    self.sequence = previous_sequence
+            else:
+                self.sequence = previous_sequence
+            scores.append(score)
+
+
+class _StopCondition:
+    """Stops the runs of a multi-start optimization once an event is set (by a run
+    that met the target score) or a deadline passes.
+
+    The event lives in a manager process, so it is only checked every `interval`
+    seconds.
+    """
+
+    def __init__(self, event, deadline: float | None, interval: float = 0.05):
+        self.event = event
+        self.deadline = deadline
+        """The time (seconds since the epoch) after which runs are stopped."""
+        self.interval = interval
+        self._checked_at = -float("inf")
+
+    def __call__(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return False
+        self._checked_at = now
+        return (
+            self.deadline is not None and time.time() >= self.deadline
+        ) or self.event.is_set()
+
+
+_CONSTRAINTS_TIME_BUDGET_SHARE = 0.5
+"""The share of the time budget given to resolving the constraints. Any time left
+over is given to optimizing the objectives."""
+
+OptimizationPhase = typing.Literal["constraints", "objectives"]
 
 
 def _optimize(
@@ -284,27 +594,70 @@ def _optimize(
     parameters: typing.Sequence[OptimizationParameter],
     max_random_iters: int,
     mutations_per_iteration: int,
-) -> DnaOptimizationProblem:
+    logger: _OptimizationLogger,
+    random_seed: int | None = None,
+    time_budget_seconds: float | None = None,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    profiler: Profiler | None = None,
+) -> tuple[DnaOptimizationProblem, OptimizationPhase | None]:
+    """Optimize the sequence, returning the problem (holding the best sequence so
+    far) and the phase in which it was stopped (if it was).
+    """
     constraints, objectives = [], []
     for p in parameters:
         c, o = p.dnachisel(nucleic_acid_sequence)
         constraints.extend(c)
         objectives.extend(o)
 
-    optimization_problem = DnaOptimizationProblem(
+    optimization_problem = _DnaOptimizationProblem(
         sequence=nucleic_acid_sequence,
         constraints=constraints,
         objectives=objectives,
-        logger=None,  # type: ignore
+        logger=logger,  # type: ignore
     )
     optimization_problem.max_random_iters = max_random_iters
     optimization_problem.mutations_per_iteration = mutations_per_iteration
+    optimization_problem.early_stopping = early_stopping
+    if profiler is not None:
+        profiler.instrument(optimization_problem)
 
-    optimization_problem.resolve_constraints()
+    start = time.monotonic()
+    stopped: OptimizationPhase | None = None
+    # DnaChisel draws its random mutations from the global NumPy generator
+    random_state = np.random.get_state()
+    if random_seed is not None:
+        np.random.seed(random_seed)
+    try:
+        # A stopped phase leaves the problem with the sequence from its last
+        # completed (local) search, so it is the best so far
+        if time_budget_seconds is not None:
+            logger.deadline = (
+                start + time_budget_seconds * _CONSTRAINTS_TIME_BUDGET_SHARE
+            )
+        try:
+            with (
+                profiler.phase("constraints") if profiler else contextlib.nullcontext()
+            ):
+                optimization_problem.resolve_constraints()
+        except _OptimizationStopped:
+            stopped = "constraints"
 
-    optimization_problem.optimize()
+        if stopped is None:
+            if time_budget_seconds is not None:
+                logger.deadline = start + time_budget_seconds
+            try:
+                with (
+                    profiler.phase("objectives")
+                    if profiler
+                    else contextlib.nullcontext()
+                ):
+                    optimization_problem.optimize()
+            except _OptimizationStopped:
+                stopped = "objectives"
+    finally:
+        np.random.set_state(random_state)
 
-    return optimization_problem
+    return optimization_problem, stopped
 
 
 DEFAULT_OPTIMIZATION_PARAMETER = OptimizationParameter(
@@ -332,44 +685,1045 @@ DEFAULT_OPTIMIZATION_PARAMETER = OptimizationParameter(
 )
 
 
+class OptimizationCacheStats(msgspec.Struct, kw_only=True):
+    entries: int
+    bytes: int
+    max_entries: int | None
+    max_bytes: int | None
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class OptimizationCache:
+    """Caches the results of `optimize` under a hash of its inputs.
+
+    Results are stored as JSON in a `CacheBackend`, so an `LRUCache` keeps them
+    in memory and a `SQLiteCache` shares them between processes.
+
+    Only seeded optimizations are cached: an unseeded one is expected to differ
+    from run to run, so rerunning it always gets a fresh attempt.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @classmethod
+    def from_env(cls) -> "OptimizationCache":
+        """Configure a cache from `MRNARCHITECT_OPTIMIZATION_CACHE_*` environment
+        variables, using a `SQLiteCache` if `MRNARCHITECT_OPTIMIZATION_CACHE_DB` is
+        set and an `LRUCache` otherwise.
+        """
+        max_entries = int(
+            os.getenv("MRNARCHITECT_OPTIMIZATION_CACHE_MAX_ENTRIES", 1024)
+        )
+        max_bytes = int(
+            os.getenv("MRNARCHITECT_OPTIMIZATION_CACHE_MAX_BYTES", 64 * 1024**2)
+        )
+        path = os.getenv("MRNARCHITECT_OPTIMIZATION_CACHE_DB")
+        if path:
+            return cls(SQLiteCache(path, max_entries=max_entries, max_bytes=max_bytes))
+        return cls(LRUCache(max_entries=max_entries, max_bytes=max_bytes))
+
+    @staticmethod
+    def key(
+        sequence: Sequence,
+        parameters: typing.Sequence[OptimizationParameter] | None = None,
+        max_random_iters: int = 20_000,
+        mutations_per_iteration: int = 2,
+        random_seed: int | None = None,
+        restarts: int = 1,
+        target_score: float | None = None,
+        time_budget_seconds: float | None = None,
+        segment_length: int | None = None,
+        segment_overlap: int = 90,
+        early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+        engine: Engine = "dnachisel",
+        beam_width: int = 64,
+    ) -> str:
+        """A canonical hash of the inputs of `optimize`.
+
+        The version of mRNArchitect is part of the hash, so results cached by an older
+        version are never reused.
+
+        >>> OptimizationCache.key(Sequence("ACG")) == OptimizationCache.key(
+        ...     Sequence("ACG"), [DEFAULT_OPTIMIZATION_PARAMETER]
+        ... )
+        True
+        >>> OptimizationCache.key(Sequence("ACG")) == OptimizationCache.key(
+        ...     Sequence("ACG"), random_seed=1
+        ... )
+        False
+        """
+        inputs = {
+            "version": importlib.metadata.version("mrnarchitect"),
+            "sequence": sequence.nucleic_acid_sequence,
+            "parameters": parameters or [DEFAULT_OPTIMIZATION_PARAMETER],
+            "max_random_iters": max_random_iters,
+            "mutations_per_iteration": mutations_per_iteration,
+            "random_seed": random_seed,
+            "restarts": restarts,
+            "target_score": target_score,
+            "time_budget_seconds": time_budget_seconds,
+            "segment_length": segment_length,
+            "segment_overlap": segment_overlap,
+            "early_stopping": early_stopping,
+            "engine": engine,
+            "beam_width": beam_width,
+        }
+        return hashlib.sha256(msgspec.json.encode(inputs, order="sorted")).hexdigest()
+
+    def get(self, key: str, random_seed: int | None) -> OptimizationResult | None:
+        """The cached result, or None if there is none or the run is unseeded."""
+        if random_seed is None:
+            return None
+        value = self.backend.get(key, None)
+        if value is None:
+            return None
+        return msgspec.json.decode(value, type=OptimizationResult)
+
+    def put(self, key: str, result: OptimizationResult, random_seed: int | None):
+        """Cache the result of a seeded run. Partial results depend on the speed of
+        the run, so are never cached.
+        """
+        if random_seed is not None and not result.partial:
+            self.backend.put(key, msgspec.json.encode(result))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> OptimizationCacheStats:
+        stats: CacheStats = self.backend.stats()
+        return OptimizationCacheStats(
+            entries=len(self.backend),
+            bytes=self.backend.bytes,
+            max_entries=self.backend.max_entries,
+            max_bytes=self.backend.max_bytes,
+            hits=stats.hits,
+            misses=stats.misses,
+            evictions=stats.evictions,
+            hit_rate=stats.hit_rate,
+        )
+
+
+OPTIMIZATION_CACHE = OptimizationCache.from_env()
+"""The cache of optimization results shared by the API."""
+
+
+def _run(
+    sequence: Sequence,
+    parameters: typing.Sequence[OptimizationParameter],
+    max_random_iters: int,
+    mutations_per_iteration: int,
+    progress: typing.Callable[[float], None] | None = None,
+    random_seed: int | None = None,
+    should_stop: typing.Callable[[], bool] | None = None,
+    time_budget_seconds: float | None = None,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    profile: bool = False,
+) -> tuple[OptimizationResult, float | None]:
+    """Run a single optimization, returning its result and the sum of its objective
+    scores (or None if the constraints were not resolved).
+    """
+    start = timeit.default_timer()
+    logger = _OptimizationLogger(progress, should_stop)
+    profiler = Profiler() if profile else None
+    try:
+        problem, stopped = _optimize(
+            sequence.nucleic_acid_sequence,
+            parameters=parameters,
+            max_random_iters=max_random_iters,
+            mutations_per_iteration=mutations_per_iteration,
+            logger=logger,
+            random_seed=random_seed,
+            time_budget_seconds=time_budget_seconds,
+            early_stopping=early_stopping,
+            profiler=profiler,
+        )
+    except OptimizationError as e:
+        return OptimizationResult(
+            success=False,
+            result=None,
+            error=OptimizationResult.Error.from_exception(e),
+            time_in_seconds=(timeit.default_timer() - start),
+            iterations=logger.iterations,
+            profile=profiler.profile(logger.iterations, logger.accepted)
+            if profiler
+            else None,
+        ), None
+    if progress and stopped is None:
+        progress(1.0)
+    success = stopped != "constraints"
+    return OptimizationResult(
+        success=success,
+        result=OptimizationResult.Result(
+            sequence=Sequence(problem.sequence),
+            constraints=problem.constraints_text_summary(),
+            objectives=problem.objectives_text_summary(),
+        ),
+        error=None
+        if success
+        else OptimizationResult.Error(
+            message="Ran out of time before the constraints were resolved.",
+            problem=None,
+            constraint=None,
+            location=None,
+        ),
+        time_in_seconds=(timeit.default_timer() - start),
+        partial=stopped is not None,
+        iterations=logger.iterations,
+        stop_reason="stopped"
+        if stopped is not None
+        else "converged"
+        if logger.converged
+        else "completed",
+        profile=profiler.profile(logger.iterations, logger.accepted)
+        if profiler
+        else None,
+    ), float(problem.objectives_evaluations().scores_sum()) if success else None
+
+
+def _run_codon_engine(
+    sequence: Sequence,
+    parameters: typing.Sequence[OptimizationParameter],
+    max_random_iters: int,
+    mutations_per_iteration: int,
+    progress: typing.Callable[[float], None] | None = None,
+    random_seed: int | None = None,
+    time_budget_seconds: float | None = None,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    engine: Engine = "codon",
+    beam_width: int = 64,
+) -> OptimizationResult:
+    """Run a single optimization with the codon (or beam) engine, then finish it with
+    DnaChisel if the engine does not support all of the parameters (or did not
+    resolve the constraints).
+    """
+    start = timeit.default_timer()
+    nucleic_acid_sequence = sequence.nucleic_acid_sequence
+    constraints, objectives = [], []
+    for p in parameters:
+        c, o = p.dnachisel(nucleic_acid_sequence)
+        constraints.extend(c)
+        objectives.extend(o)
+    problem = DnaOptimizationProblem(
+        sequence=nucleic_acid_sequence,
+        constraints=constraints,
+        objectives=objectives,
+        logger=None,  # type: ignore
+    )
+    designed: str | None = None
+    try:
+        search = (
+            CodonBeamSearch(problem, beam_width=beam_width)
+            if engine == "beam"
+            else CodonSearch(problem, random_seed=random_seed)
+        )
+    except ValueError:
+        # The sequence is not made of whole codons, so it is left to DnaChisel
+        iterations = 0
+        unsupported = [*problem.constraints, *problem.objectives]
+    else:
+        # The beam search fails if it loses every design satisfying the constraints,
+        # leaving DnaChisel to optimize the original sequence
+        designed = (
+            search.run()
+            if isinstance(search, CodonBeamSearch)
+            else search.run(max_random_iters)
+        )
+        if designed is not None:
+            problem.sequence = designed
+        iterations = search.iterations
+        unsupported = search.unsupported
+
+    if designed is not None and not unsupported and problem.all_constraints_pass():
+        if progress:
+            progress(1.0)
+        return OptimizationResult(
+            success=True,
+            result=OptimizationResult.Result(
+                sequence=Sequence(problem.sequence),
+                constraints=problem.constraints_text_summary(),
+                objectives=problem.objectives_text_summary(),
+            ),
+            error=None,
+            time_in_seconds=timeit.default_timer() - start,
+            iterations=iterations,
+            stop_reason="completed",
+        )
+
+    result, _ = _run(
+        Sequence(problem.sequence),
+        parameters,
+        max_random_iters,
+        mutations_per_iteration,
+        progress=progress,
+        random_seed=random_seed,
+        time_budget_seconds=max(
+            0.0, time_budget_seconds - (timeit.default_timer() - start)
+        )
+        if time_budget_seconds is not None
+        else None,
+        early_stopping=early_stopping,
+    )
+    return msgspec.structs.replace(
+        result,
+        time_in_seconds=timeit.default_timer() - start,
+        iterations=iterations + (result.iterations or 0),
+        unsupported=[str(it) for it in unsupported] or None,
+    )
+
+
+def _run_seeded(
+    sequence: Sequence,
+    parameters: typing.Sequence[OptimizationParameter],
+    max_random_iters: int,
+    mutations_per_iteration: int,
+    random_seed: int,
+    should_stop: _StopCondition,
+    early_stopping: EarlyStopping | None,
+    profile: bool,
+) -> tuple[OptimizationResult, OptimizationResult.Run]:
+    """Run one optimization of a multi-start optimization, in a worker process."""
+    result, score = _run(
+        sequence,
+        parameters,
+        max_random_iters,
+        mutations_per_iteration,
+        random_seed=random_seed,
+        should_stop=should_stop,
+        early_stopping=early_stopping,
+        profile=profile,
+    )
+    return result, OptimizationResult.Run(
+        random_seed=random_seed,
+        success=result.success,
+        score=score,
+        stopped=result.partial,
+        time_in_seconds=result.time_in_seconds,
+    )
+
+
+def _optimize_portfolio(
+    sequence: Sequence,
+    parameters: typing.Sequence[OptimizationParameter],
+    max_random_iters: int,
+    mutations_per_iteration: int,
+    restarts: int,
+    workers: int | None,
+    random_seed: int | None,
+    target_score: float | None,
+    time_budget_seconds: float | None,
+    early_stopping: EarlyStopping | None,
+    profile: bool,
+) -> OptimizationResult:
+    """Run independently seeded optimizations across a process pool, returning the
+    best result.
+    """
+    start = timeit.default_timer()
+    seeds = np.random.SeedSequence(random_seed).generate_state(restarts).tolist()
+    deadline = time.time() + time_budget_seconds if time_budget_seconds else None
+    context = multiprocessing.get_context("forkserver")
+    best: tuple[OptimizationResult, float] | None = None
+    errors: list[OptimizationResult] = []
+    runs: list[OptimizationResult.Run] = []
+    with (
+        context.Manager() as manager,
+        concurrent.futures.ProcessPoolExecutor(
+            min(workers or os.process_cpu_count() or 1, restarts), mp_context=context
+        ) as executor,
+    ):
+        stop = manager.Event()
+        futures = [
+            executor.submit(
+                _run_seeded,
+                sequence,
+                parameters,
+                max_random_iters,
+                mutations_per_iteration,
+                seed,
+                _StopCondition(stop, deadline),
+                early_stopping,
+                profile,
+            )
+            for seed in seeds
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                continue
+            result, run = future.result()
+            runs.append(run)
+            if run.score is None:
+                errors.append(result)
+                continue
+            if best is None or run.score > best[1]:
+                best = (result, run.score)
+            if target_score is not None and run.score >= target_score:
+                stop.set()
+                for it in futures:
+                    it.cancel()
+
+    result = best[0] if best is not None else errors[0]
+    return msgspec.structs.replace(
+        result, time_in_seconds=timeit.default_timer() - start, runs=runs
+    )
+
+
+def _segment_bounds(
+    length: int, segment_length: int, segment_overlap: int
+) -> list[tuple[int, int]]:
+    """The (0-based, end exclusive) bounds of overlapping segments covering a
+    sequence.
+
+    >>> _segment_bounds(30, 12, 3)
+    [(0, 12), (9, 21), (18, 30)]
+    """
+    bounds, start = [], 0
+    while True:
+        end = min(start + segment_length, length)
+        bounds.append((start, end))
+        if end == length:
+            return bounds
+        start = end - segment_overlap
+
+
+def _shift_location(location: str | None, offset: int) -> str | None:
+    """Shift a DnaChisel location (as a string) by `offset` nucleotides, from the
+    coordinates of a segment to those of the whole sequence.
+
+    >>> _shift_location("3-10(+)", 450), _shift_location("None", 450)
+    ('453-460(+)', 'None')
+    """
+    match = re.fullmatch(r"(\d+)-(\d+)(.*)", location or "")
+    if match is None:
+        return location
+    start, end, strand = match.groups()
+    return f"{int(start) + offset}-{int(end) + offset}{strand}"
+
+
+def _restrict_parameter(
+    parameter: OptimizationParameter, start: int, end: int
+) -> OptimizationParameter | None:
+    """Restrict a parameter to the segment between `start` and `end` (0-based, end
+    exclusive), in the coordinates of the segment.
+
+    Returns None if the parameter does not apply to the segment.
+
+    >>> p = OptimizationParameter(start_coordinate=4, end_coordinate=30)
+    >>> restricted = _restrict_parameter(p, 9, 21)
+    >>> restricted.start_coordinate, restricted.end_coordinate
+    (1, 12)
+    >>> _restrict_parameter(p, 30, 42) is None
+    True
+    """
+    if parameter.start_coordinate is None or parameter.end_coordinate is None:
+        return parameter
+    start_coordinate = max(parameter.start_coordinate, start + 1)
+    end_coordinate = min(parameter.end_coordinate, end)
+    if start_coordinate >= end_coordinate:
+        return None
+    return msgspec.structs.replace(
+        parameter,
+        start_coordinate=start_coordinate - start,
+        end_coordinate=end_coordinate - start,
+    )
+
+
+def _optimize_segmented(
+    sequence: Sequence,
+    parameters: typing.Sequence[OptimizationParameter],
+    max_random_iters: int,
+    mutations_per_iteration: int,
+    segment_length: int,
+    segment_overlap: int,
+    workers: int | None,
+    random_seed: int | None,
+    early_stopping: EarlyStopping | None,
+    progress: typing.Callable[[float], None] | None = None,
+) -> OptimizationResult:
+    """Optimize overlapping segments of the sequence across a process pool, then
+    stitch them together and repair any constraints broken across the junctions.
+    """
+    start = timeit.default_timer()
+    nucleic_acid_sequence = sequence.nucleic_acid_sequence
+    bounds = _segment_bounds(
+        len(nucleic_acid_sequence), segment_length, segment_overlap
+    )
+    seeds = np.random.SeedSequence(random_seed).generate_state(len(bounds)).tolist()
+    with concurrent.futures.ProcessPoolExecutor(
+        min(workers or os.process_cpu_count() or 1, len(bounds)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run,
+                Sequence(nucleic_acid_sequence[segment_start:segment_end]),
+                [
+                    it
+                    for it in (
+                        _restrict_parameter(p, segment_start, segment_end)
+                        for p in parameters
+                    )
+                    if it is not None
+                ],
+                max_random_iters,
+                mutations_per_iteration,
+                random_seed=seed,
+                early_stopping=early_stopping,
+            )
+            for (segment_start, segment_end), seed in zip(bounds, seeds, strict=True)
+        ]
+        for completed, _ in enumerate(concurrent.futures.as_completed(futures), 1):
+            if progress is not None:
+                progress(completed / len(futures))
+        results = [future.result()[0] for future in futures]
+
+    segments = [
+        OptimizationResult.Segment(
+            start_coordinate=segment_start + 1,
+            end_coordinate=segment_end,
+            success=result.success,
+            time_in_seconds=result.time_in_seconds,
+        )
+        for (segment_start, segment_end), result in zip(bounds, results, strict=True)
+    ]
+    failed = next(
+        ((bound, it) for bound, it in zip(bounds, results) if not it.success), None
+    )
+    if failed is not None:
+        (segment_start, segment_end), result = failed
+        error = result.error
+        if error is not None:
+            # The error is in the coordinates of the segment
+            error = msgspec.structs.replace(
+                error,
+                message=f"In segment {segment_start + 1}-{segment_end}: {error.message}",
+                location=_shift_location(error.location, segment_start),
+            )
+        return msgspec.structs.replace(
+            result,
+            error=error,
+            time_in_seconds=timeit.default_timer() - start,
+            segments=segments,
+        )
+
+    # Join each pair of segments at a codon in the middle of their overlap
+    cuts = [
+        0,
+        *(
+            next_start + (end - next_start) // 6 * 3
+            for (_, end), (next_start, _) in zip(bounds, bounds[1:])
+        ),
+        len(nucleic_acid_sequence),
+    ]
+    stitched = "".join(
+        str(typing.cast(OptimizationResult.Result, result.result).sequence)[
+            cut_start - segment_start : cut_end - segment_start
+        ]
+        for (segment_start, _), result, cut_start, cut_end in zip(
+            bounds, results, cuts, cuts[1:]
+        )
+    )
+
+    constraints, objectives = [], []
+    for p in parameters:
+        c, o = p.dnachisel(nucleic_acid_sequence)
+        constraints.extend(c)
+        objectives.extend(o)
+    problem = DnaOptimizationProblem(
+        sequence=stitched,
+        constraints=constraints,
+        objectives=objectives,
+        logger=None,  # type: ignore
+    )
+    try:
+        problem.resolve_constraints(final_check=True)
+    except OptimizationError as e:
+        return OptimizationResult(
+            success=False,
+            result=None,
+            error=OptimizationResult.Error.from_exception(e),
+            time_in_seconds=timeit.default_timer() - start,
+            segments=segments,
+            global_check_passed=False,
+        )
+    return OptimizationResult(
+        success=True,
+        result=OptimizationResult.Result(
+            sequence=Sequence(problem.sequence),
+            constraints=problem.constraints_text_summary(),
+            objectives=problem.objectives_text_summary(),
+        ),
+        error=None,
+        time_in_seconds=timeit.default_timer() - start,
+        segments=segments,
+        global_check_passed=True,
+        iterations=sum(it.iterations or 0 for it in results),
+        stop_reason="converged"
+        if any(it.stop_reason == "converged" for it in results)
+        else "completed",
+    )
+
+
 def optimize(
     sequence: Sequence,
     parameters: typing.Sequence[OptimizationParameter] | None = None,
     max_random_iters: int = 20_000,
     mutations_per_iteration: int = 2,
+    progress: typing.Callable[[float], None] | None = None,
+    random_seed: int | None = None,
+    cache: OptimizationCache | None = None,
+    restarts: int = 1,
+    workers: int | None = None,
+    target_score: float | None = None,
+    time_budget_seconds: float | None = None,
+    segment_length: int | None = None,
+    segment_overlap: int = 90,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    profile: bool = False,
+    engine: Engine = "dnachisel",
+    beam_width: int = 64,
 ) -> OptimizationResult:
     """Optimize the sequence based on the configuration parameters.
 
+    If given, `progress` is called with the ratio (from 0 to 1) of the optimization
+    that has completed. Runs with the same `random_seed` are reproducible.
+
+    If a `cache` is given, a previous result for the same inputs (including the
+    `random_seed`) is returned instead of running the optimization again. Unseeded
+    optimizations are never cached.
+
+    With `restarts` greater than 1, that many independently seeded optimizations are
+    run across a pool of (at most) `workers` processes, and the result with the best
+    objective score is returned, along with a summary of each run. The remaining
+    runs are stopped once a run reaches the `target_score`. Progress is not reported
+    for these runs.
+
+    With a `time_budget_seconds`, the optimization is stopped once that many seconds
+    have passed, and the best sequence found so far is returned, flagged as
+    `partial`. Half of the budget is given to resolving the constraints, and the
+    rest (including any time left over) to optimizing the objectives. If the
+    constraints were not resolved in time, the result is also unsuccessful.
+
+    Optimizing the objectives runs a random search of up to `max_random_iters`
+    iterations over each region where they can be improved, which `early_stopping`
+    stops once its score stops improving (set it to None to run every iteration).
+    The result records the number of iterations run, and why the optimization
+    ended.
+
+    With `profile`, the result also reports where the time of the optimization went:
+    in each phase, and in evaluating each constraint and objective (at some cost in
+    speed). Profiled optimizations are never cached. The profile of a multi-start
+    optimization is that of its best run.
+
+    With a `segment_length`, sequences longer than it are split into segments of
+    that many nucleotides, each overlapping the next by `segment_overlap`
+    nucleotides. The segments are optimized across a pool of (at most) `workers`
+    processes, under the parameters restricted to each segment, then joined in the
+    middle of their overlaps. Finally, the constraints are checked (and repaired)
+    over the whole sequence, as those spanning a junction or the whole sequence may
+    be broken by the join. Objectives are only optimized within each segment, so
+    those over the whole sequence (such as avoiding repeats) may score worse than
+    in a single run. Progress is reported as each segment completes. The location
+    of an error in a segment is given in the coordinates of the whole sequence.
+
+    The `engine` searches DnaChisel's random nucleotide mutations by default. The
+    `codon` engine instead swaps codons for synonymous ones, choosing each swap from
+    incrementally updated scores of the CAI, GC content and avoided patterns, which
+    is faster and usually reaches a better CAI. It does not support the other
+    parameters (such as avoiding hairpins or repeats), so its result is then
+    finished by DnaChisel, and the constraints and objectives it left to DnaChisel
+    are reported as `unsupported`. The codon engine can not be restarted, segmented
+    or profiled.
+
+    The `beam` engine supports the same parameters as the `codon` engine, but
+    designs the sequence codon by codon, keeping the `beam_width` best scoring
+    partial designs that satisfy the constraints. It is deterministic, takes time
+    linear in the length of the sequence and the beam width, and finds the best CAI
+    satisfying the constraints when the beam is wide enough (wider beams trade speed
+    for a better CAI).
+
     >>> str(optimize(Sequence("ACGACCATTAAA"), parameters=[OptimizationParameter(organism="homo-sapiens", optimize_cai=True)]).result.sequence)
     'ACCACCATCAAG'
     """
-    start = timeit.default_timer()
-    try:
-        result = _optimize(
-            sequence.nucleic_acid_sequence,
-            parameters=parameters or [DEFAULT_OPTIMIZATION_PARAMETER],
+    if cache is not None and not profile:
+        key = cache.key(
+            sequence,
+            parameters,
+            max_random_iters,
+            mutations_per_iteration,
+            random_seed,
+            restarts=restarts,
+            target_score=target_score,
+            time_budget_seconds=time_budget_seconds,
+            segment_length=segment_length,
+            segment_overlap=segment_overlap,
+            early_stopping=early_stopping,
+            engine=engine,
+            beam_width=beam_width,
+        )
+        if (cached := cache.get(key, random_seed)) is not None:
+            return cached
+        result = optimize(
+            sequence,
+            parameters,
             max_random_iters=max_random_iters,
             mutations_per_iteration=mutations_per_iteration,
+            progress=progress,
+            random_seed=random_seed,
+            restarts=restarts,
+            workers=workers,
+            target_score=target_score,
+            time_budget_seconds=time_budget_seconds,
+            segment_length=segment_length,
+            segment_overlap=segment_overlap,
+            early_stopping=early_stopping,
+            engine=engine,
+            beam_width=beam_width,
         )
-    except OptimizationError as e:
+        cache.put(key, result, random_seed)
+        return result
+
+    parameters = parameters or [DEFAULT_OPTIMIZATION_PARAMETER]
+    if engine != "dnachisel":
+        if restarts > 1 or segment_length is not None or profile:
+            raise ValueError(
+                f"The {engine} engine can not be restarted, segmented or profiled."
+            )
+        if engine == "beam" and beam_width < 1:
+            raise ValueError("`beam_width` must be at least 1.")
+        return _run_codon_engine(
+            sequence,
+            parameters,
+            max_random_iters,
+            mutations_per_iteration,
+            progress=progress,
+            random_seed=random_seed,
+            time_budget_seconds=time_budget_seconds,
+            early_stopping=early_stopping,
+            engine=engine,
+            beam_width=beam_width,
+        )
+    if segment_length is not None:
+        if segment_length % 3 or segment_overlap % 3:
+            raise ValueError("Segments must be aligned to codons.")
+        if not 0 <= segment_overlap < segment_length // 2:
+            raise ValueError("Segments must overlap by less than half their length.")
+        if restarts > 1 or time_budget_seconds is not None or profile:
+            raise ValueError(
+                "Segmented optimizations can not be restarted, given a time budget or"
+                " profiled."
+            )
+        if len(sequence.nucleic_acid_sequence) > segment_length:
+            return _optimize_segmented(
+                sequence,
+                parameters,
+                max_random_iters,
+                mutations_per_iteration,
+                segment_length=segment_length,
+                segment_overlap=segment_overlap,
+                workers=workers,
+                random_seed=random_seed,
+                early_stopping=early_stopping,
+                progress=progress,
+            )
+    if restarts > 1:
+        return _optimize_portfolio(
+            sequence,
+            parameters,
+            max_random_iters,
+            mutations_per_iteration,
+            restarts=restarts,
+            workers=workers,
+            random_seed=random_seed,
+            target_score=target_score,
+            time_budget_seconds=time_budget_seconds,
+            early_stopping=early_stopping,
+            profile=profile,
+        )
+    return _run(
+        sequence,
+        parameters,
+        max_random_iters,
+        mutations_per_iteration,
+        progress=progress,
+        random_seed=random_seed,
+        time_budget_seconds=time_budget_seconds,
+        early_stopping=early_stopping,
+        profile=profile,
+    )[0]
+
+
+_OBJECTIVE_FIELDS = (
+    "start_coordinate",
+    "end_coordinate",
+    "organism",
+    "optimize_cai",
+    "optimize_mfe",
+    "optimize_windowed_mfe",
+    "windowed_mfe_window_size",
+    "windowed_mfe_step",
+    "windowed_mfe_max_bp_span",
+    "optimize_tai",
+    "avoid_repeat_length",
+)
+
+
+def _changed_objectives(
+    parameters: typing.Sequence[OptimizationParameter],
+    previous_parameters: typing.Sequence[OptimizationParameter],
+    length: int,
+) -> list[tuple[int, int]]:
+    """The (0-based, end exclusive) locations of the parameters whose objectives are
+    not those of any of the previous parameters.
+    """
+
+    def objectives(parameter: OptimizationParameter) -> tuple:
+        return tuple(getattr(parameter, it) for it in _OBJECTIVE_FIELDS)
+
+    previous = {objectives(it) for it in previous_parameters}
+    spans = []
+    for parameter in parameters:
+        if parameter.enforce_sequence or objectives(parameter) in previous:
+            continue
+        location = parameter.dnachisel_location
+        spans.append((location.start, location.end) if location else (0, length))
+    return spans
+
+
+def _mutable_regions(
+    spans: typing.Iterable[tuple[int, int]], length: int, margin: int
+) -> list[tuple[int, int]]:
+    """Widen the (0-based, end exclusive) spans by `margin` nucleotides, out to whole
+    codons, and merge those that overlap.
+
+    >>> _mutable_regions([(40, 45), (10, 12), (50, 52)], 90, 3)
+    [(6, 15), (36, 57)]
+    """
+    regions: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        start = max(0, (start - margin) // 3 * 3)
+        end = min(length, -(-(end + margin) // 3) * 3)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def reoptimize(
+    sequence: Sequence,
+    parameters: typing.Sequence[OptimizationParameter] | None = None,
+    previous_parameters: typing.Sequence[OptimizationParameter] | None = None,
+    edited: typing.Sequence[Location] | None = None,
+    margin: int = 30,
+    max_random_iters: int = 20_000,
+    mutations_per_iteration: int = 2,
+    progress: typing.Callable[[float], None] | None = None,
+    random_seed: int | None = None,
+    cache: OptimizationCache | None = None,
+    time_budget_seconds: float | None = None,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    engine: Engine = "dnachisel",
+    beam_width: int = 64,
+) -> OptimizationResult:
+    """Optimize a previously optimized sequence again after a small change to it or
+    to its parameters, only changing the sequence where needed.
+
+    The `sequence` (such as the sequence of a previous result, with some `edited`
+    regions) is checked against the constraints of the `parameters`. Only the regions
+    where it breaks them, the `edited` regions, and the locations of the parameters
+    whose objectives differ from those of the `previous_parameters` (if given) are
+    optimized, each widened by `margin` nucleotides on either side, while the rest of
+    the sequence is enforced as it is. The other arguments are those of `optimize`.
+
+    If the sequence already satisfies the constraints and nothing was edited, it is
+    returned as it is. The result records the regions that were allowed to change.
+    """
+    start = timeit.default_timer()
+    parameters = list(parameters or [DEFAULT_OPTIMIZATION_PARAMETER])
+    nucleic_acid_sequence = sequence.nucleic_acid_sequence
+    length = len(nucleic_acid_sequence)
+    constraints, objectives = [], []
+    for p in parameters:
+        c, o = p.dnachisel(nucleic_acid_sequence)
+        constraints.extend(c)
+        objectives.extend(o)
+    problem = DnaOptimizationProblem(
+        sequence=nucleic_acid_sequence,
+        constraints=constraints,
+        objectives=objectives,
+        logger=None,  # type: ignore
+    )
+
+    spans = [
+        (it.start, it.end)
+        for evaluation in problem.constraints_evaluations().evaluations
+        if not evaluation.passes
+        for it in evaluation.locations or [DnaChiselLocation(0, length)]
+    ]
+    for location in edited or []:
+        region = location.dnachisel_location
+        spans.append((region.start, region.end) if region else (0, length))
+    if previous_parameters is not None:
+        spans.extend(_changed_objectives(parameters, previous_parameters, length))
+    regions = _mutable_regions(spans, length, margin)
+
+    if not regions:
+        if progress:
+            progress(1.0)
+        return OptimizationResult(
+            success=True,
+            result=OptimizationResult.Result(
+                sequence=Sequence(nucleic_acid_sequence),
+                constraints=problem.constraints_text_summary(),
+                objectives=problem.objectives_text_summary(),
+            ),
+            error=None,
+            time_in_seconds=timeit.default_timer() - start,
+            iterations=0,
+            stop_reason="completed",
+            mutable_regions=[],
+        )
+
+    # The rest of the sequence is enforced as it is
+    frozen = [
+        OptimizationParameter(
+            enforce_sequence=True, start_coordinate=frozen_start + 1, end_coordinate=end
+        )
+        for frozen_start, end in zip(
+            [0, *(it[1] for it in regions)],
+            [*(it[0] for it in regions), length],
+            strict=True,
+        )
+        if end - frozen_start > 1
+    ]
+    result = optimize(
+        sequence,
+        [*parameters, *frozen],
+        max_random_iters=max_random_iters,
+        mutations_per_iteration=mutations_per_iteration,
+        progress=progress,
+        random_seed=random_seed,
+        cache=cache,
+        time_budget_seconds=time_budget_seconds,
+        early_stopping=early_stopping,
+        engine=engine,
+        beam_width=beam_width,
+    )
+    return msgspec.structs.replace(
+        result,
+        time_in_seconds=timeit.default_timer() - start,
+        mutable_regions=[
+            Location(start_coordinate=region_start + 1, end_coordinate=end)
+            for region_start, end in regions
+        ],
+    )
+
+
+_BATCH_PARAMETERS: list[OptimizationParameter] = []
+"""The parameters of the batch optimized by a worker process."""
+
+
+def _initialize_batch_worker(parameters: list[OptimizationParameter]):
+    """Receive the parameters of a batch once per worker process, and compile their
+    specifications before the first sequence arrives.
+    """
+    _BATCH_PARAMETERS[:] = parameters
+    for parameter in parameters:
+        if not parameter.enforce_sequence:
+            parameter.templates()
+
+
+def _optimize_batch_sequence(sequence: Sequence, **kwargs) -> OptimizationResult:
+    """Optimize one sequence of a batch, in a worker process."""
+    try:
+        return optimize(sequence, _BATCH_PARAMETERS, **kwargs)
+    except (RuntimeError, ValueError) as e:
+        # A bad sequence (or parameter) fails its own result, not the whole batch
         return OptimizationResult(
             success=False,
             result=None,
             error=OptimizationResult.Error(
-                message=str(e.message),
-                problem=str(e.problem),
-                location=str(e.location),
-                constraint=str(e.constraint),
+                message=str(e), problem=None, constraint=None, location=None
             ),
-            time_in_seconds=(timeit.default_timer() - start),
+            time_in_seconds=0.0,
         )
-    return OptimizationResult(
-        success=True,
-        result=OptimizationResult.Result(
-            sequence=Sequence(result.sequence),
-            constraints=result.constraints_text_summary(),
-            objectives=result.objectives_text_summary(),
-        ),
-        error=None,
-        time_in_seconds=(timeit.default_timer() - start),
+
+
+def optimize_many(
+    sequences: typing.Iterable[tuple[str, Sequence]],
+    parameters: typing.Sequence[OptimizationParameter] | None = None,
+    max_random_iters: int = 20_000,
+    mutations_per_iteration: int = 2,
+    random_seed: int | None = None,
+    workers: int | None = None,
+    ordered: bool = True,
+    time_budget_seconds: float | None = None,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    engine: Engine = "dnachisel",
+    beam_width: int = 64,
+) -> typing.Generator[tuple[str, OptimizationResult]]:
+    """Optimize each of the named `sequences` under the same parameters, across a
+    pool of (at most) `workers` processes, yielding each name and result as soon as
+    it is available.
+
+    The `sequences` are read lazily, so only a few more than there are workers are
+    held in memory at once (they can be streamed from a FASTA file). Each worker
+    receives the parameters and compiles their specifications once, rather than
+    once per sequence. Results are yielded in the order of the `sequences`, or in
+    the order they complete if not `ordered`. A sequence that can not be optimized
+    (such as one which is not a whole number of codons) yields an unsuccessful
+    result, rather than stopping the batch.
+
+    Each sequence is optimized as by `optimize`, with the same `random_seed`, so
+    its result is the same as optimizing it alone.
+    """
+    parameters = list(parameters or [DEFAULT_OPTIMIZATION_PARAMETER])
+    workers = workers or os.process_cpu_count() or 1
+    optimize_sequence = functools.partial(
+        _optimize_batch_sequence,
+        max_random_iters=max_random_iters,
+        mutations_per_iteration=mutations_per_iteration,
+        random_seed=random_seed,
+        time_budget_seconds=time_budget_seconds,
+        early_stopping=early_stopping,
+        engine=engine,
+        beam_width=beam_width,
+    )
+    records = iter(sequences)
+    pending: collections.deque[tuple[str, concurrent.futures.Future]] = (
+        collections.deque()
     )
+    with concurrent.futures.ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=_initialize_batch_worker,
+        initargs=(parameters,),
+    ) as executor:
+
+        def submit(count: int):
+            for name, sequence in itertools.islice(records, count):
+                pending.append((name, executor.submit(optimize_sequence, sequence)))
+
+        # Keep every worker busy, with a sequence queued for each
+        submit(2 * workers)
+        try:
+            while pending:
+                if ordered:
+                    name, future = pending.popleft()
+                else:
+                    done, _ = concurrent.futures.wait(
+                        [it for _, it in pending],
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    name, future = next(it for it in pending if it[1] in done)
+                    pending.remove((name, future))
+                result = future.result()
+                submit(1)
+                yield name, result
+        finally:
+            # Do not optimize the queued sequences if the batch is abandoned
+            for _, future in pending:
+                future.cancel()
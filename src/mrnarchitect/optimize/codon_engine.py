@@ -0,0 +1,686 @@
+import itertools
+import math
+
+import numpy as np
+from dnachisel.builtin_specifications import (
+    AvoidRareCodons,
+    EnforceGCContent,
+    EnforceSequence,
+    EnforceTranslation,
+)
+from dnachisel.builtin_specifications.codon_optimization import MaximizeCAI
+from dnachisel.DnaOptimizationProblem import DnaOptimizationProblem
+from dnachisel.MutationSpace import MutationSpace
+from dnachisel.Specification import Specification
+
+from mrnarchitect.constants import ORDERED_CODONS
+
+from .specifications.constraints import AvoidPatterns
+
+_CODON_INDICES = {codon: index for index, codon in enumerate(ORDERED_CODONS)}
+
+_CODON_GC = np.array(
+    [[nucleotide in "GC" for nucleotide in codon] for codon in ORDERED_CODONS],
+    dtype=np.int64,
+)
+"""Whether each nucleotide of each codon is a G or C, indexed as in `ORDERED_CODONS`."""
+
+_CODON_NUCLEOTIDES = np.array(
+    [["ACGT".index(nucleotide) for nucleotide in codon] for codon in ORDERED_CODONS]
+)
+"""The nucleotides of each codon (encoded as in "ACGT"), indexed as in
+`ORDERED_CODONS`."""
+
+_MUTATION_SPACE_SPECIFICATIONS = (
+    AvoidRareCodons,
+    EnforceSequence,
+    EnforceTranslation,
+)
+"""The constraints that are entirely enforced by restricting the mutation space (so
+by the codons each position may take)."""
+
+_MAX_CANDIDATE_CODONS = 24
+"""The maximum number of codons (sampled at random) considered for mutation when
+repairing a breach, so that breaches of a whole region stay cheap to repair."""
+
+_STAGNATION_TOLERANCE = 100
+"""The number of iterations without reducing the breaches of the constraints after
+which their repair is abandoned."""
+
+_TOLERANCE = 1e-9
+
+
+class _GCContent:
+    """An `EnforceGCContent` constraint, holding the GC count of each of its windows.
+
+    A global constraint has a single window spanning its location.
+    """
+
+    def __init__(self, specification: EnforceGCContent, gc: np.ndarray):
+        self.start = specification.location.start
+        self.end = specification.location.end
+        self.window = specification.window or (self.end - self.start)
+        self.mini = specification.mini
+        self.maxi = specification.maxi
+        self.counts = np.zeros(0, dtype=np.int64)
+        """The GC count of each window."""
+        self.recount(gc)
+
+    def recount(self, gc: np.ndarray):
+        """Count the GC of the windows, from the prefix sums of the sequence GC."""
+        prefix = np.concatenate([[0], np.cumsum(gc[self.start : self.end])])
+        self.counts = prefix[self.window :] - prefix[: -self.window or None]
+
+    def _breaches(self, counts: np.ndarray) -> np.ndarray:
+        """The extent of the breach of each window, as scored by DnaChisel."""
+        ratios = counts / self.window
+        return np.maximum(0, self.mini - ratios) + np.maximum(0, ratios - self.maxi)
+
+    def breached(self) -> np.ndarray:
+        """The offsets of the windows breaching the constraint."""
+        return np.flatnonzero(self._breaches(self.counts) > _TOLERANCE)
+
+    def changes(
+        self, starts: np.ndarray, gc_changes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """The changes to the GC counts of the windows, given the changes in GC of
+        the nucleotides from each of `starts`: the offsets of a run of windows
+        around each start, and the change of each window.
+        """
+        columns = min(self.window + gc_changes.shape[1] - 1, len(self.counts))
+        first = np.clip(
+            starts - self.start - self.window + 1, 0, len(self.counts) - columns
+        )
+        windows = first[:, None] + np.arange(columns)
+        offsets = (starts - self.start)[:, None] + np.arange(gc_changes.shape[1])
+        contained = (windows[:, :, None] <= offsets[:, None, :]) & (
+            offsets[:, None, :] < windows[:, :, None] + self.window
+        )
+        return windows, (contained * gc_changes[:, None, :]).sum(axis=2)
+
+    def breach_changes(
+        self, windows: np.ndarray, count_changes: np.ndarray
+    ) -> np.ndarray:
+        counts = self.counts[windows]
+        return (self._breaches(counts + count_changes) - self._breaches(counts)).sum(
+            axis=1
+        )
+
+    def apply(self, windows: np.ndarray, count_changes: np.ndarray):
+        self.counts[windows] += count_changes
+
+
+class _Patterns:
+    """An `AvoidPatterns` constraint, whose matches are counted around mutations."""
+
+    def __init__(self, specification: AvoidPatterns, sequence: str):
+        self.automaton = specification.automaton
+        self.start = specification.location.start
+        self.end = specification.location.end
+        self.matches: set[tuple[int, int]] = set()
+        """The locations of the matches."""
+        self.rescan(sequence)
+
+    def rescan(self, sequence: str):
+        self.matches = {
+            (start, end)
+            for _, start, end, _ in self.automaton.find_matches(
+                sequence, self.start, self.end
+            )
+        }
+
+    def update(self, sequence: str, start: int, end: int):
+        """Update the matches after the nucleotides from `start` to `end` changed."""
+        self.matches = {
+            it for it in self.matches if not (it[0] < end and it[1] > start)
+        } | {
+            (match_start, match_end)
+            for _, match_start, match_end, _ in self.automaton.find_matches(
+                sequence,
+                max(self.start, start - self.automaton.size + 1),
+                min(self.end, end + self.automaton.size - 1),
+            )
+            if match_start < end and match_end > start
+        }
+
+    def breach_changes(self, sequence: str, start: int, codons: list[str]) -> list[int]:
+        """The change in the number of matches if the codon at `start` is replaced by
+        each of `codons`.
+        """
+        end = start + 3
+        region_start = max(self.start, start - self.automaton.size + 1)
+        region_end = min(self.end, end + self.automaton.size - 1)
+        if region_start >= region_end:
+            return [0] * len(codons)
+        offset, stop = min(region_start, start), max(region_end, end)
+
+        def count(text: str) -> int:
+            return sum(
+                match_start < end - offset and match_end > start - offset
+                for _, match_start, match_end, _ in self.automaton.find_matches(
+                    text, region_start - offset, region_end - offset
+                )
+            )
+
+        before = count(sequence[offset:stop])
+        return [
+            count(sequence[offset:start] + codon + sequence[end:stop]) - before
+            for codon in codons
+        ]
+
+
+class _CodonProblem:
+    """A DnaChisel problem compiled for a search over codons: the codons each
+    position may take are those of the problem's mutation space (so the translation,
+    and any enforced sequence or avoided codons, are kept), the CAI objectives are
+    scored as in DnaChisel from per-codon weights, and the GC content and avoided
+    pattern constraints are tracked as codons change.
+
+    Any other constraints and objectives are `unsupported`, and ignored by the
+    searches.
+    """
+
+    def __init__(self, problem: DnaOptimizationProblem):
+        sequence = problem.sequence
+        if len(sequence) % 3:
+            raise ValueError("The sequence is not a whole number of codons.")
+        self.sequence = sequence
+        """The current sequence of the search."""
+        self.codons = np.array(
+            [_CODON_INDICES[sequence[i : i + 3]] for i in range(0, len(sequence), 3)]
+        )
+        """The current codons, as indices into `ORDERED_CODONS`."""
+        self.iterations = 0
+        """The number of codons evaluated by the search."""
+        self.unsupported: list[Specification] = []
+        """The constraints and objectives the search does not support."""
+
+        gc = _CODON_GC[self.codons].ravel()
+        self._gc_contents: list[_GCContent] = []
+        self._patterns: list[_Patterns] = []
+        for specification in problem.constraints:
+            if isinstance(specification, _MUTATION_SPACE_SPECIFICATIONS):
+                continue
+            if (
+                isinstance(specification, EnforceGCContent)
+                and specification.mini is not None
+                and specification.maxi is not None
+            ):
+                self._gc_contents.append(_GCContent(specification, gc))
+            elif isinstance(specification, AvoidPatterns):
+                self._patterns.append(_Patterns(specification, sequence))
+            else:
+                self.unsupported.append(specification)
+
+        self._weights = np.zeros((len(self.codons), len(ORDERED_CODONS)))
+        for specification in problem.objectives:
+            location = specification.location
+            if (
+                isinstance(specification, MaximizeCAI)
+                and location.strand != -1
+                and location.start % 3 == 0
+                and (location.end - location.start) % 3 == 0
+            ):
+                usage = specification.codon_usage_table
+                self._weights[location.start // 3 : location.end // 3] += (
+                    specification.boost
+                    * np.array(
+                        [
+                            usage["log_codons_frequencies"][codon]
+                            - usage["log_best_frequencies"][
+                                specification.codons_translations[codon]
+                            ]
+                            for codon in ORDERED_CODONS
+                        ]
+                    )
+                )
+            else:
+                self.unsupported.append(specification)
+
+        self._choices = self._codon_choices(problem.mutation_space)  # type: ignore
+
+    def _codon_choices(self, mutation_space: MutationSpace) -> list[np.ndarray]:
+        """The codons each position may take, from the choices of the mutation space
+        covering its nucleotides.
+        """
+        choices = []
+        for index in range(len(self.codons)):
+            start = 3 * index
+            segments = {
+                id(it): it for it in mutation_space.choices_index[start : start + 3]
+            }.values()
+            if any(it.start < start or it.end > start + 3 for it in segments):
+                raise ValueError(
+                    f"The mutation space is not aligned to codons at {start}."
+                )
+            variants = [
+                sorted(it.variants) for it in sorted(segments, key=lambda x: x.start)
+            ]
+            choices.append(
+                np.array(
+                    [_CODON_INDICES["".join(it)] for it in itertools.product(*variants)]
+                )
+            )
+        return choices
+
+
+class CodonSearch(_CodonProblem):
+    """Optimizes a coding sequence by swapping its codons for synonymous ones, as a
+    faster alternative to DnaChisel's search over random nucleotide mutations.
+
+    The breaches of the GC content and avoided pattern constraints are updated
+    incrementally as codons are swapped.
+
+    >>> from dnachisel.builtin_specifications import EnforceTranslation
+    >>> problem = DnaOptimizationProblem(
+    ...     "ATGAAAAAAAAAAAA",
+    ...     constraints=[EnforceTranslation(), AvoidPatterns(["6xA"])],
+    ...     logger=None,
+    ... )
+    >>> search = CodonSearch(problem, random_seed=1)
+    >>> "AAAAAA" in search.run(max_iters=100)
+    False
+    """
+
+    def __init__(self, problem: DnaOptimizationProblem, random_seed: int | None = None):
+        super().__init__(problem)
+        self._rng = np.random.default_rng(random_seed)
+
+    def _swaps(
+        self, indices: np.ndarray, codons: np.ndarray
+    ) -> tuple[np.ndarray, list[tuple[np.ndarray, np.ndarray]]]:
+        """Evaluate swapping each of the codons at `indices` for those of `codons`,
+        returning the change in the total breach of the constraints for each swap,
+        and the changes to the GC counts of the windows (of each GC constraint).
+        """
+        self.iterations += len(indices)
+        starts = 3 * indices
+        gc_changes = _CODON_GC[codons] - _CODON_GC[self.codons[indices]]
+        breach_changes = np.zeros(len(indices))
+        count_changes = []
+        for gc_content in self._gc_contents:
+            windows, changes = gc_content.changes(starts, gc_changes)
+            breach_changes += gc_content.breach_changes(windows, changes)
+            count_changes.append((windows, changes))
+        for index in np.unique(indices).tolist() if self._patterns else []:
+            swaps = np.flatnonzero(indices == index)
+            swapped = [ORDERED_CODONS[it] for it in codons[swaps].tolist()]
+            for patterns in self._patterns:
+                breach_changes[swaps] += patterns.breach_changes(
+                    self.sequence, 3 * index, swapped
+                )
+        return breach_changes, count_changes
+
+    def _apply(
+        self, index: int, codon: int, count_changes: list[tuple[np.ndarray, np.ndarray]]
+    ):
+        start = 3 * index
+        self.sequence = (
+            self.sequence[:start] + ORDERED_CODONS[codon] + self.sequence[start + 3 :]
+        )
+        self.codons[index] = codon
+        for gc_content, (windows, changes) in zip(
+            self._gc_contents, count_changes, strict=True
+        ):
+            gc_content.apply(windows, changes)
+        for patterns in self._patterns:
+            patterns.update(self.sequence, start, start + 3)
+
+    def _random_breach(self) -> tuple[int, int] | None:
+        """The location of a breach of the constraints, picked at random, or None if
+        the constraints all pass.
+        """
+        breached = [it.breached() for it in self._gc_contents]
+        matches = [sorted(it.matches) for it in self._patterns]
+        total = sum(len(it) for it in breached) + sum(len(it) for it in matches)
+        if not total:
+            return None
+        choice = int(self._rng.integers(total))
+        for gc_content, offsets in zip(self._gc_contents, breached, strict=True):
+            if choice < len(offsets):
+                start = gc_content.start + int(offsets[choice])
+                return start, start + gc_content.window
+            choice -= len(offsets)
+        for locations in matches:
+            if choice < len(locations):
+                return locations[choice]
+            choice -= len(locations)
+        return None
+
+    def run(self, max_iters: int = 20_000) -> str:
+        """Run the search, returning the optimized sequence.
+
+        Each codon starts as its best scoring choice, then the breaches of the
+        constraints are repaired (for up to `max_iters` iterations) by the swaps that
+        reduce them at the least cost to the objectives, and finally the codons are
+        swapped for better scoring ones wherever the constraints still hold.
+        """
+        self._initialize()
+        self._resolve_constraints(max_iters)
+        self._optimize_objectives()
+        return self.sequence
+
+    def _initialize(self):
+        for index, choices in enumerate(self._choices):
+            weights = self._weights[index, choices]
+            if self._weights[index, self.codons[index]] < weights.max():
+                self.codons[index] = choices[weights.argmax()]
+        self.sequence = "".join(ORDERED_CODONS[it] for it in self.codons.tolist())
+        gc = _CODON_GC[self.codons].ravel()
+        for gc_content in self._gc_contents:
+            gc_content.recount(gc)
+        for patterns in self._patterns:
+            patterns.rescan(self.sequence)
+
+    def _resolve_constraints(self, max_iters: int):
+        stagnation = 0
+        for _ in range(max_iters):
+            breach = self._random_breach()
+            if breach is None or stagnation >= _STAGNATION_TOLERANCE:
+                return
+            start, end = breach
+            candidates = [
+                it
+                for it in range(start // 3, -(-end // 3))
+                if len(self._choices[it]) > 1
+            ]
+            if len(candidates) > _MAX_CANDIDATE_CODONS:
+                candidates = self._rng.choice(
+                    candidates, _MAX_CANDIDATE_CODONS, replace=False
+                ).tolist()
+            swaps = [
+                (index, codon)
+                for index in candidates
+                for codon in self._choices[index].tolist()
+                if codon != self.codons[index]
+            ]
+            if not swaps:
+                stagnation += 1
+                continue
+            indices, codons = np.array(swaps).T
+            breach_changes, count_changes = self._swaps(indices, codons)
+            # The swap reducing the breaches the most, at the least cost to the score
+            score_changes = (
+                self._weights[indices, codons]
+                - self._weights[indices, self.codons[indices]]
+            )
+            best = np.lexsort((-score_changes, breach_changes.round(9)))[0]
+            if breach_changes[best] < -_TOLERANCE:
+                stagnation = 0
+            else:
+                # Walk the plateau at random, rather than getting stuck on it
+                stagnation += 1
+                plateau = np.flatnonzero(breach_changes <= _TOLERANCE)
+                if not len(plateau):
+                    continue
+                best = self._rng.choice(plateau)
+            self._apply(
+                int(indices[best]),
+                int(codons[best]),
+                [(windows[best], changes[best]) for windows, changes in count_changes],
+            )
+
+    def _optimize_objectives(self):
+        # Swap each codon for the best scoring choice that keeps the constraints, the
+        # codons with the most to gain first, until no more codons can be improved
+        positions = np.arange(len(self.codons))
+        best = np.array(
+            [
+                self._weights[index, choices].max()
+                for index, choices in enumerate(self._choices)
+            ]
+        )
+        improved = True
+        while improved:
+            improved = False
+            gains = best - self._weights[positions, self.codons]
+            for index in np.argsort(-gains, kind="stable").tolist():
+                if gains[index] <= _TOLERANCE:
+                    break
+                choices = self._choices[index]
+                current = self._weights[index, self.codons[index]]
+                for codon in choices[
+                    np.argsort(-self._weights[index, choices], kind="stable")
+                ].tolist():
+                    if self._weights[index, codon] <= current + _TOLERANCE:
+                        break
+                    breach_changes, count_changes = self._swaps(
+                        np.array([index]), np.array([codon])
+                    )
+                    if breach_changes[0] <= _TOLERANCE:
+                        self._apply(
+                            index,
+                            codon,
+                            [
+                                (windows[0], changes[0])
+                                for windows, changes in count_changes
+                            ],
+                        )
+                        improved = True
+                        break
+
+
+class CodonBeamSearch(_CodonProblem):
+    """Designs a coding sequence codon by codon, from the first, keeping the
+    `beam_width` best scoring partial designs that satisfy the constraints.
+
+    Each partial design is in a state made of its position in the automaton of each
+    avoided pattern constraint, the GC of its last nucleotides (for the windowed GC
+    content constraints) and its GC count (for the global ones). Designs in the same
+    state have the same possible continuations, so only the best scoring of them is
+    kept: with a beam wide enough to hold every distinct state, the search is an
+    exact dynamic program, returning the best scoring design that satisfies the
+    constraints. Designs that can no longer satisfy the GC content constraints (with
+    any choice of the codons that follow) are dropped as soon as possible.
+
+    The search is deterministic, and takes time linear in the length of the sequence
+    and in the beam width.
+
+    >>> from dnachisel.builtin_specifications import EnforceTranslation
+    >>> problem = DnaOptimizationProblem(
+    ...     "ATGAAAAAAAAAAAA",
+    ...     constraints=[EnforceTranslation(), AvoidPatterns(["6xA"])],
+    ...     logger=None,
+    ... )
+    >>> CodonBeamSearch(problem).run()
+    'ATGAAAAAGAAAAAG'
+    """
+
+    def __init__(self, problem: DnaOptimizationProblem, beam_width: int = 64):
+        super().__init__(problem)
+        if beam_width < 1:
+            raise ValueError("`beam_width` must be at least 1.")
+        self.beam_width = beam_width
+
+    def run(self) -> str | None:
+        """Run the search, returning the best design, or None if no design in the beam
+        satisfied the constraints.
+        """
+        length = len(self.codons)
+        automata = [(*it.automaton.tables, it.start, it.end) for it in self._patterns]
+        windowed = [it for it in self._gc_contents if it.window < it.end - it.start]
+        overall = [it for it in self._gc_contents if it.window == it.end - it.start]
+        history_size = max((it.window + 2 for it in windowed), default=0)
+
+        # The least and most GC of the first one, two and three nucleotides of each
+        # codon, summed over the codons before each (for whole codons), and within
+        # the location of each global constraint, summed from each codon to the end
+        codon_gc = [_CODON_GC[it] for it in self._choices]
+        partial_gc = np.array(
+            [
+                [
+                    [it[:, :size].sum(axis=1).min(), it[:, :size].sum(axis=1).max()]
+                    for size in (1, 2, 3)
+                ]
+                for it in codon_gc
+            ]
+        )
+        total_gc = np.concatenate([[[0, 0]], np.cumsum(partial_gc[:, 2], axis=0)])
+        remaining_gc = []
+        for gc_content in overall:
+            gc = np.array(
+                [
+                    [
+                        (it * self._within(gc_content, index)).sum(axis=1).min(),
+                        (it * self._within(gc_content, index)).sum(axis=1).max(),
+                    ]
+                    for index, it in enumerate(codon_gc)
+                ]
+            )
+            remaining_gc.append(
+                np.concatenate([np.cumsum(gc[::-1], axis=0)[::-1], [[0, 0]]])
+            )
+
+        viable = [self._viable_states(*it) for it in automata]
+
+        states = np.zeros((1, len(automata)), dtype=np.int64)
+        history = np.zeros((1, history_size), dtype=np.int64)
+        counts = np.zeros((1, len(overall)), dtype=np.int64)
+        scores = np.zeros(1)
+        steps: list[tuple[np.ndarray, np.ndarray]] = []
+        for index in range(length):
+            choices = self._choices[index]
+            parents = np.repeat(np.arange(len(scores)), len(choices))
+            codons = np.tile(choices, len(scores))
+            self.iterations += len(codons)
+            nucleotides = _CODON_NUCLEOTIDES[codons]
+            gc = _CODON_GC[codons]
+            feasible = np.ones(len(codons), dtype=np.bool_)
+
+            next_states = states[parents]
+            for column, (transitions, accepting, start, end) in enumerate(automata):
+                for offset in range(3):
+                    if start <= 3 * index + offset < end:
+                        next_states[:, column] = transitions[
+                            next_states[:, column], nucleotides[:, offset]
+                        ]
+                        feasible &= ~accepting[next_states[:, column]]
+                feasible &= viable[column][index + 1][next_states[:, column]]
+
+            next_counts = counts[parents]
+            for column, gc_content in enumerate(overall):
+                next_counts[:, column] += gc @ self._within(gc_content, index)
+                low, high = self._bounds(gc_content)
+                least, most = remaining_gc[column][index + 1]
+                feasible &= (next_counts[:, column] + most >= low) & (
+                    next_counts[:, column] + least <= high
+                )
+
+            next_history = np.concatenate([history[parents][:, 3:], gc], axis=1)
+            if windowed:
+                cumulative = np.concatenate(
+                    [
+                        np.zeros((len(codons), 1), dtype=np.int64),
+                        next_history.cumsum(axis=1),
+                    ],
+                    axis=1,
+                )
+                for gc_content in windowed:
+                    feasible &= self._windows_feasible(
+                        gc_content, index, cumulative, partial_gc, total_gc
+                    )
+
+            # Merge the designs in the same state, keeping the best scoring
+            next_scores = scores[parents] + self._weights[index, codons]
+            candidates = np.flatnonzero(feasible)
+            if not len(candidates):
+                return None
+            candidates = candidates[np.argsort(-next_scores[candidates], kind="stable")]
+            keys = np.concatenate(
+                [next_states, np.packbits(next_history, axis=1), next_counts], axis=1
+            )[candidates]
+            if keys.shape[1]:
+                # The first (so best scoring) design of each state, in order
+                order = np.lexsort(keys.T[::-1])
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = (keys[order][1:] != keys[order][:-1]).any(axis=1)
+                candidates = candidates[np.sort(order[first])]
+            else:
+                candidates = candidates[:1]
+            candidates = candidates[: self.beam_width]
+
+            states = next_states[candidates]
+            history = next_history[candidates]
+            counts = next_counts[candidates]
+            scores = next_scores[candidates]
+            steps.append((parents[candidates], codons[candidates]))
+
+        # The best design is the first of the beam, traced back to the first codon
+        design, beam_index = [], 0
+        for parents, codons in reversed(steps):
+            design.append(int(codons[beam_index]))
+            beam_index = parents[beam_index]
+        self.codons = np.array(design[::-1])
+        self.sequence = "".join(ORDERED_CODONS[it] for it in design[::-1])
+        return self.sequence
+
+    def _viable_states(
+        self, transitions: np.ndarray, accepting: np.ndarray, start: int, end: int
+    ) -> np.ndarray:
+        """Whether the rest of the sequence can avoid the patterns of an automaton,
+        from each of its states before each codon (and at the end).
+        """
+        viable = np.ones((len(self.codons) + 1, len(transitions)), dtype=bool)
+        states = np.arange(len(transitions))
+        for index in range(len(self.codons) - 1, -1, -1):
+            nucleotides = _CODON_NUCLEOTIDES[self._choices[index]]
+            next_states = np.repeat(states[:, None], len(nucleotides), axis=1)
+            avoided = np.ones(next_states.shape, dtype=np.bool_)
+            for offset in range(3):
+                if start <= 3 * index + offset < end:
+                    next_states = transitions[next_states, nucleotides[:, offset]]
+                    avoided &= ~accepting[next_states]
+            viable[index] = (avoided & viable[index + 1][next_states]).any(axis=1)
+        return viable
+
+    @staticmethod
+    def _within(gc_content: _GCContent, index: int) -> np.ndarray:
+        """Whether each nucleotide of a codon is within the constraint's location."""
+        positions = 3 * index + np.arange(3)
+        return (gc_content.start <= positions) & (positions < gc_content.end)
+
+    @staticmethod
+    def _bounds(gc_content: _GCContent) -> tuple[int, int]:
+        """The least and most GC a window may have."""
+        return (
+            math.ceil((gc_content.mini - _TOLERANCE) * gc_content.window),
+            math.floor((gc_content.maxi + _TOLERANCE) * gc_content.window),
+        )
+
+    def _windows_feasible(
+        self,
+        gc_content: _GCContent,
+        index: int,
+        cumulative: np.ndarray,
+        partial_gc: np.ndarray,
+        total_gc: np.ndarray,
+    ) -> np.ndarray:
+        """Whether each design (given the cumulative GC of its last nucleotides) keeps
+        the windows ending within the codon at `index` within bounds, and can keep
+        those ending within each of the next codons (which overlap it) within bounds.
+        """
+        window = gc_content.window
+        low, high = self._bounds(gc_content)
+        size = cumulative.shape[1] - 1
+        feasible = np.ones(len(cumulative), dtype=np.bool_)
+        for offset in range(3):
+            end = 3 * index + offset
+            if gc_content.start <= end - window + 1 and end < gc_content.end:
+                count = (
+                    cumulative[:, size - 2 + offset]
+                    - cumulative[:, size - 2 + offset - window]
+                )
+                feasible &= (low <= count) & (count <= high)
+
+        # The windows ending within the next codons, which overlap this one
+        ends = 3 * index + 3 + np.arange(window - 1)
+        ends = ends[(ends < gc_content.end) & (ends - window + 1 >= gc_content.start)]
+        if len(ends):
+            overlaps = window - (ends - 3 * index - 2)
+            ahead, offsets = ends // 3, ends % 3
+            least, most = (
+                total_gc[ahead] - total_gc[index + 1] + partial_gc[ahead, offsets]
+            ).T
+            counts = cumulative[:, size, None] - cumulative[:, size - overlaps]
+            feasible &= ((counts + most >= low) & (counts + least <= high)).all(axis=1)
+        return feasible
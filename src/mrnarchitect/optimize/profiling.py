@@ -0,0 +1,132 @@
+import contextlib
+import functools
+import time
+import typing
+
+import msgspec
+from dnachisel.DnaOptimizationProblem import DnaOptimizationProblem
+from dnachisel.Specification import Specification as DnaChiselSpecification
+
+SpecificationRole = typing.Literal["constraint", "objective"]
+
+
+class OptimizationProfile(msgspec.Struct, kw_only=True):
+    class Specification(msgspec.Struct, kw_only=True):
+        specification: str
+        role: SpecificationRole
+        evaluations: int
+        localized_evaluations: int
+        """The number of evaluations of a copy of the specification localized to the
+        region being mutated (the rest evaluated the whole sequence)."""
+        time_in_seconds: float
+        mean_time_in_seconds: float
+
+    specifications: list[Specification]
+    """The constraints and objectives, sorted by the time spent evaluating them."""
+    mutations_proposed: int
+    mutations_accepted: int
+    iterations_per_second: float
+    constraints_time_in_seconds: float
+    """The time spent resolving the constraints."""
+    objectives_time_in_seconds: float
+    """The time spent optimizing the objectives."""
+
+
+class _Record:
+    def __init__(self, specification: DnaChiselSpecification, role: SpecificationRole):
+        self.specification = specification
+        self.role = role
+        self.evaluations = 0
+        self.localized_evaluations = 0
+        self.time_in_seconds = 0.0
+
+
+@functools.cache
+def _profiled(cls: type) -> type:
+    """A subclass of a specification which times its evaluations.
+
+    It keeps the name of the specification, so it is labelled the same in reports.
+    """
+
+    def evaluate(self, problem):
+        # Localized copies of the specification share the record of the original
+        record: _Record | None = self.__dict__.get("_profile_record")
+        if record is None:
+            return cls.evaluate(self, problem)
+        start = time.perf_counter()
+        try:
+            return cls.evaluate(self, problem)
+        finally:
+            record.time_in_seconds += time.perf_counter() - start
+            record.evaluations += 1
+            if self is not record.specification:
+                record.localized_evaluations += 1
+
+    return type(
+        cls.__name__,
+        (cls,),
+        {
+            "evaluate": evaluate,
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+        },
+    )
+
+
+class Profiler:
+    """Records where the time of an optimization goes: in each phase, and in the
+    evaluations of each of its constraints and objectives.
+    """
+
+    def __init__(self):
+        self._records: list[_Record] = []
+        self._times: dict[str, float] = {"constraints": 0.0, "objectives": 0.0}
+
+    def instrument(self, problem: DnaOptimizationProblem):
+        """Time the evaluations of the constraints and objectives of a problem (and
+        of the local problems created from it).
+        """
+        for role, specifications in (
+            ("constraint", problem.constraints),
+            ("objective", problem.objectives),
+        ):
+            for specification in specifications:
+                specification.__class__ = _profiled(type(specification))
+                specification._profile_record = _Record(specification, role)
+                self._records.append(specification._profile_record)
+
+    @contextlib.contextmanager
+    def phase(self, name: typing.Literal["constraints", "objectives"]):
+        """Time a phase of the optimization."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._times[name] += time.perf_counter() - start
+
+    def profile(
+        self, mutations_proposed: int, mutations_accepted: int
+    ) -> OptimizationProfile:
+        elapsed = self._times["constraints"] + self._times["objectives"]
+        return OptimizationProfile(
+            specifications=[
+                OptimizationProfile.Specification(
+                    specification=str(it.specification),
+                    role=it.role,
+                    evaluations=it.evaluations,
+                    localized_evaluations=it.localized_evaluations,
+                    time_in_seconds=it.time_in_seconds,
+                    mean_time_in_seconds=it.time_in_seconds / it.evaluations
+                    if it.evaluations
+                    else 0.0,
+                )
+                for it in sorted(
+                    self._records, key=lambda it: it.time_in_seconds, reverse=True
+                )
+            ],
+            mutations_proposed=mutations_proposed,
+            mutations_accepted=mutations_accepted,
+            iterations_per_second=mutations_proposed / elapsed if elapsed else 0.0,
+            constraints_time_in_seconds=self._times["constraints"],
+            objectives_time_in_seconds=self._times["objectives"],
+        )
@@ -1,8 +1,16 @@
+import collections
+import functools
+import math
+
+import numpy as np
+from dnachisel.biotools import IUPAC_NOTATION, reverse_complement
 from dnachisel.Location import Location
+from dnachisel.SequencePattern import DnaNotationPattern, SequencePattern
 from dnachisel.Specification import SpecEvaluation, Specification
 
+from mrnarchitect.data import load_codon_usage_table
 from mrnarchitect.organism import CodonUsageTable
-from mrnarchitect.sequence import Sequence
+from mrnarchitect.sequence import CodonWeightIndex
 
 
 class CAIRange(Specification):
@@ -19,6 +27,7 @@ class CAIRange(Specification):
         self.cai_min = cai_min
         self.cai_max = cai_max
         self.boost = boost
+        self._cai: CodonWeightIndex | None = None
 
     def evaluate(self, problem):
         location = self.location
@@ -27,7 +36,13 @@ class CAIRange(Specification):
 
         sequence = location.extract_sequence(problem.sequence)
 
-        cai = Sequence(sequence).codon_adaptation_index(self.codon_usage_table)
+        if self._cai is None:
+            self._cai = CodonWeightIndex(
+                sequence, load_codon_usage_table(self.codon_usage_table).log_weights
+            )
+        else:
+            self._cai = self._cai.update(sequence)
+        cai = self._cai.value
         if cai is None:
             raise RuntimeError
         score = 0.0
@@ -50,3 +65,202 @@ class CAIRange(Specification):
             locations=[location],
             message=message,
         )
+
+
+class PatternAutomaton:
+    """An Aho-Corasick automaton that finds every match of many nucleotide patterns,
+    on both strands, in a single scan of the sequence.
+
+    Patterns are expanded into all of their "ACGT" variants (e.g. "GCNGC" has four),
+    and the reverse-complement of each variant is matched for the minus strand of
+    non-palindromic patterns.
+
+    >>> automaton = PatternAutomaton([DnaNotationPattern(it) for it in ["AAC", "CNG"]])
+    >>> automaton.find_matches("GTTCAGAAC")
+    [(0, 0, 3, -1), (1, 3, 6, 1), (0, 6, 9, 1)]
+    """
+
+    MAX_VARIANTS = 4096
+    """The maximum number of variants of a single pattern."""
+
+    def __init__(self, patterns: list[DnaNotationPattern]):
+        self.patterns = patterns
+        """The patterns of the automaton."""
+
+        # The trie of all pattern variants, with the outputs of each state as
+        # (pattern index, variant length, strand)
+        transitions: list[dict[str, int]] = [{}]
+        outputs: list[list[tuple[int, int, int]]] = [[]]
+        for index, pattern in enumerate(patterns):
+            if not self.supports(pattern):
+                raise ValueError(f"Pattern is not supported: {pattern}")
+            strands = [1] if pattern.is_palyndromic else [1, -1]
+            for variant in pattern.all_variants():
+                for strand in strands:
+                    state = 0
+                    for nucleotide in (
+                        variant if strand == 1 else reverse_complement(variant)
+                    ):
+                        if nucleotide not in transitions[state]:
+                            transitions.append({})
+                            outputs.append([])
+                            transitions[state][nucleotide] = len(transitions) - 1
+                        state = transitions[state][nucleotide]
+                    outputs[state].append((index, len(variant), strand))
+
+        # Complete the trie into a dense automaton, following the failure links
+        # breadth first
+        self._transitions = [[0] * 4 for _ in transitions]
+        failures = [0] * len(transitions)
+        queue = collections.deque([0])
+        while queue:
+            state = queue.popleft()
+            for i, nucleotide in enumerate("ACGT"):
+                if nucleotide in transitions[state]:
+                    next_state = transitions[state][nucleotide]
+                    self._transitions[state][i] = next_state
+                    if state:
+                        failures[next_state] = self._transitions[failures[state]][i]
+                        outputs[next_state] += outputs[failures[next_state]]
+                    queue.append(next_state)
+                elif state:
+                    self._transitions[state][i] = self._transitions[failures[state]][i]
+        self._outputs = outputs
+
+        self.size = max((len(it.sequence) for it in patterns), default=0)
+        """The length of the longest pattern."""
+
+    @functools.cached_property
+    def tables(self) -> tuple[np.ndarray, np.ndarray]:
+        """The automaton as arrays: the next state from each state on each nucleotide
+        (in the order "ACGT"), and whether each state matches any pattern.
+        """
+        return (
+            np.array(self._transitions, dtype=np.int64),
+            np.array([bool(it) for it in self._outputs]),
+        )
+
+    @classmethod
+    def supports(cls, pattern: SequencePattern) -> bool:
+        """Whether the pattern has a fixed sequence, with a bounded number of variants,
+        that can be matched by the automaton.
+        """
+        return (
+            isinstance(pattern, DnaNotationPattern)
+            and math.prod(len(IUPAC_NOTATION[it]) for it in pattern.sequence)
+            <= cls.MAX_VARIANTS
+        )
+
+    def find_matches(
+        self, sequence: str, start: int = 0, end: int | None = None
+    ) -> list[tuple[int, int, int, int]]:
+        """Find all matches within `sequence[start:end]`, as tuples of
+        `(pattern index, start, end, strand)`.
+        """
+        encoding = {"A": 0, "C": 1, "G": 2, "T": 3}
+        transitions, outputs = self._transitions, self._outputs
+        matches = []
+        state = 0
+        for i in range(start, len(sequence) if end is None else end):
+            nucleotide = encoding.get(sequence[i])
+            if nucleotide is None:
+                state = 0
+                continue
+            state = transitions[state][nucleotide]
+            for index, length, strand in outputs[state]:
+                matches.append((index, i + 1 - length, i + 1, strand))
+        return matches
+
+
+class AvoidPatterns(Specification):
+    """Enforce that none of the given patterns are present in the sequence, on either
+    strand. This is equivalent to one `AvoidPattern` per pattern, but all of the
+    patterns are found in a single scan of the sequence.
+
+    >>> from dnachisel import DnaOptimizationProblem
+    >>> problem = DnaOptimizationProblem(
+    ...     "ATGAAAAAAGGTCTC", constraints=[AvoidPatterns(["6xA", "BsaI_site"])]
+    ... )
+    >>> problem.constraints[0].evaluate(problem).locations
+    [3-9(+), 9-15(+)]
+    """
+
+    best_possible_score = 0
+    priority = 1
+    shorthand_name = "no"
+
+    def __init__(
+        self,
+        patterns: list[str | SequencePattern] | PatternAutomaton,
+        location: Location | None = None,
+        boost: float = 1.0,
+    ):
+        if isinstance(patterns, PatternAutomaton):
+            # An automaton compiled beforehand can be shared by many specifications
+            self.automaton = patterns
+        else:
+            self.automaton = PatternAutomaton(
+                [
+                    SequencePattern.from_string(it) if isinstance(it, str) else it
+                    for it in patterns
+                ]
+            )
+        self.patterns = self.automaton.patterns
+        self.location = Location.from_data(location)
+        self.boost = boost
+        self.mutated_location: Location | None = None
+        """When localized, only the matches overlapping this location are reported."""
+
+    def initialized_on_problem(self, problem, role="constraint"):
+        return self._copy_with_full_span_if_no_location(problem)
+
+    def evaluate(self, problem):
+        location = self.location
+        if location is None:
+            location = Location(0, len(problem.sequence))
+
+        locations = sorted(
+            Location(start, end, strand)
+            for _, start, end, strand in self.automaton.find_matches(
+                problem.sequence, location.start, location.end
+            )
+            if self.mutated_location is None
+            or (start < self.mutated_location.end and end > self.mutated_location.start)
+        )
+
+        if locations:
+            message = f"Failed. Patterns found at positions {locations}"
+        else:
+            message = "Passed. Patterns not found !"
+
+        return SpecEvaluation(
+            self,
+            problem,
+            score=-len(locations),
+            locations=locations,
+            message=message,
+        )
+
+    def localized(self, location, problem=None, with_righthand=True):
+        """Localize the scan to the given location, extended by the size of the
+        longest pattern. Matches of other patterns that do not overlap the location
+        can not be changed by local mutations, so they are ignored.
+        """
+        if self.location.overlap_region(location) is None:
+            return None
+        extended_location = location.extended(
+            self.automaton.size - 1, right=with_righthand
+        )
+        return self.copy_with_changes(
+            location=self.location.overlap_region(extended_location),
+            mutated_location=location,
+        )
+
+    def short_label(self):
+        return f"No {', '.join(str(it) for it in self.patterns)}"
+
+    def breach_label(self):
+        return ", ".join(str(it) for it in self.patterns)
+
+    def label_parameters(self):
+        return [("patterns", ", ".join(str(it) for it in self.patterns))]
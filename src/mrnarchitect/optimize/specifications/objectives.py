@@ -2,28 +2,44 @@ from dnachisel import NoSolutionError
 from dnachisel.Location import Location
 from dnachisel.Specification import SpecEvaluation, Specification
 
-from mrnarchitect.sequence import Sequence
+from mrnarchitect.data import load_trna_adaptation_index_log_weights
+from mrnarchitect.organism import Organism
+from mrnarchitect.sequence import (
+    CodonWeightIndex,
+    PseudoMinimumFreeEnergy,
+    WindowEnergies,
+)
 
 
 class OptimizeTAI(Specification):
     def __init__(
         self,
         target_tai: float = 1.0,
-        organism: str = "homo-sapiens",
+        organism: Organism | str = "homo-sapiens",
         location: Location | None = None,
         boost: float = 1.0,
     ):
         self.target_tai = target_tai
-        self.organism = organism
+        self.organism = organism.slug if isinstance(organism, Organism) else organism
         self.location = location
         self.boost = boost
+        self._tai: CodonWeightIndex | None = None
 
     def evaluate(self, problem):
         location = self.location or Location(0, len(problem.sequence))
 
         sequence = location.extract_sequence(problem.sequence)
 
-        tai = Sequence(sequence).trna_adaptation_index(organism=self.organism)
+        if self._tai is None:
+            log_weights = load_trna_adaptation_index_log_weights(self.organism)
+            if log_weights is None:
+                raise NoSolutionError(
+                    f"tAI cannot be calculated for organism {self.organism}.", problem
+                )
+            self._tai = CodonWeightIndex(sequence, log_weights)
+        else:
+            self._tai = self._tai.update(sequence)
+        tai = self._tai.value
 
         if tai is None:
             raise NoSolutionError("tAI cannot be calculated for sequence.", problem)
@@ -55,6 +71,7 @@ class TargetPseudoMFE(Specification):
         self.step = step
         self.location = location
         self.boost = boost
+        self._pseudo_mfe: PseudoMinimumFreeEnergy | None = None
 
     def evaluate(self, problem):
         location = self.location
@@ -63,7 +80,11 @@ class TargetPseudoMFE(Specification):
 
         sequence = location.extract_sequence(problem.sequence)
 
-        pseudo_mfe = Sequence(sequence).pseudo_minimum_free_energy
+        if self._pseudo_mfe is None:
+            self._pseudo_mfe = PseudoMinimumFreeEnergy(sequence)
+        else:
+            self._pseudo_mfe = self._pseudo_mfe.update(sequence)
+        pseudo_mfe = self._pseudo_mfe.energy
 
         pseudo_mfe_diff = abs(pseudo_mfe - self.target_pseudo_mfe)
 
@@ -79,3 +100,72 @@ class TargetPseudoMFE(Specification):
             locations=[location],
             message=message,
         )
+
+    def localized(self, location, problem=None):
+        if self.location is not None and self.location.overlap_region(location) is None:
+            return None
+        # The localized objective shares the pseudo-MFE of the previous evaluation
+        return self
+
+
+class TargetWindowedMFE(Specification):
+    """Targets the mean MFE of the windows of the sequence, folded by ViennaRNA.
+
+    Windows folded recently (such as those of a sequence the search reverted to)
+    are not folded again.
+    """
+
+    def __init__(
+        self,
+        target_mfe: float,
+        window_size: int = 40,
+        step: int = 4,
+        max_bp_span: int | None = None,
+        location: Location | None = None,
+        boost: float = 1.0,
+    ):
+        self.target_mfe = target_mfe
+        self.window_size = window_size
+        self.step = step
+        self.max_bp_span = max_bp_span
+        self.location = location
+        self.boost = boost
+        self._energies: WindowEnergies | None = None
+
+    def evaluate(self, problem):
+        location = self.location or Location(0, len(problem.sequence))
+
+        sequence = location.extract_sequence(problem.sequence)
+
+        if self._energies is None:
+            self._energies = WindowEnergies(
+                sequence, self.window_size, self.step, self.max_bp_span
+            )
+        else:
+            self._energies = self._energies.update(sequence)
+        mfe = self._energies.mean_energy
+
+        mfe_diff = abs(mfe - self.target_mfe)
+
+        message = f"Mean window MFE {mfe} is {mfe_diff} off target {self.target_mfe}"
+
+        return SpecEvaluation(
+            self,
+            problem,
+            score=-mfe_diff,
+            locations=[location],
+            message=message,
+        )
+
+    def localized(self, location, problem=None):
+        if self.location is not None and self.location.overlap_region(location) is None:
+            return None
+        # The localized objective shares the window MFEs of the previous evaluation
+        return self
+
+    def label_parameters(self):
+        return [
+            ("target", str(self.target_mfe)),
+            ("window", str(self.window_size)),
+            ("step", str(self.step)),
+        ]
@@ -1,11 +1,18 @@
+import concurrent.futures
 import functools
+import hashlib
+import math
+import multiprocessing
+import os
 import re
 import statistics
+import threading
 import typing
-from collections import Counter, defaultdict
 
 import msgspec
+import numpy as np
 
+from mrnarchitect.cache import LRUCache, MetricCache, SQLiteCache
 from mrnarchitect.codon_table import (
     CodonUsage,
     CodonUsageTable,
@@ -13,13 +20,59 @@ from mrnarchitect.codon_table import (
 )
 from mrnarchitect.constants import (
     AMINO_ACIDS,
-    CODONS,
+    NUCLEOTIDES,
+    ORDERED_CODONS,
     CodonTable,
 )
-from mrnarchitect.data import load_codon_usage_table, load_trna_adaptation_index_dataset
+from mrnarchitect.data import (
+    load_codon_usage_table,
+    load_trna_adaptation_index_log_weights,
+)
 from mrnarchitect.organism import Organism
 from mrnarchitect.types import AminoAcid, Codon
 
+METRIC_CACHE = MetricCache(
+    max_entries=int(os.getenv("MRNARCHITECT_METRIC_CACHE_MAX_ENTRIES", 10_000)),
+    max_bytes=int(os.getenv("MRNARCHITECT_METRIC_CACHE_MAX_BYTES", 256 * 1024**2)),
+)
+"""Memoized `Sequence` metrics, bounded by entry count and (approximate) bytes."""
+
+WINDOW_ENERGY_CACHE = LRUCache(
+    max_entries=int(os.getenv("MRNARCHITECT_WINDOW_ENERGY_CACHE_MAX_ENTRIES", 100_000))
+)
+"""The MFEs of recently folded windows (by window and maximum base pair span), so
+windows left unchanged by a rejected mutation are not folded again."""
+
+_NUCLEOTIDE_ENCODING = np.zeros(256, dtype=np.uint8)
+_NUCLEOTIDE_ENCODING[np.frombuffer(NUCLEOTIDES.encode("ascii"), dtype=np.uint8)] = (
+    np.arange(len(NUCLEOTIDES))
+)
+
+_CODON_NUCLEOTIDES = np.array(
+    [
+        [NUCLEOTIDES.index(nucleotide) for nucleotide in codon]
+        for codon in ORDERED_CODONS
+    ]
+)
+"""The nucleotide indices of each codon in `ORDERED_CODONS`, as a (64, 3) array."""
+
+_CODON_AMINO_ACIDS = np.array(
+    [CodonTable.amino_acid(codon) for codon in ORDERED_CODONS], dtype="S1"
+)
+"""The amino acid of each codon in `ORDERED_CODONS`."""
+
+_AMINO_ACID_ORDER: list[AminoAcid] = sorted(AMINO_ACIDS)
+
+_CODON_AMINO_ACID_INDICES = np.array(
+    [_AMINO_ACID_ORDER.index(CodonTable.amino_acid(codon)) for codon in ORDERED_CODONS]
+)
+"""The index of the amino acid (in `_AMINO_ACID_ORDER`) of each codon in `ORDERED_CODONS`."""
+
+_SYNONYMOUS_CODON_COUNTS = np.array(
+    [len(CodonTable.codons(amino_acid)) for amino_acid in _AMINO_ACID_ORDER]
+)
+"""The number of synonymous codons of each amino acid in `_AMINO_ACID_ORDER`."""
+
 
 class MinimumFreeEnergy(msgspec.Struct, kw_only=True):
     structure: str
@@ -40,6 +93,121 @@ class WindowedMinimumFreeEnergy(msgspec.Struct, kw_only=True):
     standard_deviation: float
 
 
+WindowedMinimumFreeEnergyMode = typing.Literal["window", "parallel"]
+
+T = typing.TypeVar("T")
+
+
+@functools.cache
+def _folding_parameters() -> bytes:
+    """The ViennaRNA version and model details that folding results depend on."""
+    import RNA
+
+    model_details = RNA.md()
+    return msgspec.json.encode(
+        {
+            "version": RNA.__version__,
+            **{
+                name: getattr(model_details, name)
+                for name in (
+                    "temperature",
+                    "dangles",
+                    "noLP",
+                    "noGU",
+                    "noGUclosure",
+                    "special_hp",
+                    "energy_set",
+                    "max_bp_span",
+                    "window_size",
+                )
+            },
+        }
+    )
+
+
+class FoldingStore:
+    """Persists ViennaRNA folding results in a `SQLiteCache`, so they are shared
+    between processes and survive restarts.
+
+    Results are keyed by a hash of the sequence, the kind of result, and the
+    ViennaRNA version and model details.
+    """
+
+    def __init__(self, cache: SQLiteCache):
+        self.cache = cache
+
+    @classmethod
+    def from_env(cls) -> "FoldingStore | None":
+        """Configure a store from `MRNARCHITECT_FOLDING_STORE_*` environment variables,
+        or None if `MRNARCHITECT_FOLDING_STORE_DB` is not set.
+        """
+        path = os.getenv("MRNARCHITECT_FOLDING_STORE_DB")
+        if not path:
+            return None
+        max_bytes = int(os.getenv("MRNARCHITECT_FOLDING_STORE_MAX_BYTES", 1024**3))
+        return cls(SQLiteCache(path, max_bytes=max_bytes))
+
+    def key(self, kind: str, sequence: str) -> str:
+        return hashlib.sha256(
+            b"\0".join([_folding_parameters(), kind.encode(), sequence.encode()])
+        ).hexdigest()
+
+    def get_or_fold(
+        self,
+        kind: str,
+        sequences: list[str],
+        fold: typing.Callable[[list[str]], list[T]],
+        type: type[T],
+    ) -> list[T]:
+        """Get the stored results of the sequences, calling `fold` (once) with the
+        sequences that are missing, and storing its results.
+        """
+        keys = [self.key(kind, it) for it in sequences]
+        found = {
+            key: msgspec.msgpack.decode(value, type=type)
+            for key, value in self.cache.get_many(keys).items()
+        }
+        missing = {
+            key: sequence
+            for key, sequence in zip(keys, sequences, strict=True)
+            if key not in found
+        }
+        if missing:
+            folded = dict(zip(missing, fold(list(missing.values())), strict=True))
+            self.cache.put_many(
+                {key: msgspec.msgpack.encode(value) for key, value in folded.items()}
+            )
+            found.update(folded)
+        return [found[key] for key in keys]
+
+
+FOLDING_STORE = FoldingStore.from_env()
+"""The persistent store of folding results, if configured."""
+
+
+def _get_or_fold(
+    kind: str,
+    sequences: list[str],
+    fold: typing.Callable[[list[str]], list[T]],
+    type: type[T],
+) -> list[T]:
+    """Fold the sequences, consulting the `FOLDING_STORE` first if it is configured."""
+    if FOLDING_STORE is None:
+        return fold(sequences)
+    return FOLDING_STORE.get_or_fold(kind, sequences, fold, type)
+
+
+def _minimum_free_energies(
+    sequences: list[str],
+    fold: typing.Callable[[list[str]], list[MinimumFreeEnergy]] | None = None,
+) -> list[MinimumFreeEnergy]:
+    """The minimum free energies of the sequences, folded with `fold` (or one by one)
+    unless they are in the `FOLDING_STORE`.
+    """
+    fold = fold or (lambda sequences: [_minimum_free_energy(it) for it in sequences])
+    return _get_or_fold("mfe", sequences, fold, MinimumFreeEnergy)
+
+
 class GCWindowStats(msgspec.Struct, kw_only=True):
     window_size: int
     min_gc_ratio: float
@@ -187,7 +355,6 @@ class Sequence(msgspec.Struct, frozen=True):
         raise NotImplementedError
 
     @property
-    @functools.cache
     def is_amino_acid_sequence(self):
         """Returns True if the sequence may be an amino acid (i.e. length % 3 == 0).
 
@@ -214,14 +381,14 @@ class Sequence(msgspec.Struct, frozen=True):
             yield CodonTable.amino_acid(codon)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def amino_acid_sequence(self) -> str:
         """Returns the nucleic acid sequence as an amino acid sequence.
 
         >>> Sequence("ATACGG").amino_acid_sequence
         'IR'
         """
-        return "".join(CodonTable.amino_acid(codon) for codon in self.codons)
+        return _CODON_AMINO_ACIDS[self.codon_indices].tobytes().decode("ascii")
 
     @property
     def reverse(self) -> "Sequence":
@@ -252,52 +419,112 @@ class Sequence(msgspec.Struct, frozen=True):
         return self.reverse.complement
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
+    def encoded(self) -> np.ndarray:
+        """The sequence as a read-only array of nucleotide indices into `NUCLEOTIDES`.
+
+        >>> Sequence("ACGTA").encoded
+        array([0, 1, 2, 3, 0], dtype=uint8)
+        """
+        encoded = _encode(self.nucleic_acid_sequence)
+        encoded.flags.writeable = False
+        return encoded
+
+    @property
+    @METRIC_CACHE.memoize
+    def nucleotide_counts(self) -> np.ndarray:
+        """The count of each nucleotide, indexed as in `NUCLEOTIDES`.
+
+        >>> Sequence("ACCGGGTTTT").nucleotide_counts
+        array([1, 2, 3, 4])
+        """
+        return np.bincount(self.encoded, minlength=4)
+
+    @property
+    @METRIC_CACHE.memoize
+    def dinucleotide_counts(self) -> np.ndarray:
+        """The count of each (overlapping) dinucleotide, indexed by `4 * n1 + n2`.
+
+        >>> int(Sequence("ACGCG").dinucleotide_counts[4 * 1 + 2])  # CG
+        2
+        """
+        encoded = self.encoded
+        return np.bincount(4 * encoded[:-1] + encoded[1:], minlength=16)
+
+    @property
+    @METRIC_CACHE.memoize
+    def trinucleotide_counts(self) -> np.ndarray:
+        """The count of each (overlapping) trinucleotide, indexed by `16 * n1 + 4 * n2 + n3`.
+
+        >>> int(Sequence("TTTTA").trinucleotide_counts[63])  # TTT
+        2
+        """
+        encoded = self.encoded
+        return np.bincount(
+            16 * encoded[:-2] + 4 * encoded[1:-1] + encoded[2:], minlength=64
+        )
+
+    @property
+    @METRIC_CACHE.memoize
+    def codon_indices(self) -> np.ndarray:
+        """The codons of the sequence as indices into `ORDERED_CODONS`.
+
+        >>> Sequence("AAAACGTTT").codon_indices
+        array([ 0,  6, 63], dtype=uint8)
+        """
+        if not self.is_amino_acid_sequence:
+            raise ValueError(
+                "Nucleic acid sequence length must be a multiple of 3 to be a valid amino acid sequence."
+            )
+        codon_indices = _codon_indices(self.encoded.reshape(-1, 3))
+        codon_indices.flags.writeable = False
+        return codon_indices
+
+    @property
+    @METRIC_CACHE.memoize
+    def codon_counts(self) -> np.ndarray:
+        """The count of each codon, indexed as in `ORDERED_CODONS`.
+
+        >>> int(Sequence("AAAACGAAA").codon_counts[0])
+        2
+        """
+        return np.bincount(self.codon_indices, minlength=64)
+
+    @property
     def a_ratio(self):
         """The ratio of A nucleotides in the sequence.
 
         >>> Sequence("ACCGGGTTTT").a_ratio
         0.1
         """
-        return len([it for it in self.nucleic_acid_sequence if it == "A"]) / len(
-            self.nucleic_acid_sequence
-        )
+        return int(self.nucleotide_counts[0]) / len(self.nucleic_acid_sequence)
 
     @property
-    @functools.cache
     def c_ratio(self):
         """The ratio of C nucleotides in the sequence.
 
         >>> Sequence("ACCGGGTTTT").c_ratio
         0.2
         """
-        return len([it for it in self.nucleic_acid_sequence if it == "C"]) / len(
-            self.nucleic_acid_sequence
-        )
+        return int(self.nucleotide_counts[1]) / len(self.nucleic_acid_sequence)
 
     @property
-    @functools.cache
     def g_ratio(self):
         """The ratio of G nucleotides in the sequence.
 
         >>> Sequence("ACCGGGTTTT").g_ratio
         0.3
         """
-        return len([it for it in self.nucleic_acid_sequence if it == "G"]) / len(
-            self.nucleic_acid_sequence
-        )
+        return int(self.nucleotide_counts[2]) / len(self.nucleic_acid_sequence)
 
     @property
-    @functools.cache
     def t_ratio(self):
         """The ratio of T nucleotides in the sequence.
 
         >>> Sequence("ACCGGGTTTT").t_ratio
         0.4
         """
-        return len([it for it in self.nucleic_acid_sequence if it == "T"]) / len(
-            self.nucleic_acid_sequence
-        )
+        return int(self.nucleotide_counts[3]) / len(self.nucleic_acid_sequence)
 
     @property
     def at_ratio(self):
@@ -327,50 +554,94 @@ class Sequence(msgspec.Struct, frozen=True):
         return self.c_ratio + self.g_ratio
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def gc1_ratio(self) -> float | None:
         """GC Content at the First Position of Synonymous Codons (GC1)."""
         if not self.is_amino_acid_sequence:
             return None
-        c = Counter(c[0] for c in self.codons)
-        return (c["C"] + c["G"]) / (c["A"] + c["C"] + c["G"] + c["T"])
+        return self._codon_position_gc_ratio(0)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def gc2_ratio(self) -> float | None:
         """GC Content at the Second Position of Synonymous Codons (GC2)."""
         if not self.is_amino_acid_sequence:
             return None
-        c = Counter(c[1] for c in self.codons)
-        return (c["C"] + c["G"]) / (c["A"] + c["C"] + c["G"] + c["T"])
+        return self._codon_position_gc_ratio(1)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def gc3_ratio(self) -> float | None:
         """GC Content at the Third Position of Synonymous Codons (GC3)."""
         if not self.is_amino_acid_sequence:
             return None
-        c = Counter(c[2] for c in self.codons)
-        return (c["C"] + c["G"]) / (c["A"] + c["C"] + c["G"] + c["T"])
+        return self._codon_position_gc_ratio(2)
+
+    def _codon_position_gc_ratio(self, position: int) -> float:
+        counts = self.codon_counts
+        gc = np.isin(_CODON_NUCLEOTIDES[:, position], [1, 2])
+        return int(counts[gc].sum()) / int(counts.sum())
 
-    @functools.cache
+    @property
+    @METRIC_CACHE.memoize
+    def cumulative_gc_counts(self) -> np.ndarray:
+        """The cumulative counts of C and G nucleotides, as a (2, len + 1) array.
+        The count of C (or G) nucleotides in `self[i:j]` is `counts[k, j] - counts[k, i]`.
+
+        >>> Sequence("ACGGT").cumulative_gc_counts
+        array([[0, 0, 1, 1, 1, 1],
+               [0, 0, 0, 1, 2, 2]])
+        """
+        counts = np.zeros((2, len(self) + 1), dtype=np.int64)
+        np.cumsum(self.encoded == 1, out=counts[0, 1:])
+        np.cumsum(self.encoded == 2, out=counts[1, 1:])
+        return counts
+
+    def gc_profile(self, window_size: int = 40) -> np.ndarray:
+        """The GC ratio of every window of `window_size` nucleotides, indexed by the
+        window start. A sequence shorter than the window is treated as a single window.
+
+        >>> Sequence("AACCGG").gc_profile(4)
+        array([0.5 , 0.75, 1.  ])
+        """
+        length = min(window_size, len(self))
+        if not length:
+            raise ValueError("Cannot calculate the GC profile of an empty sequence.")
+        counts = self.cumulative_gc_counts
+        window_counts = counts[:, length:] - counts[:, : counts.shape[1] - length]
+        return window_counts[0] / length + window_counts[1] / length
+
+    @METRIC_CACHE.memoize
     def gc_ratio_window(self, window_size: int = 40) -> GCWindowStats:
-        gcs = [
-            {"start": i, "gc_ratio": self[i : i + window_size].gc_ratio}
-            for i in range(0, max(len(self) - window_size, 1))
-        ]
-        min_gc = min(gcs, key=lambda s: s["gc_ratio"])
-        max_gc = max(gcs, key=lambda s: s["gc_ratio"])
+        """The minimum and maximum windowed GC ratio of the sequence.
+
+        >>> Sequence("AACCGGTT").gc_ratio_window(4)
+        GCWindowStats(window_size=4, min_gc_ratio=0.5, min_gc_start=0, max_gc_ratio=1.0, max_gc_start=2)
+        """
+        # NOTE: The final window is (historically) excluded from the statistics
+        gc_ratios = self.gc_profile(window_size)[: max(len(self) - window_size, 1)]
+        min_gc_start = int(np.argmin(gc_ratios))
+        max_gc_start = int(np.argmax(gc_ratios))
         return GCWindowStats(
             window_size=window_size,
-            min_gc_ratio=min_gc["gc_ratio"],
-            min_gc_start=min_gc["start"],
-            max_gc_ratio=max_gc["gc_ratio"],
-            max_gc_start=max_gc["start"],
+            min_gc_ratio=float(gc_ratios[min_gc_start]),
+            min_gc_start=min_gc_start,
+            max_gc_ratio=float(gc_ratios[max_gc_start]),
+            max_gc_start=max_gc_start,
         )
 
+    def gc_ratio_windows(
+        self, window_sizes: typing.Iterable[int] = (40,)
+    ) -> list[GCWindowStats]:
+        """The windowed GC ratio statistics for several window sizes at once.
+
+        >>> [it.max_gc_ratio for it in Sequence("AACCGGTT").gc_ratio_windows([2, 4])]
+        [1.0, 1.0]
+        """
+        return [self.gc_ratio_window(window_size) for window_size in window_sizes]
+
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def uridine_depletion(self) -> float | None:
         """The Uridine depletion of the sequence.
 
@@ -380,10 +651,10 @@ class Sequence(msgspec.Struct, frozen=True):
         if not self.is_amino_acid_sequence:
             return None
 
-        codons = list(self.codons)
-        return len([it for it in codons if it[2] == "T"]) / len(codons)
+        counts = self.codon_counts
+        return int(counts[_CODON_NUCLEOTIDES[:, 2] == 3].sum()) / int(counts.sum())
 
-    @functools.cache
+    @METRIC_CACHE.memoize
     def codon_adaptation_index(
         self, codon_usage_table: CodonUsageTable | str = "homo-sapiens"
     ) -> float | None:
@@ -403,40 +674,51 @@ class Sequence(msgspec.Struct, frozen=True):
 
         codon_usage_table = load_codon_usage_table(codon_usage_table)
 
-        weights = [codon_usage_table.weight(codon) for codon in self.codons]
-        cai = statistics.geometric_mean(weights)
-
-        return cai
+        return _geometric_mean(self.codon_counts, codon_usage_table.log_weights)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def minimum_free_energy(self) -> MinimumFreeEnergy:
         """Calculate the minimum free energy of the sequence (Zukker).
 
         >>> Sequence("ACTCTTCTGGTCCCCACAGACTCAGAGAGAACCCACC").minimum_free_energy
         MinimumFreeEnergy(structure='.((((.((((((......))).)))))))........', energy=-10.199999809265137, average_energy=-0.2756756705206794, paired_nt_ratio=0.5405405405405406)
         """
-        import RNA
-
-        mfe = RNA.fold_compound(str(self)).mfe()
-        structure, energy = mfe[0], mfe[1]
-        return MinimumFreeEnergy(
-            structure=structure,
-            energy=energy,
-            average_energy=energy / len(self),
-            paired_nt_ratio=(structure.count("(") + structure.count(")"))
-            / len(structure),
-        )
+        return _minimum_free_energies([str(self)])[0]
 
-    @functools.cache
+    @METRIC_CACHE.memoize
     def windowed_minimum_free_energy(
-        self, window_size: int = 40, step: int = 4
+        self,
+        window_size: int = 40,
+        step: int = 4,
+        mode: WindowedMinimumFreeEnergyMode = "window",
     ) -> WindowedMinimumFreeEnergy:
-        """Calculate the windowed minimum free energy."""
-        mfes = [
-            self[i : i + window_size].minimum_free_energy
-            for i in range(0, len(self) - window_size, step)
+        """Calculate the windowed minimum free energy.
+
+        The `mode` sets how the energy of each window is calculated:
+          - "window" folds each window on its own.
+          - "parallel" folds each window on its own, sharded across a process pool
+            (started on first use, and reused by later calls).
+
+        >>> sequence = Sequence("GGGGAAACCCCATATGGGGAAACCCCATATGGGGAAACCCC")
+        >>> sequence.windowed_minimum_free_energy(14, 7).energies[0]
+        MinimumFreeEnergy(structure='((((...))))...', energy=-6.199999809265137, average_energy=-0.44285712923322407, paired_nt_ratio=0.5714285714285714)
+        """
+        sequence = str(self)
+        windows = [
+            sequence[i : i + window_size]
+            for i in range(0, len(sequence) - window_size, step)
         ]
+        match mode:
+            case "window" if FOLDING_STORE is None:
+                # Memoize each window, as most are unchanged between similar sequences
+                mfes = [Sequence(it).minimum_free_energy for it in windows]
+            case "window":
+                mfes = _minimum_free_energies(windows)
+            case "parallel":
+                mfes = _minimum_free_energies(windows, _parallel_minimum_free_energies)
+            case _:
+                raise ValueError(f"Invalid mode: {mode}")
 
         return WindowedMinimumFreeEnergy(
             window_size=window_size,
@@ -447,47 +729,20 @@ class Sequence(msgspec.Struct, frozen=True):
         )
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def pseudo_minimum_free_energy(self) -> float:
         """Calculate the "pseudo-MFE" of the sequence.
 
         see: https://academic.oup.com/nar/article/41/6/e73/2902446
+
+        >>> Sequence("GGGGAAACCCCATATGGGGAAACCCC").pseudo_minimum_free_energy
+        -3.581538461538462
         """
 
-        def _get_energy(seq1: str, seq2: str) -> float:
-            bond_energy = 0
-            for i in range(min(len(seq1), len(seq2))):
-                n1, n2 = seq1[i], seq2[i]
-                match (n1, n2):
-                    case ("G", "C") | ("C", "G"):
-                        e = 3.12
-                    case ("A", "T") | ("T", "A"):
-                        e = 1
-                    case ("G", "T") | ("T", "G"):
-                        e = 1
-                    case _:
-                        e = 0
-                bond_energy += e
-            return bond_energy
+        return PseudoMinimumFreeEnergy(self).energy
 
-        sequence = str(self)
-        sequence_size = len(sequence)
-        i_block_size = 2  # initial block size
-        f_block_size = sequence_size / 2  # final block size
-        loop_size = 3  # minimum loop size
-        c_energy = 0  # cumulative energy
-        for s in [sequence, sequence[::-1]]:
-            b = i_block_size
-            while b < f_block_size and sequence_size >= (loop_size + 2 * b):
-                b += 1
-                seq1 = s[0:b]
-                seq2 = s[loop_size + b : loop_size + 2 * b]
-                energy = _get_energy(seq1, seq2)
-                c_energy += energy
-        return -c_energy / sequence_size
-
-    @property
-    @functools.cache
+    @property
+    @METRIC_CACHE.memoize
     def gini_coefficient(self) -> float | None:
         """Calculate the Gini coefficient of the sequence.
         see: https://en.wikipedia.org/wiki/Gini_coefficient
@@ -501,21 +756,18 @@ class Sequence(msgspec.Struct, frozen=True):
         if not self.is_amino_acid_sequence:
             return None
 
-        counts = defaultdict(int)
-        for codon in self.codons:
-            counts[codon] += 1
+        counts = self.codon_counts[self.codon_counts > 0]
 
-        cumulative_absolute_difference = sum(
-            abs(a - b) for a in counts.values() for b in counts.values()
+        cumulative_absolute_difference = int(
+            np.abs(counts[:, np.newaxis] - counts[np.newaxis, :]).sum()
         )
-        average = sum(count for count in counts.values()) / len(counts)
+        average = int(counts.sum()) / len(counts)
         gini_coefficient = cumulative_absolute_difference / (
             pow(2 * len(counts), 2) * average
         )
         return gini_coefficient
 
     @property
-    @functools.cache
     def cpg_ratio(self):
         """Calculate the CpG ratio.
 
@@ -525,17 +777,9 @@ class Sequence(msgspec.Struct, frozen=True):
         >>> Sequence("AGC").cpg_ratio
         0.0
         """
-        count = 0
-        for i in range(0, len(self) - 1):
-            if (
-                self.nucleic_acid_sequence[i] == "C"
-                and self.nucleic_acid_sequence[i + 1] == "G"
-            ):
-                count += 1
-        return count / len(self)
+        return int(self.dinucleotide_counts[4 * 1 + 2]) / len(self)
 
     @property
-    @functools.cache
     def slippery_site_ratio(self):
         """Calculate the slippery site (TTT) ratio.
 
@@ -545,106 +789,77 @@ class Sequence(msgspec.Struct, frozen=True):
         >>> Sequence("AGC").slippery_site_ratio
         0.0
         """
-        count = 0
-        for i in range(0, len(self) - 2):
-            if (
-                self.nucleic_acid_sequence[i] == "T"
-                and self.nucleic_acid_sequence[i + 1] == "T"
-                and self.nucleic_acid_sequence[i + 2] == "T"
-            ):
-                count += 1
-        return count / len(self)
+        return int(self.trinucleotide_counts[16 * 3 + 4 * 3 + 3]) / len(self)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def relative_synonymous_codon_use(self) -> float | None:
         """Relative synonymous codon use (RSCU)."""
         if not self.is_amino_acid_sequence:
             return None
 
-        x_i_j: dict[Codon, int] = defaultdict(int)
-        for codon in self.codons:
-            x_i_j[codon] += 1
-
-        rscu_i_j: dict[Codon, float] = {}
-        for amino_acid in AMINO_ACIDS:
-            codons = CodonTable.codons(amino_acid)
-            for codon in codons:
-                if codon not in x_i_j:
-                    continue
-                rscu_i_j[codon] = x_i_j[codon] / (
-                    (1 / len(codons)) * sum([x_i_j.get(codon, 0) for codon in codons])
-                )
+        # x_i_j - the count of each codon, and its total synonymous codon count
+        x_i_j = self.codon_counts
+        x_i = np.bincount(
+            _CODON_AMINO_ACID_INDICES, weights=x_i_j, minlength=len(_AMINO_ACID_ORDER)
+        )
+        n_i = _SYNONYMOUS_CODON_COUNTS[_CODON_AMINO_ACID_INDICES]
 
-        return sum(rscu_i_j[codon] for codon in self.codons) / (len(self) / 3)
+        used = x_i_j > 0
+        rscu_i_j = x_i_j[used] / (
+            (1 / n_i[used]) * x_i[_CODON_AMINO_ACID_INDICES][used]
+        )
+
+        return float((x_i_j[used] * rscu_i_j).sum()) / (len(self) / 3)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def relative_codon_bias_strength(self) -> float | None:
         """Relative codon bias strength (RCBS)."""
-        if not self.is_amino_acid_sequence:
+        if not self.nucleic_acid_sequence or not self.is_amino_acid_sequence:
             return None
 
-        codons = list(self.codons)
-        f = {codon: count / len(codons) for codon, count in Counter(codons).items()}
-        f1 = {
-            nucleotide: sum(codon[0] == nucleotide for codon in codons) / len(codons)
-            for nucleotide in ["A", "C", "G", "T"]
-        }
-        f2 = {
-            nucleotide: sum(codon[1] == nucleotide for codon in codons) / len(codons)
-            for nucleotide in ["A", "C", "G", "T"]
-        }
-        f3 = {
-            nucleotide: sum(codon[2] == nucleotide for codon in codons) / len(codons)
-            for nucleotide in ["A", "C", "G", "T"]
-        }
+        counts, f, f_expected = self._codon_bias_frequencies()
+        d = (f - f_expected) / f_expected
 
-        d = [
-            (f[codon] - f1[codon[0]] * f2[codon[1]] * f3[codon[2]])
-            / (f1[codon[0]] * f2[codon[1]] * f3[codon[2]])
-            for codon in codons
-        ]
-
-        rcbs = statistics.geometric_mean(1 + it for it in d) - 1
+        rcbs = math.exp(math.fsum(counts * np.log(1 + d)) / counts.sum()) - 1
 
         return rcbs
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def directional_codon_bias_score(self) -> float | None:
         """Directional codon bias score (DCBS)."""
-        if not self.is_amino_acid_sequence:
+        if not self.nucleic_acid_sequence or not self.is_amino_acid_sequence:
             return None
 
-        codons = list(self.codons)
-        f = {codon: count / len(codons) for codon, count in Counter(codons).items()}
-        f1 = {
-            nucleotide: sum(codon[0] == nucleotide for codon in codons) / len(codons)
-            for nucleotide in ["A", "C", "G", "T"]
-        }
-        f2 = {
-            nucleotide: sum(codon[1] == nucleotide for codon in codons) / len(codons)
-            for nucleotide in ["A", "C", "G", "T"]
-        }
-        f3 = {
-            nucleotide: sum(codon[2] == nucleotide for codon in codons) / len(codons)
-            for nucleotide in ["A", "C", "G", "T"]
-        }
-
-        d = [
-            max(
-                f[codon] / (f1[codon[0]] * f2[codon[1]] * f3[codon[2]]),
-                (f1[codon[0]] * f2[codon[1]] * f3[codon[2]]) / f[codon],
-            )
-            for codon in codons
-        ]
+        counts, f, f_expected = self._codon_bias_frequencies()
+        d = np.maximum(f / f_expected, f_expected / f)
 
-        dcbs = sum(d) / len(codons)
+        dcbs = float((counts * d).sum()) / int(counts.sum())
 
         return dcbs
 
-    @functools.cache
+    def _codon_bias_frequencies(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The counts and frequencies of the codons used in the sequence, along
+        with their frequencies expected from the positional nucleotide frequencies.
+        """
+        counts = self.codon_counts
+        total = int(counts.sum())
+        f_n = [
+            np.bincount(_CODON_NUCLEOTIDES[:, position], weights=counts, minlength=4)
+            / total
+            for position in range(3)
+        ]
+        f_expected = (
+            f_n[0][_CODON_NUCLEOTIDES[:, 0]]
+            * f_n[1][_CODON_NUCLEOTIDES[:, 1]]
+            * f_n[2][_CODON_NUCLEOTIDES[:, 2]]
+        )
+        used = counts > 0
+        return counts[used], counts[used] / total, f_expected[used]
+
+    @METRIC_CACHE.memoize
     def rare_codon_ratio(
         self, codon_usage_table: CodonUsageTable | str = "homo-sapiens"
     ) -> float | None:
@@ -661,44 +876,33 @@ class Sequence(msgspec.Struct, frozen=True):
         if not self.is_amino_acid_sequence:
             return None
         codon_usage_table = load_codon_usage_table(codon_usage_table)
-        count = 0
-        for codon in self.codons:
-            amino_acid = CodonTable.amino_acid(codon)
-            min_codon = codon_usage_table.least_frequent(amino_acid).codon
-            max_codon = codon_usage_table.most_frequent(amino_acid).codon
-            if codon == min_codon and min_codon != max_codon:
-                count += 1
+        count = int(self.codon_counts[codon_usage_table.rare_codons].sum())
         return count / len(self)
 
     @property
-    @functools.cache
+    @METRIC_CACHE.memoize
     def codon_usage_table(self) -> CodonUsageTable | None:
         """Generates a codon usage table from this sequence."""
         if not self.is_amino_acid_sequence:
             return None
-        counts: dict[AminoAcid, dict[Codon, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
-        for codon in self.codons:
-            amino_acid = CodonTable.amino_acid(codon)
-            counts[amino_acid][codon] += 1
+        counts = self.codon_counts
+        synonymous_counts = np.bincount(
+            _CODON_AMINO_ACID_INDICES, weights=counts, minlength=len(_AMINO_ACID_ORDER)
+        )[_CODON_AMINO_ACID_INDICES]
 
         return CodonUsageTable(
             id=str(hash(self)),
             usage={
                 codon: CodonUsage(
                     codon=codon,
-                    number=counts[CodonTable.amino_acid(codon)][codon],
-                    frequency=(
-                        counts[CodonTable.amino_acid(codon)][codon]
-                        / (sum(counts[CodonTable.amino_acid(codon)].values()) or 1)
-                    ),
+                    number=int(counts[index]),
+                    frequency=int(counts[index]) / (int(synonymous_counts[index]) or 1),
                 )
-                for codon in CODONS
+                for index, codon in enumerate(ORDERED_CODONS)
             },
         )
 
-    @functools.cache
+    @METRIC_CACHE.memoize
     def codon_usage_bias(
         self, codon_usage_table: CodonUsageTable | str = "homo-sapiens"
     ) -> float | None:
@@ -711,7 +915,7 @@ class Sequence(msgspec.Struct, frozen=True):
             self.codon_usage_table, load_codon_usage_table(codon_usage_table)
         )
 
-    @functools.cache
+    @METRIC_CACHE.memoize
     def codon_bias_index(
         self,
         codon_usage_table: CodonUsageTable | str = "homo-sapiens",
@@ -727,58 +931,45 @@ class Sequence(msgspec.Struct, frozen=True):
         IGNORED_AMINO_ACIDS: list[AminoAcid] = ["M", "W"]
 
         codon_usage_table = load_codon_usage_table(codon_usage_table)
-        preferred_codons: list[Codon] = [
-            codon_usage_table.most_frequent(amino_acid).codon
-            for amino_acid in AMINO_ACIDS
-            if amino_acid not in IGNORED_AMINO_ACIDS
-        ]
+        included = ~np.isin(
+            _CODON_AMINO_ACIDS, [it.encode() for it in IGNORED_AMINO_ACIDS]
+        )
 
         # Nc - the number of occurences of codon c in the sequence
-        n_codon: dict[Codon, int] = defaultdict(int)
-        for codon in self.codons:
-            if CodonTable.amino_acid(codon) in IGNORED_AMINO_ACIDS:
-                continue
-            n_codon[codon] += 1
+        n_codon = np.where(included, self.codon_counts, 0)
 
         # Na - the number of ocurrences of amino acid a in the sequence
-        n_amino_acid: dict[AminoAcid, int] = {
-            amino_acid: self.amino_acid_sequence.count(amino_acid)
-            for amino_acid in self.amino_acids
-            if amino_acid not in IGNORED_AMINO_ACIDS
-        }
+        n_amino_acid = np.bincount(
+            _CODON_AMINO_ACID_INDICES, weights=n_codon, minlength=len(_AMINO_ACID_ORDER)
+        )
 
         # Npfr - the total number of occurrences of preferred codons
-        n_pfr = sum(n_codon[codon] for codon in preferred_codons)
+        n_pfr = int(n_codon[codon_usage_table.preferred_codons].sum())
 
         # Nrand - the expected number of preferred codons if all synonymous
         # codons were used equally
-        n_rand = sum(
-            n_amino_acid[amino_acid] / len(CodonTable.codons(amino_acid))
-            for amino_acid in n_amino_acid.keys()
-        )
+        n_rand = float((n_amino_acid / _SYNONYMOUS_CODON_COUNTS).sum())
 
         # Ntot - the total number of codons in the sequence
-        n_tot = sum(n_codon.values())
+        n_tot = int(n_codon.sum())
 
         return (n_pfr - n_rand) / (n_tot - n_rand)
 
-    @functools.cache
+    @METRIC_CACHE.memoize
     def trna_adaptation_index(self, organism: str = "homo-sapiens") -> float | None:
         """Calculate the tRNA Adaptation Index of the sequence."""
         if not self.is_amino_acid_sequence:
             return None
 
-        trna_weights = load_trna_adaptation_index_dataset(organism)
+        trna_log_weights = load_trna_adaptation_index_log_weights(organism)
 
-        if not trna_weights:
+        if trna_log_weights is None:
             # tRNA data for the given orgnanism does not exist
             return None
 
-        return statistics.geometric_mean(
-            trna_weights[codon] for codon in self.codons if codon in trna_weights
-        )
+        return _geometric_mean(self.codon_counts, trna_log_weights)
 
-    @functools.cache
+    @METRIC_CACHE.memoize
     def hamming_distance(self, sequence: "Sequence") -> int:
         """Calculate the hamming distance between two sequences.
 
@@ -801,3 +992,396 @@ class Sequence(msgspec.Struct, frozen=True):
         set_a = set([(i, v) for i, v in enumerate(self)])
         set_b = set([(i, v) for i, v in enumerate(sequence)])
         return len(set_a.difference(set_b))
+
+
+def _minimum_free_energy(sequence: str) -> MinimumFreeEnergy:
+    import RNA
+
+    mfe = RNA.fold_compound(sequence).mfe()
+    structure, energy = mfe[0], mfe[1]
+    return MinimumFreeEnergy(
+        structure=structure,
+        energy=energy,
+        average_energy=energy / len(sequence),
+        paired_nt_ratio=(structure.count("(") + structure.count(")")) / len(structure),
+    )
+
+
+_FOLDING_POOL: concurrent.futures.ProcessPoolExecutor | None = None
+"""The process pool of parallel folding, created on first use."""
+_FOLDING_POOL_LOCK = threading.Lock()
+
+
+def _folding_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _FOLDING_POOL
+    with _FOLDING_POOL_LOCK:
+        if _FOLDING_POOL is None:
+            _FOLDING_POOL = concurrent.futures.ProcessPoolExecutor(
+                os.process_cpu_count() or 1,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _FOLDING_POOL
+
+
+def _parallel_minimum_free_energies(sequences: list[str]) -> list[MinimumFreeEnergy]:
+    """Fold the sequences, sharded across a process pool that is shared between
+    calls.
+
+    In a worker process (such as those of the API's executor), the sequences are
+    folded in the process instead, rather than starting a pool in each worker.
+    """
+    if multiprocessing.parent_process() is not None:
+        return [_minimum_free_energy(it) for it in sequences]
+    if not sequences:
+        return []
+    chunks = min(os.process_cpu_count() or 1, len(sequences))
+    return list(
+        _folding_pool().map(
+            _minimum_free_energy,
+            sequences,
+            chunksize=math.ceil(len(sequences) / chunks),
+        )
+    )
+
+
+_PSEUDO_PAIRING_ENERGIES = np.array(
+    [
+        # A  C     G     T
+        [0, 0, 0, 1],  # A
+        [0, 0, 3.12, 0],  # C
+        [0, 3.12, 0, 1],  # G
+        [1, 0, 1, 0],  # T
+    ]
+)
+"""The pseudo-MFE bond energy of each pair of (encoded) nucleotides."""
+
+_PSEUDO_MAX_INCREMENTAL_CHANGES = 32
+"""Recount all compared pairs when more nucleotides than this have changed."""
+
+
+def _encode(sequence: str) -> np.ndarray:
+    """Encode a (valid) nucleic acid sequence as nucleotide indices into
+    `NUCLEOTIDES`.
+    """
+    return _NUCLEOTIDE_ENCODING[np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)]
+
+
+def _codon_indices(encoded_codons: np.ndarray) -> np.ndarray:
+    """The indices into `ORDERED_CODONS` of encoded codons, given as a (n, 3) array."""
+    return 16 * encoded_codons[:, 0] + 4 * encoded_codons[:, 1] + encoded_codons[:, 2]
+
+
+def _pseudo_offsets(n: int) -> tuple[int, int]:
+    """The smallest and largest offsets `j - i` of the nucleotides compared by the
+    pseudo-MFE of a sequence of length `n`.
+
+    Each block `s[0:b]` is compared against `s[b + 3 : 2 * b + 3]`, for block sizes
+    `b` from 3 up to `(n - 1) // 2`. Nucleotide `j` is therefore compared against
+    every nucleotide `i` with `j - i - 3` in that range and `2 * i + 4 <= j`.
+    """
+    return 3 + 3, 3 + (n - 1) // 2
+
+
+def _pseudo_pair_counts(encoded: np.ndarray) -> np.ndarray:
+    """The number of compared `(s[i], s[j])` nucleotide pairs of a single orientation
+    of an encoded sequence, as a (4, 4) array. The partners `i` of each nucleotide
+    `j` are a contiguous range, so the pairs are counted with cumulative nucleotide
+    counts in O(n).
+    """
+    n = len(encoded)
+    min_offset, max_offset = _pseudo_offsets(n)
+    j = np.arange(n)
+    lo = np.maximum(j - max_offset, 0)
+    hi = np.minimum(j - min_offset, (j - 4) // 2) + 1
+    paired = hi > lo
+
+    counts = np.zeros((4, n + 1), dtype=np.int64)
+    for nucleotide in range(4):
+        np.cumsum(encoded == nucleotide, out=counts[nucleotide, 1:])
+    window_counts = counts[:, hi[paired]] - counts[:, lo[paired]]
+
+    return np.stack(
+        [
+            window_counts[:, encoded[paired] == nucleotide].sum(axis=1)
+            for nucleotide in range(4)
+        ],
+        axis=1,
+    )
+
+
+def _pseudo_pair_counts_at(encoded: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """The number of compared `(s[i], s[j])` nucleotide pairs of a single orientation
+    of an encoded sequence, counting only the pairs that involve (sorted, unique)
+    `positions`.
+    """
+    n = len(encoded)
+    min_offset, max_offset = _pseudo_offsets(n)
+    counts = np.zeros((4, 4), dtype=np.int64)
+    for position in positions.tolist():
+        # Pairs with `position` as `j`
+        lo = max(position - max_offset, 0)
+        hi = min(position - min_offset, (position - 4) // 2) + 1
+        if hi > lo:
+            counts[:, encoded[position]] += np.bincount(encoded[lo:hi], minlength=4)
+        # Pairs with `position` as `i`, unless `j` has been counted above
+        lo = max(position + min_offset, 2 * position + 4)
+        hi = min(position + max_offset, n - 1) + 1
+        if hi > lo:
+            counts[encoded[position], :] += np.bincount(encoded[lo:hi], minlength=4)
+            for other in positions[np.searchsorted(positions, lo) :].tolist():
+                if other >= hi:
+                    break
+                counts[encoded[position], encoded[other]] -= 1
+    return counts
+
+
+class PseudoMinimumFreeEnergy:
+    """The pseudo-MFE of a sequence, which can be updated incrementally as the
+    sequence is mutated: only the compared pairs that involve the changed nucleotides
+    are recounted.
+
+    >>> pseudo_mfe = PseudoMinimumFreeEnergy("GGGGAAACCCCATATGGGGAAACCCC")
+    >>> pseudo_mfe.energy
+    -3.581538461538462
+    >>> pseudo_mfe.update("GGGGAAACCCCATATGGGGAAACCCA").energy
+    -3.1784615384615384
+    >>> Sequence("GGGGAAACCCCATATGGGGAAACCCA").pseudo_minimum_free_energy
+    -3.1784615384615384
+    """
+
+    def __init__(
+        self,
+        sequence: "Sequence | str",
+        _encoded: np.ndarray | None = None,
+        _pair_counts: np.ndarray | None = None,
+    ):
+        if _encoded is None or _pair_counts is None:
+            _encoded = Sequence.create(sequence).encoded
+            _pair_counts = _pseudo_pair_counts(_encoded) + _pseudo_pair_counts(
+                _encoded[::-1]
+            )
+        self.encoded = _encoded
+        """The encoded sequence."""
+        self.pair_counts = _pair_counts
+        """The number of compared nucleotide pairs, in both orientations."""
+
+    @property
+    def energy(self) -> float:
+        """The pseudo-MFE of the sequence."""
+        return -math.fsum((_PSEUDO_PAIRING_ENERGIES * self.pair_counts).flat) / len(
+            self.encoded
+        )
+
+    def update(self, sequence: str) -> "PseudoMinimumFreeEnergy":
+        """The pseudo-MFE of a mutated version of this sequence. The sequence is
+        assumed to be valid, i.e. it only contains the characters "ACGT".
+        """
+        encoded = _encode(sequence)
+        n = len(encoded)
+        if n != len(self.encoded):
+            return PseudoMinimumFreeEnergy(sequence)
+        changed = np.flatnonzero(encoded != self.encoded)
+        if not len(changed):
+            return self
+        if len(changed) > _PSEUDO_MAX_INCREMENTAL_CHANGES:
+            return PseudoMinimumFreeEnergy(sequence)
+
+        reversed_changed = n - 1 - changed[::-1]
+        pair_counts = (
+            self.pair_counts
+            - _pseudo_pair_counts_at(self.encoded, changed)
+            - _pseudo_pair_counts_at(self.encoded[::-1], reversed_changed)
+            + _pseudo_pair_counts_at(encoded, changed)
+            + _pseudo_pair_counts_at(encoded[::-1], reversed_changed)
+        )
+        encoded.flags.writeable = False
+        return PseudoMinimumFreeEnergy(
+            sequence, _encoded=encoded, _pair_counts=pair_counts
+        )
+
+
+class CodonWeightIndex:
+    """The geometric mean of per-codon weights over the codons of a sequence, such as
+    the CAI or tAI. The index can be updated incrementally as the sequence is mutated:
+    only the changed codons are recounted.
+
+    An optimization mutates only a few nucleotides between evaluations of its
+    specifications, so the specifications keep their last index (or
+    `PseudoMinimumFreeEnergy`, or `WindowEnergies`) and update it from the previously
+    evaluated sequence, rather than computing it from scratch.
+
+    >>> log_weights = load_codon_usage_table("homo-sapiens").log_weights
+    >>> cai = CodonWeightIndex("ATACGG", log_weights)
+    >>> cai.value == Sequence("ATACGG").codon_adaptation_index()
+    True
+    >>> cai.update("ATACGC").value == Sequence("ATACGC").codon_adaptation_index()
+    True
+    >>> print(cai.update("ATACG").value)
+    None
+    """
+
+    def __init__(
+        self,
+        sequence: "Sequence | str",
+        log_weights: np.ndarray,
+        _encoded: np.ndarray | None = None,
+        _codon_counts: np.ndarray | None = None,
+    ):
+        if _encoded is None:
+            sequence = Sequence.create(sequence)
+            _encoded = sequence.encoded
+            if sequence.is_amino_acid_sequence:
+                _codon_counts = sequence.codon_counts
+        self.log_weights = log_weights
+        """The natural logarithm of the codon weights, indexed as in `ORDERED_CODONS`."""
+        self.encoded = _encoded
+        """The encoded sequence."""
+        self.codon_counts = _codon_counts
+        """The count of each codon, or None if the sequence is not a codon sequence."""
+
+    @property
+    def value(self) -> float | None:
+        """The index of the sequence, or None if the sequence is not a (non-empty) codon
+        sequence.
+        """
+        if self.codon_counts is None or not len(self.encoded):
+            return None
+        return _geometric_mean(self.codon_counts, self.log_weights)
+
+    def update(self, sequence: str) -> "CodonWeightIndex":
+        """The index of a mutated version of this sequence. The sequence is assumed to
+        be valid, i.e. it only contains the characters "ACGT".
+        """
+        encoded = _encode(sequence)
+        encoded.flags.writeable = False
+        if len(encoded) % 3:
+            return CodonWeightIndex(sequence, self.log_weights, _encoded=encoded)
+        if len(encoded) != len(self.encoded) or self.codon_counts is None:
+            codon_counts = np.bincount(
+                _codon_indices(encoded.reshape(-1, 3)), minlength=64
+            )
+        else:
+            changed = np.unique(np.flatnonzero(encoded != self.encoded) // 3)
+            if not len(changed):
+                return self
+            codon_counts = self.codon_counts.copy()
+            np.subtract.at(
+                codon_counts, _codon_indices(self.encoded.reshape(-1, 3)[changed]), 1
+            )
+            np.add.at(codon_counts, _codon_indices(encoded.reshape(-1, 3)[changed]), 1)
+        return CodonWeightIndex(
+            sequence, self.log_weights, _encoded=encoded, _codon_counts=codon_counts
+        )
+
+
+@functools.cache
+def _model_details(max_bp_span: int):
+    import RNA
+
+    model_details = RNA.md()
+    model_details.max_bp_span = max_bp_span
+    return model_details
+
+
+def _window_energy(window: str, max_bp_span: int) -> float:
+    key = (window, max_bp_span)
+    energy = WINDOW_ENERGY_CACHE.get(key, None)
+    if energy is None:
+        import RNA
+
+        energy = RNA.fold_compound(window, _model_details(max_bp_span)).mfe()[1]
+        WINDOW_ENERGY_CACHE.put(key, energy)
+    return energy
+
+
+class WindowEnergies:
+    """The MFE of each window of a sequence (as in
+    `Sequence.windowed_minimum_free_energy`, with base pairs spanning at most
+    `max_bp_span` nucleotides), which can be updated incrementally as the sequence is
+    mutated: only the windows overlapping the changed nucleotides are refolded.
+
+    A sequence shorter than a window is folded as a single window.
+
+    >>> energies = WindowEnergies("GGGGAAACCCCATATGGGGAAACCCCATATGGGGAAACCCC", 14, 7)
+    >>> float(energies.energies[0])
+    -6.199999809265137
+    >>> updated = energies.update("GGGGAAACCCCATATGGGGAAACCCCATATGGGGAAACCCA")
+    >>> updated.mean_energy == WindowEnergies(updated.sequence, 14, 7).mean_energy
+    True
+    """
+
+    def __init__(
+        self,
+        sequence: "Sequence | str",
+        window_size: int = 40,
+        step: int = 4,
+        max_bp_span: int | None = None,
+        _energies: np.ndarray | None = None,
+    ):
+        self.sequence = str(sequence)
+        self.window_size = window_size
+        self.step = step
+        self.max_bp_span = max_bp_span or window_size
+        if _energies is None:
+            _energies = np.array(
+                [
+                    _window_energy(self.sequence[i : i + window_size], self.max_bp_span)
+                    for i in self._starts(len(self.sequence))
+                ]
+            )
+        self.energies = _energies
+        """The MFE of each window."""
+
+    def _starts(self, n: int) -> range:
+        return (
+            range(0, n - self.window_size, self.step)
+            if n > self.window_size
+            else range(1)
+        )
+
+    @property
+    def mean_energy(self) -> float:
+        """The mean MFE of the windows."""
+        return float(self.energies.mean())
+
+    def update(self, sequence: str) -> "WindowEnergies":
+        """The window MFEs of a mutated version of this sequence."""
+        n = len(sequence)
+        if n != len(self.sequence) or n <= self.window_size:
+            return WindowEnergies(
+                sequence, self.window_size, self.step, self.max_bp_span
+            )
+        changed = np.flatnonzero(_encode(sequence) != _encode(self.sequence))
+        if not len(changed):
+            return self
+
+        # The windows starting within a window's length before each change
+        starts = self._starts(n)
+        first = np.maximum(-(-(changed - self.window_size + 1) // self.step), 0)
+        last = np.minimum(changed // self.step, len(starts) - 1)
+        overlaps = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.add.at(overlaps, first[first <= last], 1)
+        np.add.at(overlaps, last[first <= last] + 1, -1)
+
+        energies = self.energies.copy()
+        for index in np.flatnonzero(np.cumsum(overlaps[:-1])):
+            start = starts[index]
+            energies[index] = _window_energy(
+                sequence[start : start + self.window_size], self.max_bp_span
+            )
+        return WindowEnergies(
+            sequence, self.window_size, self.step, self.max_bp_span, _energies=energies
+        )
+
+
+def _geometric_mean(counts: np.ndarray, log_weights: np.ndarray) -> float:
+    """The geometric mean of per-codon weights over a codon histogram, skipping
+    codons without a weight (i.e. `nan`), as in `statistics.geometric_mean`.
+    """
+    included = (counts > 0) & ~np.isnan(log_weights)
+    n = int(counts[included].sum())
+    if not n:
+        raise statistics.StatisticsError("Must have a non-empty dataset")
+    if np.isneginf(log_weights[included]).any():
+        return 0.0
+    return math.exp(math.fsum(counts[included] * log_weights[included]) / n)
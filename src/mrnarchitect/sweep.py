@@ -0,0 +1,269 @@
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import random
+import timeit
+import typing
+
+import msgspec
+
+from mrnarchitect.optimize import (
+    DEFAULT_EARLY_STOPPING,
+    DEFAULT_OPTIMIZATION_PARAMETER,
+    EarlyStopping,
+    Engine,
+    OptimizationCache,
+    OptimizationParameter,
+    OptimizationResult,
+    optimize,
+)
+from mrnarchitect.sequence import Sequence
+
+_UNSWEPT_FIELDS = {"start_coordinate", "end_coordinate", "enforce_sequence"}
+
+
+class SweepPoint(msgspec.Struct, kw_only=True):
+    values: dict[str, typing.Any]
+    """The values of the swept fields at this point."""
+    success: bool
+    cached: bool = False
+    """Whether the result was reused from the optimization cache."""
+    sequence: Sequence | None = None
+    codon_adaptation_index: float | None = None
+    gc_deviation: float | None = None
+    """The distance of the GC ratio from the `gc_target` of the sweep."""
+    minimum_free_energy: float | None = None
+    time_in_seconds: float = 0.0
+    """The time the optimization took (when it was first run, if cached)."""
+    error: str | None = None
+
+
+class SweepResult(msgspec.Struct, kw_only=True):
+    points: list[SweepPoint]
+    """The points of the sweep, in the order of the grid."""
+    pareto_front: list[int]
+    """The indices of the successful points which no other point matches or beats
+    in every one of CAI (higher), GC deviation (lower), MFE (higher) and time
+    (lower), while beating it in one."""
+    time_in_seconds: float
+
+
+def _grid_points(
+    grid: typing.Mapping[str, typing.Sequence[typing.Any]],
+    samples: int | None,
+    random_seed: int | None,
+) -> list[dict[str, typing.Any]]:
+    """The points of the grid, or a random sample of `samples` of them.
+
+    >>> _grid_points({"optimize_mfe": [-10, -20], "avoid_repeat_length": [8]}, None, None)
+    [{'optimize_mfe': -10, 'avoid_repeat_length': 8}, {'optimize_mfe': -20, 'avoid_repeat_length': 8}]
+    """
+    fields = {it.name for it in msgspec.structs.fields(OptimizationParameter)}
+    for name in grid:
+        if name not in fields or name in _UNSWEPT_FIELDS:
+            raise ValueError(f"`{name}` can not be swept.")
+    points = [
+        dict(zip(grid, values, strict=True))
+        for values in itertools.product(*grid.values())
+    ]
+    if samples is not None and samples < len(points):
+        points = random.Random(random_seed).sample(points, samples)
+    return points
+
+
+def _measures(point: SweepPoint) -> tuple[float, float, float, float] | None:
+    """The measures of a point, signed so that higher is better (or None if the
+    point was not measured).
+    """
+    if (
+        not point.success
+        or point.codon_adaptation_index is None
+        or point.gc_deviation is None
+        or point.minimum_free_energy is None
+    ):
+        return None
+    return (
+        point.codon_adaptation_index,
+        -point.gc_deviation,
+        point.minimum_free_energy,
+        -point.time_in_seconds,
+    )
+
+
+def _dominates(a: tuple[float, ...], b: tuple[float, ...]) -> bool:
+    """Whether measures `a` are at least as good as `b`, and better in at least one.
+
+    >>> _dominates((0.9, -0.1), (0.8, -0.1)), _dominates((0.9, -0.2), (0.8, -0.1))
+    (True, False)
+    """
+    return all(x >= y for x, y in zip(a, b, strict=True)) and a != b
+
+
+def _pareto_front(points: list[SweepPoint]) -> list[int]:
+    measures = {i: m for i, it in enumerate(points) if (m := _measures(it)) is not None}
+    return [
+        i
+        for i, it in measures.items()
+        if not any(_dominates(other, it) for j, other in measures.items() if j != i)
+    ]
+
+
+def _run_point(
+    sequence: Sequence,
+    parameters: list[OptimizationParameter],
+    result: OptimizationResult | None,
+    gc_target: float,
+    **kwargs,
+) -> tuple[OptimizationResult | None, SweepPoint]:
+    """Optimize the sequence at a point of the sweep (unless its result was cached),
+    and measure the result, in a worker process. The result is None if the
+    optimization raised, and so is not worth caching.
+    """
+    try:
+        if result is None:
+            result = optimize(sequence, parameters, **kwargs)
+        if not result.success or result.result is None:
+            return result, SweepPoint(
+                values={},
+                success=False,
+                time_in_seconds=result.time_in_seconds,
+                error=result.error.message if result.error else None,
+            )
+        optimized = result.result.sequence
+        organism = next(
+            (it.organism for it in parameters if it.organism), "homo-sapiens"
+        )
+        return result, SweepPoint(
+            values={},
+            success=True,
+            sequence=optimized,
+            codon_adaptation_index=optimized.codon_adaptation_index(organism),
+            gc_deviation=abs(optimized.gc_ratio - gc_target),
+            minimum_free_energy=optimized.minimum_free_energy.energy,
+            time_in_seconds=result.time_in_seconds,
+        )
+    except (RuntimeError, ValueError) as e:
+        # A bad point fails its own result, not the whole sweep
+        return None, SweepPoint(values={}, success=False, error=str(e))
+
+
+def sweep(
+    sequence: Sequence,
+    grid: typing.Mapping[str, typing.Sequence[typing.Any]],
+    parameters: typing.Sequence[OptimizationParameter] | None = None,
+    samples: int | None = None,
+    max_random_iters: int = 20_000,
+    mutations_per_iteration: int = 2,
+    random_seed: int | None = None,
+    workers: int | None = None,
+    cache: OptimizationCache | None = None,
+    early_stopping: EarlyStopping | None = DEFAULT_EARLY_STOPPING,
+    engine: Engine = "dnachisel",
+    beam_width: int = 64,
+    gc_target: float | None = None,
+) -> SweepResult:
+    """Optimize the sequence at each point of a `grid` of values of the fields of
+    `OptimizationParameter` (or a random sample of `samples` points), and find the
+    points with the best trade-offs.
+
+    At each point, the values replace those of the fields of each of the
+    `parameters` (except those enforcing a sequence), and the sequence is optimized
+    as by `optimize`, with the same `random_seed`. The points are optimized across a
+    pool of (at most) `workers` processes, each of which compiles the
+    specifications of the parameters it sees once. If a `cache` is given (and the
+    sweep is seeded), points already optimized with the same inputs (even by
+    `optimize`) are not optimized again, and new results are added to it. A point whose values are not valid
+    parameters (such as a GC minimum above the maximum, or a value of the wrong
+    type), or whose optimization raises, is unsuccessful.
+
+    Each successful point is measured by its CAI, the distance of its GC ratio from
+    `gc_target` (by default, the middle of the global GC content bounds of the
+    parameters, or 0.5), its MFE and the time it took, and the result lists the
+    points on the Pareto front of these measures.
+    """
+    start = timeit.default_timer()
+    parameters = list(parameters or [DEFAULT_OPTIMIZATION_PARAMETER])
+    if gc_target is None:
+        bounds = next(
+            (
+                (it.gc_content_global_min, it.gc_content_global_max)
+                for it in parameters
+                if it.gc_content_global_min is not None
+                and it.gc_content_global_max is not None
+            ),
+            (0.5, 0.5),
+        )
+        gc_target = (bounds[0] + bounds[1]) / 2
+    options = dict(
+        max_random_iters=max_random_iters,
+        mutations_per_iteration=mutations_per_iteration,
+        random_seed=random_seed,
+        early_stopping=early_stopping,
+        engine=engine,
+        beam_width=beam_width,
+    )
+
+    values = _grid_points(grid, samples, random_seed)
+    points: list[SweepPoint | None] = [None] * len(values)
+    with concurrent.futures.ProcessPoolExecutor(
+        min(workers or os.process_cpu_count() or 1, max(len(values), 1)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        futures = {}
+        for index, point_values in enumerate(values):
+            try:
+                # Converted rather than replaced, to validate the types of the values
+                point_parameters = [
+                    it
+                    if it.enforce_sequence
+                    else msgspec.convert(
+                        {**msgspec.to_builtins(it), **point_values},
+                        OptimizationParameter,
+                    )
+                    for it in parameters
+                ]
+            except msgspec.ValidationError as e:
+                points[index] = SweepPoint(
+                    values=point_values, success=False, error=str(e)
+                )
+                continue
+            key, cached = None, None
+            if cache is not None:
+                key = cache.key(
+                    sequence,
+                    point_parameters,
+                    max_random_iters,
+                    mutations_per_iteration,
+                    random_seed,
+                    early_stopping=early_stopping,
+                    engine=engine,
+                    beam_width=beam_width,
+                )
+                cached = cache.get(key, random_seed)
+            future = executor.submit(
+                _run_point, sequence, point_parameters, cached, gc_target, **options
+            )
+            futures[future] = (index, key, cached is not None)
+
+        for future in concurrent.futures.as_completed(futures):
+            index, key, cached = futures[future]
+            result, point = future.result()
+            if (
+                cache is not None
+                and key is not None
+                and result is not None
+                and not cached
+            ):
+                # Cached here rather than in the workers, which do not share it
+                cache.put(key, result, random_seed)
+            points[index] = msgspec.structs.replace(
+                point, values=values[index], cached=cached
+            )
+
+    swept = typing.cast(list[SweepPoint], points)
+    return SweepResult(
+        points=swept,
+        pareto_front=_pareto_front(swept),
+        time_in_seconds=timeit.default_timer() - start,
+    )
@@ -0,0 +1,21 @@
+import random
+import typing
+
+from dnachisel import DnaOptimizationProblem
+
+
+def random_mutations(
+    problem: DnaOptimizationProblem,
+    rng: random.Random,
+    n_mutations: int,
+    iterations: int,
+) -> typing.Iterator[str]:
+    """Mutate `n_mutations` random positions of the sequence of the problem, as a
+    search would, `iterations` times, yielding each mutated sequence.
+    """
+    for _ in range(iterations):
+        mutated = list(problem.sequence)
+        for position in rng.sample(range(len(mutated)), n_mutations):
+            mutated[position] = rng.choice("ACGT")
+        problem.sequence = "".join(mutated)
+        yield problem.sequence
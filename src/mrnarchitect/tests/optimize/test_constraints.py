@@ -0,0 +1,47 @@
+import random
+
+import pytest
+from dnachisel import AvoidPattern, DnaOptimizationProblem, Location
+
+from mrnarchitect.data import load_codon_usage_table
+from mrnarchitect.optimize.specifications.constraints import AvoidPatterns, CAIRange
+from mrnarchitect.sequence import Sequence
+from mrnarchitect.tests.optimize import random_mutations
+
+
+@pytest.mark.parametrize("n_mutations", [1, 6, 100])
+def test_cai_range_incremental(n_mutations):
+    rng = random.Random(n_mutations)
+    codon_usage_table = load_codon_usage_table("homo-sapiens")
+    sequence = "".join(rng.choice("ACGT") for _ in range(300))
+    constraint = CAIRange(codon_usage_table=codon_usage_table, cai_min=0.9)
+    problem = DnaOptimizationProblem(sequence=sequence, constraints=[constraint])
+    for mutated in random_mutations(problem, rng, n_mutations, 20):
+        cai = Sequence(mutated).codon_adaptation_index(codon_usage_table)
+        assert constraint.evaluate(problem).score == -abs(cai - 0.9)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_avoid_patterns(seed):
+    rng = random.Random(seed)
+    patterns = ["4xA", "3xT", "GAATTC", "BsaI_site", "BglI_site", "GCNNGC"]
+    sequence = "".join(rng.choice("ACGT") for _ in range(500))
+    location = Location(3, 490)
+    constraint = AvoidPatterns(patterns, location=location)
+    problem = DnaOptimizationProblem(
+        sequence=sequence,
+        constraints=[AvoidPattern(it, location=location) for it in patterns]
+        + [constraint],
+    )
+    evaluations = [it.evaluate(problem) for it in problem.constraints]
+    assert [it.to_tuple() for it in evaluations[-1].locations] == sorted(
+        it.to_tuple() for evaluation in evaluations[:-1] for it in evaluation.locations
+    )
+
+    mutated_location = evaluations[-1].locations[0]
+    localized = problem.constraints[-1].localized(mutated_location, problem=problem)
+    assert localized.evaluate(problem).locations == [
+        it
+        for it in evaluations[-1].locations
+        if it.overlap_region(mutated_location) is not None
+    ]
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+from dnachisel import DnaOptimizationProblem
+
+from mrnarchitect.optimize.specifications.objectives import (
+    OptimizeTAI,
+    TargetPseudoMFE,
+    TargetWindowedMFE,
+)
+from mrnarchitect.organism import load_organism_from_database
+from mrnarchitect.sequence import Sequence
+from mrnarchitect.tests.optimize import random_mutations
+
+
+@pytest.mark.parametrize("n_mutations", [1, 6, 100])
+def test_target_pseudo_mfe_incremental(n_mutations):
+    rng = random.Random(n_mutations)
+    sequence = "".join(rng.choice("ACGT") for _ in range(300))
+    objective = TargetPseudoMFE(target_pseudo_mfe=-10.0)
+    problem = DnaOptimizationProblem(sequence=sequence, objectives=[objective])
+    for mutated in random_mutations(problem, rng, n_mutations, 20):
+        pseudo_mfe = Sequence(mutated).pseudo_minimum_free_energy
+        assert objective.evaluate(problem).score == -abs(pseudo_mfe + 10.0)
+
+
+@pytest.mark.parametrize("n_mutations", [1, 6, 100])
+def test_target_windowed_mfe_incremental(n_mutations):
+    rng = random.Random(n_mutations)
+    sequence = "".join(rng.choice("ACGT") for _ in range(150))
+    objective = TargetWindowedMFE(target_mfe=-5.0, window_size=30, step=5)
+    problem = DnaOptimizationProblem(sequence=sequence, objectives=[objective])
+    for mutated in random_mutations(problem, rng, n_mutations, 10):
+        mfe = Sequence(mutated).windowed_minimum_free_energy(30, 5)
+        assert objective.evaluate(problem).score == pytest.approx(
+            -abs(mfe.mean_energy + 5.0)
+        )
+
+
+@pytest.mark.parametrize("organism", ["homo-sapiens", "mus-musculus"])
+def test_optimize_tai_organism(organism):
+    rng = random.Random(0)
+    sequence = Sequence.create(
+        "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for _ in range(100))
+    )
+    objective = OptimizeTAI(
+        target_tai=1.0, organism=load_organism_from_database(organism)
+    )
+    assert objective.organism == organism
+    problem = DnaOptimizationProblem(sequence=str(sequence), objectives=[objective])
+    tai = sequence.trna_adaptation_index(organism=organism)
+    assert objective.evaluate(problem).score == -abs(tai - 1.0)
@@ -0,0 +1,388 @@
+import random
+from unittest.mock import ANY
+
+import msgspec
+import pytest
+from dnachisel import DnaOptimizationProblem, SpecEvaluation, Specification
+
+from mrnarchitect.cache import LRUCache, SQLiteCache
+from mrnarchitect.optimize import (
+    DEFAULT_EARLY_STOPPING,
+    DEFAULT_OPTIMIZATION_PARAMETER,
+    EarlyStopping,
+    Location,
+    OptimizationCache,
+    OptimizationParameter,
+    _DnaOptimizationProblem,
+    optimize,
+    optimize_many,
+    reoptimize,
+)
+from mrnarchitect.optimize.specifications.constraints import AvoidPatterns
+from mrnarchitect.sequence import Sequence
+
+PARAMETERS = [
+    OptimizationParameter(
+        organism="homo-sapiens",
+        optimize_cai=True,
+        gc_content_global_min=0.4,
+        gc_content_global_max=0.6,
+        gc_content_window_min=0.3,
+        gc_content_window_max=0.7,
+        optimize_mfe=-20.0,
+    )
+]
+
+
+def _sequence() -> Sequence:
+    rng = random.Random(0)
+    return Sequence.create(
+        "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for _ in range(80))
+    )
+
+
+def test_optimize_random_seed():
+    sequence = _sequence()
+    results = [
+        optimize(sequence, PARAMETERS, random_seed=seed).result for seed in (1, 1, 2)
+    ]
+    assert all(results)
+    assert results[0].sequence == results[1].sequence
+    assert results[0].sequence != results[2].sequence
+
+
+def test_optimize_cache(tmp_path):
+    sequence = _sequence()
+    for backend in (LRUCache(max_entries=8), SQLiteCache(tmp_path / "cache.db")):
+        cache = OptimizationCache(backend)
+        first = optimize(sequence, PARAMETERS, random_seed=1, cache=cache)
+        second = optimize(sequence, PARAMETERS, random_seed=1, cache=cache)
+        assert first == second
+        optimize(sequence, PARAMETERS, random_seed=2, cache=cache)
+        # Unseeded optimizations are neither looked up nor cached
+        optimize(sequence, PARAMETERS, cache=cache)
+        stats = cache.stats()
+        assert (stats.entries, stats.hits, stats.misses) == (2, 1, 2)
+
+
+def test_optimize_restarts():
+    result = optimize(_sequence(), PARAMETERS, random_seed=1, restarts=3, workers=2)
+    assert result.success
+    assert result.runs is not None and len(result.runs) == 3
+
+    # The best run can be reproduced from its seed
+    best = max(result.runs, key=lambda it: it.score or -float("inf"))
+    assert optimize(_sequence(), PARAMETERS, random_seed=best.random_seed) == (
+        msgspec.structs.replace(result, runs=None, time_in_seconds=ANY)
+    )
+
+
+def test_optimize_restarts_target_score():
+    result = optimize(
+        _sequence(), PARAMETERS, restarts=6, workers=1, target_score=-float("inf")
+    )
+    assert result.success
+    assert result.runs is not None
+    assert sum(not it.stopped for it in result.runs) == 1
+
+
+def test_optimize_segmented():
+    rng = random.Random(1)
+    sequence = Sequence.create(
+        "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for _ in range(400))
+    )
+    parameters = [
+        DEFAULT_OPTIMIZATION_PARAMETER,
+        OptimizationParameter(
+            start_coordinate=601, end_coordinate=900, optimize_tai=1.0
+        ),
+    ]
+    progress = []
+    result = optimize(
+        sequence,
+        parameters,
+        random_seed=1,
+        segment_length=450,
+        segment_overlap=60,
+        progress=progress.append,
+    )
+    assert result.success
+    assert result.global_check_passed
+    assert progress == pytest.approx([1 / 3, 2 / 3, 1.0])
+    assert result.result is not None
+    assert result.result.sequence.amino_acid_sequence == sequence.amino_acid_sequence
+    assert [
+        (it.start_coordinate, it.end_coordinate) for it in result.segments or []
+    ] == [(1, 450), (391, 840), (781, 1200)]
+
+
+def test_optimize_segmented_error():
+    rng = random.Random(1)
+    sequence = Sequence.create(
+        "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for _ in range(400))
+    )
+    parameters = [
+        DEFAULT_OPTIMIZATION_PARAMETER,
+        OptimizationParameter(
+            start_coordinate=601,
+            end_coordinate=700,
+            gc_content_global_min=0.9,
+            gc_content_global_max=1.0,
+        ),
+    ]
+    result = optimize(
+        sequence, parameters, random_seed=1, segment_length=450, segment_overlap=60
+    )
+    assert not result.success
+    assert result.error is not None
+    assert result.error.message.startswith("In segment 391-840: ")
+    # The location is in the coordinates of the whole sequence
+    assert result.error.location == "596-705"
+
+
+def test_optimize_time_budget():
+    result = optimize(_sequence(), PARAMETERS, random_seed=1, time_budget_seconds=60)
+    assert result.success
+    assert not result.partial
+    assert result.iterations
+
+    # Out of time before the constraints are resolved, the best sequence so far is
+    # still returned
+    result = optimize(_sequence(), PARAMETERS, random_seed=1, time_budget_seconds=1e-9)
+    assert not result.success
+    assert result.partial
+    assert result.result is not None
+    assert result.error is not None
+
+
+def test_optimize_early_stopping():
+    parameters = [
+        OptimizationParameter(
+            organism="homo-sapiens", optimize_cai=True, optimize_tai=1.0
+        )
+    ]
+    results = [
+        optimize(
+            _sequence(),
+            parameters,
+            max_random_iters=2_000,
+            random_seed=1,
+            early_stopping=early_stopping,
+        )
+        for early_stopping in (None, EarlyStopping(patience=50))
+    ]
+    assert [it.stop_reason for it in results] == ["completed", "converged"]
+    assert results[0].iterations == 2_000
+    assert results[1].iterations < results[0].iterations
+
+
+class _ConstantObjective(Specification):
+    best_possible_score = None
+
+    def evaluate(self, problem):
+        return SpecEvaluation(self, problem, score=0.0)
+
+
+def test_early_stopping_matches_dnachisel():
+    def _iterations(problem):
+        problem.max_random_iters = 1_000
+        mutation_space, iterations = problem.mutation_space, []
+        apply_random_mutations = mutation_space.apply_random_mutations
+        mutation_space.apply_random_mutations = lambda **kwargs: (
+            iterations.append(1) or apply_random_mutations(**kwargs)
+        )
+        problem.optimize_by_random_mutations()
+        return len(iterations)
+
+    sequence, objectives = "ATGATCCTGAAA" * 5, [_ConstantObjective()]
+    problem = _DnaOptimizationProblem(sequence=sequence, objectives=objectives)
+    problem.early_stopping = DEFAULT_EARLY_STOPPING
+    # A search that never improves stops when DnaChisel's default would
+    assert _iterations(problem) == _iterations(
+        DnaOptimizationProblem(sequence=sequence, objectives=objectives)
+    )
+
+
+def test_optimize_profile():
+    result = optimize(_sequence(), PARAMETERS, random_seed=1, profile=True)
+    profile = result.profile
+    assert profile is not None
+    assert profile.mutations_proposed == result.iterations
+    assert 0 < profile.mutations_accepted <= profile.mutations_proposed
+    assert {it.role for it in profile.specifications} == {"constraint", "objective"}
+    assert all(
+        it.localized_evaluations <= it.evaluations for it in profile.specifications
+    )
+
+    # Profiling does not change the result
+    unprofiled = optimize(_sequence(), PARAMETERS, random_seed=1)
+    assert unprofiled.result == result.result
+
+
+def test_optimize_many():
+    sequences = [
+        ("first", Sequence("ACGACCATTAAA")),
+        ("second", Sequence("ACGACG")),
+        ("partial", Sequence("ACGAC")),
+        ("third", _sequence()),
+    ]
+    parameters = [OptimizationParameter(organism="homo-sapiens", optimize_cai=True)]
+    results = list(optimize_many(sequences, parameters, random_seed=1, workers=2))
+    assert [name for name, _ in results] == ["first", "second", "partial", "third"]
+    assert [it.success for _, it in results] == [True, True, False, True]
+    assert results[0][1].result is not None
+    assert str(results[0][1].result.sequence) == "ACCACCATCAAG"
+    assert results[2][1].error is not None
+
+    # Each sequence is optimized as if it were alone
+    expected = optimize(sequences[3][1], parameters, random_seed=1)
+    assert results[3][1].result == expected.result
+
+    unordered = optimize_many(sequences, parameters, random_seed=1, ordered=False)
+    assert sorted(name for name, _ in unordered) == sorted(it for it, _ in sequences)
+
+
+def test_reoptimize():
+    sequence = _sequence()
+    parameters = [
+        msgspec.structs.replace(PARAMETERS[0], optimize_mfe=None, avoid_poly_a=4)
+    ]
+    previous = optimize(sequence, parameters, random_seed=1)
+    assert previous.result is not None
+    optimized = previous.result.sequence
+
+    # Nothing to change
+    result = reoptimize(optimized, parameters, previous_parameters=parameters)
+    assert result.success
+    assert result.mutable_regions == []
+    assert result.result is not None
+    assert result.result.sequence == optimized
+
+    # Only the breaches of a new constraint are changed
+    site = str(optimized)[120:126]
+    new_parameters = [msgspec.structs.replace(parameters[0], avoid_sequences=[site])]
+    result = reoptimize(optimized, new_parameters, parameters, margin=6, random_seed=1)
+    assert result.success
+    assert result.result is not None
+    assert site not in str(result.result.sequence)
+    assert result.result.sequence.amino_acid_sequence == sequence.amino_acid_sequence
+    assert result.mutable_regions
+    changed = [
+        i
+        for i, (a, b) in enumerate(zip(str(optimized), str(result.result.sequence)))
+        if a != b
+    ]
+    assert changed
+    assert all(
+        any(
+            it.start_coordinate is not None
+            and it.end_coordinate is not None
+            and it.start_coordinate - 1 <= i < it.end_coordinate
+            for it in result.mutable_regions
+        )
+        for i in changed
+    )
+
+    # An edited region is optimized again
+    edited = Sequence(str(optimized)[:30] + "GCA" + str(optimized)[33:])
+    result = reoptimize(
+        edited,
+        parameters,
+        edited=[Location(start_coordinate=31, end_coordinate=33)],
+        margin=0,
+        random_seed=1,
+    )
+    assert result.mutable_regions == [Location(start_coordinate=31, end_coordinate=33)]
+    assert result.result is not None
+    assert str(result.result.sequence)[33:] == str(optimized)[33:]
+
+
+def test_optimize_windowed_mfe():
+    sequence = _sequence()
+    parameters = [
+        msgspec.structs.replace(
+            PARAMETERS[0],
+            optimize_cai=False,
+            optimize_mfe=None,
+            optimize_windowed_mfe=0.0,
+            windowed_mfe_max_bp_span=20,
+        )
+    ]
+    result = optimize(sequence, parameters, random_seed=1)
+    assert result.success
+    assert result.result is not None
+    assert result.result.objectives is not None
+    assert "TargetWindowedMFE" in result.result.objectives
+    assert (
+        result.result.sequence.windowed_minimum_free_energy().mean_energy
+        > sequence.windowed_minimum_free_energy().mean_energy
+    )
+
+
+def test_optimize_codon_engine():
+    sequence = _sequence()
+    parameters = [
+        msgspec.structs.replace(
+            PARAMETERS[0], optimize_mfe=None, avoid_poly_a=4, avoid_poly_g=4
+        )
+    ]
+    result = optimize(sequence, parameters, random_seed=1, engine="codon")
+    assert result.success
+    assert result.unsupported is None
+    assert result.result is not None
+    assert result.result.sequence.amino_acid_sequence == sequence.amino_acid_sequence
+    assert result.result.constraints is not None
+    assert "FAIL" not in result.result.constraints
+
+    # Unsupported parameters are left to DnaChisel
+    result = optimize(sequence, PARAMETERS, random_seed=1, engine="codon")
+    assert result.success
+    assert result.unsupported == ["TargetPseudoMFE"]
+
+
+def test_optimize_beam_engine():
+    sequence = _sequence()
+    parameters = [
+        msgspec.structs.replace(
+            PARAMETERS[0], optimize_mfe=None, avoid_poly_a=4, avoid_poly_g=4
+        )
+    ]
+    result = optimize(sequence, parameters, engine="beam", beam_width=16)
+    assert result.success
+    assert result.unsupported is None
+    assert result.result is not None
+    assert result.result.sequence.amino_acid_sequence == sequence.amino_acid_sequence
+    assert result.result.constraints is not None
+    assert "FAIL" not in result.result.constraints
+
+    # The search is deterministic
+    again = optimize(sequence, parameters, engine="beam", beam_width=16)
+    assert again.result is not None
+    assert again.result.sequence == result.result.sequence
+
+    with pytest.raises(ValueError):
+        optimize(sequence, parameters, engine="beam", beam_width=0)
+
+
+def test_optimization_parameter_dnachisel():
+    parameter = OptimizationParameter(
+        start_coordinate=4,
+        end_coordinate=30,
+        organism="homo-sapiens",
+        optimize_cai=True,
+        avoid_micro_rna_seed_sites=True,
+    )
+    sequence = str(_sequence())
+    first, second = parameter.dnachisel(sequence), parameter.dnachisel(sequence)
+    assert [str(it) for it in first[0] + first[1]] == [
+        str(it) for it in second[0] + second[1]
+    ]
+    # Each call creates new specifications, from the same (cached) templates
+    assert not {id(it) for it in first[0]} & {id(it) for it in second[0]}
+
+    # Templates are shared by parameters which only differ by location
+    other = msgspec.structs.replace(parameter, start_coordinate=31, end_coordinate=60)
+    constraints, _ = other.dnachisel(sequence)
+    assert isinstance(constraints[-1], AvoidPatterns)
+    assert constraints[-1].automaton is first[0][-1].automaton
+    assert constraints[-1].location.start == 30
@@ -1,6 +1,12 @@
+import concurrent.futures
+import multiprocessing
+import random
+
 import pytest
 
-from mrnarchitect.sequence import Sequence
+from mrnarchitect import sequence as sequence_module
+from mrnarchitect.cache import SQLiteCache
+from mrnarchitect.sequence import METRIC_CACHE, FoldingStore, Sequence
 
 TEST_DATA = {
     "ENSG00000176893": (
@@ -75,3 +81,66 @@ def test_pseudo_minimum_free_energy(name):
 def test_windowed_minimum_free_energy(name):
     sequence = TEST_DATA[name][0]
     assert Sequence.create(sequence).windowed_minimum_free_energy().mean_energy < 0
+
+
+def test_windowed_minimum_free_energy_modes():
+    sequence = Sequence.create(TEST_DATA["ENSG00000198475"][0])
+    window = sequence.windowed_minimum_free_energy()
+    assert sequence.windowed_minimum_free_energy(mode="parallel") == window
+    # The pool is reused by later calls
+    pool = sequence_module._FOLDING_POOL
+    assert pool is not None
+    assert sequence.windowed_minimum_free_energy(mode="parallel") == window
+    assert sequence_module._FOLDING_POOL is pool
+
+    # In a worker process, the windows are folded in the worker
+    with concurrent.futures.ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("forkserver")
+    ) as executor:
+        future = executor.submit(sequence.windowed_minimum_free_energy, mode="parallel")
+        assert future.result() == window
+
+
+def _naive_pseudo_minimum_free_energy(sequence: str) -> float:
+    energies = {"GC": 3.12, "CG": 3.12, "AT": 1, "TA": 1, "GT": 1, "TG": 1}
+    energy = 0
+    for s in [sequence, sequence[::-1]]:
+        b = 2
+        while b < len(s) / 2 and len(s) >= 3 + 2 * b:
+            b += 1
+            energy += sum(
+                energies.get(n1 + n2, 0) for n1, n2 in zip(s[0:b], s[3 + b : 3 + 2 * b])
+            )
+    return -energy / len(sequence)
+
+
+@pytest.mark.parametrize("length", [1, 6, 7, 8, 9, 10, 11, 50, 51, 500])
+def test_pseudo_minimum_free_energy_naive(length):
+    rng = random.Random(length)
+    for _ in range(5):
+        sequence = "".join(rng.choice("ACGT") for _ in range(length))
+        assert Sequence(sequence).pseudo_minimum_free_energy == pytest.approx(
+            _naive_pseudo_minimum_free_energy(sequence), rel=1e-12
+        )
+
+
+@pytest.mark.parametrize("mode", ["window", "parallel"])
+def test_folding_store(monkeypatch, tmp_path, mode):
+    import mrnarchitect.sequence
+
+    sequence = Sequence("GGGGAAACCCCATATGGGGAAACCCCATATGGGGAAACCCC")
+    METRIC_CACHE.clear()
+    expected = sequence.windowed_minimum_free_energy(14, 7, mode=mode)
+
+    # A store shared by (simulated) processes with cold in-memory caches
+    for _ in range(2):
+        cache = SQLiteCache(tmp_path / "folding.db")
+        monkeypatch.setattr(mrnarchitect.sequence, "FOLDING_STORE", FoldingStore(cache))
+        METRIC_CACHE.clear()
+        assert sequence.windowed_minimum_free_energy(14, 7, mode=mode) == expected
+    assert cache.stats().misses == 0
+    assert cache.stats().hits == 4
+
+    METRIC_CACHE.clear()
+    assert sequence.minimum_free_energy == Sequence(str(sequence)).minimum_free_energy
+    assert cache.stats().misses == 1
@@ -1,6 +1,9 @@
+from collections import Counter
+
 import pytest
 
 from mrnarchitect.codon_table import codon_usage_bias
+from mrnarchitect.constants import ORDERED_CODONS
 from mrnarchitect.data import load_codon_usage_table
 from mrnarchitect.sequence import Sequence
 
@@ -144,3 +147,56 @@ def test_trna_adaptation_index(sequence_name, organism, trna_adaptation_index_re
     assert sequence.trna_adaptation_index(organism) == pytest.approx(
         trna_adaptation_index_result, rel=1e-2
     )
+
+
+@pytest.mark.parametrize("sequence_name", TEST_SEQUENCES.keys())
+def test_composition(sequence_name):
+    raw_sequence = TEST_SEQUENCES[sequence_name]
+    sequence = Sequence.create(raw_sequence)
+    assert sequence.a_ratio == raw_sequence.count("A") / len(raw_sequence)
+    assert sequence.c_ratio == raw_sequence.count("C") / len(raw_sequence)
+    assert sequence.g_ratio == raw_sequence.count("G") / len(raw_sequence)
+    assert sequence.t_ratio == raw_sequence.count("T") / len(raw_sequence)
+    assert sequence.cpg_ratio == sum(
+        raw_sequence[i : i + 2] == "CG" for i in range(len(raw_sequence))
+    ) / len(raw_sequence)
+    assert sequence.slippery_site_ratio == sum(
+        raw_sequence[i : i + 3] == "TTT" for i in range(len(raw_sequence))
+    ) / len(raw_sequence)
+
+
+@pytest.mark.parametrize("sequence_name", TEST_SEQUENCES.keys())
+def test_codon_counts(sequence_name):
+    sequence = Sequence.create(TEST_SEQUENCES[sequence_name])
+    codons = list(sequence.codons)
+    assert [ORDERED_CODONS[it] for it in sequence.codon_indices] == codons
+    assert {
+        codon: int(count)
+        for codon, count in zip(ORDERED_CODONS, sequence.codon_counts)
+        if count
+    } == Counter(codons)
+    assert sequence.uridine_depletion == sum(it[2] == "T" for it in codons) / len(
+        codons
+    )
+
+
+@pytest.mark.parametrize("sequence_name", TEST_SEQUENCES.keys())
+@pytest.mark.parametrize("window_size", [1, 40, 100])
+def test_gc_profile(sequence_name, window_size):
+    raw_sequence = TEST_SEQUENCES[sequence_name]
+    sequence = Sequence.create(raw_sequence)
+    windows = [
+        raw_sequence[i : i + window_size]
+        for i in range(len(raw_sequence) - window_size + 1)
+    ]
+    assert list(sequence.gc_profile(window_size)) == [
+        it.count("C") / window_size + it.count("G") / window_size for it in windows
+    ]
+
+    gc_ratio_window = sequence.gc_ratio_window(window_size)
+    gc_ratios = [Sequence.create(it).gc_ratio for it in windows[:-1]]
+    assert gc_ratio_window.min_gc_ratio == min(gc_ratios)
+    assert gc_ratio_window.min_gc_start == gc_ratios.index(min(gc_ratios))
+    assert gc_ratio_window.max_gc_ratio == max(gc_ratios)
+    assert gc_ratio_window.max_gc_start == gc_ratios.index(max(gc_ratios))
+    assert sequence.gc_ratio_windows([window_size, 20])[0] == gc_ratio_window
@@ -1,3 +1,4 @@
+import time
 from unittest.mock import ANY
 
 from litestar.testing import TestClient
@@ -35,6 +36,8 @@ def test_optimize():
             "success": True,
             "error": None,
             "time_in_seconds": ANY,
+            "iterations": ANY,
+            "stop_reason": "completed",
             "result": {
                 "sequence": {
                     "nucleic_acid_sequence": "ATGATCCTG",
@@ -45,6 +48,45 @@ def test_optimize():
         }
 
 
+def test_jobs_optimize():
+    with TestClient(app=app) as client:
+        response = client.post(
+            "/api/jobs/optimize",
+            json={"sequence": "MIL", "parameters": [{"optimize_cai": True}]},
+        )
+        assert response.status_code == 201
+        job = response.json()
+        assert (job["status"], job["progress"]) == ("queued", 0.0)
+
+        for _ in range(600):
+            job = client.get(f"/api/jobs/{job['id']}").json()
+            if job["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.1)
+        assert job["status"] == "completed"
+        assert job["result"]["result"]["sequence"] == {
+            "nucleic_acid_sequence": "ATGATCCTG"
+        }
+
+        assert client.get("/api/jobs/not-a-job").status_code == 404
+
+
+def test_optimization_cache():
+    with TestClient(app=app) as client:
+        request = {"sequence": "MIL", "parameters": [{"optimize_cai": True}]}
+        before = client.get("/api/optimization-cache").json()
+        first = client.post("/api/optimize", json={**request, "random_seed": 7})
+        second = client.post("/api/optimize", json={**request, "random_seed": 7})
+        assert first.json() == second.json()
+        # Unseeded optimizations are not cached
+        client.post("/api/optimize", json=request)
+        client.post("/api/optimize", json=request)
+        after = client.get("/api/optimization-cache").json()
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"] + 1
+        assert after["entries"] >= 1
+
+
 def test_analyze():
     with TestClient(app=app) as client:
         response = client.post(
@@ -112,3 +154,21 @@ def test_search_organisms():
                 }
             ]
         }
+
+
+def test_executor():
+    with TestClient(app=app) as client:
+        response = client.get("/api/executor")
+        assert response.status_code == 200
+        assert response.json() == {
+            "in_process": False,
+            "max_workers": ANY,
+            "max_pending": ANY,
+            "running": 0,
+            "queued": 0,
+            "utilization": 0.0,
+            "completed": ANY,
+            "failed": ANY,
+            "rejected": ANY,
+            "timed_out": ANY,
+        }
@@ -0,0 +1,74 @@
+import pytest
+
+from mrnarchitect.cache import CacheStats, LRUCache, SQLiteCache
+from mrnarchitect.sequence import METRIC_CACHE, Sequence
+
+
+@pytest.fixture
+def metric_cache():
+    stats = METRIC_CACHE.stats()
+    METRIC_CACHE.clear()
+    yield METRIC_CACHE
+    METRIC_CACHE.configure(max_entries=stats.max_entries, max_bytes=stats.max_bytes)
+    METRIC_CACHE.enable(*stats.metrics.keys())
+    METRIC_CACHE.disable(*stats.disabled)
+    METRIC_CACHE.clear()
+
+
+def test_lru_cache_max_bytes():
+    cache = LRUCache(max_bytes=200)
+    cache.put("a", "A" * 50)
+    cache.put("b", "B" * 50)
+    assert "a" not in cache
+    assert "b" in cache
+    assert cache.bytes <= 200
+    assert cache.stats().evictions == 1
+
+
+def test_metric_cache_hits_and_misses(metric_cache):
+    sequence = Sequence("ACGTACGTAA")
+    assert sequence.minimum_free_energy == Sequence("ACGTACGTAA").minimum_free_energy
+    stats = metric_cache.stats()
+    assert stats.metrics["minimum_free_energy"].misses == 1
+    assert stats.metrics["minimum_free_energy"].hits == 1
+    assert stats.entries == 1
+
+
+def test_metric_cache_disable(metric_cache):
+    metric_cache.disable("gc_ratio_window")
+    sequence = Sequence("ACGTACGTAA")
+    assert sequence.gc_ratio_window(4) == sequence.gc_ratio_window(4)
+    stats = metric_cache.stats()
+    assert stats.metrics["gc_ratio_window"].hits == 0
+    assert stats.metrics["gc_ratio_window"].misses == 0
+    assert stats.disabled == ["gc_ratio_window"]
+
+    with pytest.raises(ValueError):
+        metric_cache.disable("not_a_metric")
+    with pytest.raises(ValueError):
+        metric_cache.enable("not_a_metric")
+
+
+def test_metric_cache_eviction(metric_cache):
+    metric_cache.configure(max_entries=2)
+    for sequence in ["AAAA", "CCCC", "GGGG"]:
+        Sequence(sequence).encoded
+    stats = metric_cache.stats()
+    assert stats.entries == 2
+    assert stats.metrics["encoded"].evictions == 1
+
+
+def test_sqlite_cache(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", max_bytes=100)
+    cache.put("a", b"A" * 50)
+    cache.put("b", b"B" * 50)
+    assert cache.get("a") == b"A" * 50
+    assert cache.put("c", b"C" * 50) == ["b"]
+    assert cache.put("d", b"D" * 101) == []
+    assert (len(cache), cache.bytes) == (2, 100)
+
+    # Entries are shared with other instances using the same database
+    other = SQLiteCache(tmp_path / "cache.db")
+    assert other.get("a") == b"A" * 50
+    assert "b" not in other
+    assert cache.stats() == CacheStats(hits=1, misses=0, evictions=1)
@@ -1,5 +1,8 @@
+import json
+
 import pytest
 
+from mrnarchitect.cache import SQLiteCache
 from mrnarchitect.cli import cli
 
 
@@ -7,7 +10,11 @@ from mrnarchitect.cli import cli
     ["args", "output"],
     (
         [["-h"], "A toolkit to optimize mRNA sequences."],
-        [["optimize", "ACGACG"], "ACCACC"],
+        [["optimize", "ACGACG", "--no-cache"], "ACCACC"],
+        [["optimize", "ACGACG", "--no-cache", "--profile"], "mutations_proposed"],
+        [["optimize", "ACGACG", "--no-cache", "--engine", "codon"], "ACCACC"],
+        [["optimize", "ACGACG", "--no-cache", "--engine", "beam"], "ACCACC"],
+        [["reoptimize", "ACCACC", "--edited", "1-3"], "mutable_regions"],
         [["analyze", "ACGACG"], "codon_adaptation_index"],
     ),
 )
@@ -18,3 +25,78 @@ def test_cli(capsys, args, output):
         pass
     cli_output = capsys.readouterr().out
     assert output in cli_output
+
+
+def test_cli_optimize_cache(capsys, tmp_path):
+    args = [
+        "optimize",
+        "ACGACG",
+        "--random-seed",
+        "1",
+        "--cache-db",
+        str(tmp_path / "cache.db"),
+    ]
+    cli(args)
+    first = capsys.readouterr().out
+    cli(args)
+    assert capsys.readouterr().out == first
+    assert len(SQLiteCache(tmp_path / "cache.db")) == 1
+
+    # Unseeded optimizations are not cached
+    cli(args[:2] + args[4:])
+    assert len(SQLiteCache(tmp_path / "cache.db")) == 1
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "csv"])
+def test_cli_optimize_batch(capsys, tmp_path, output_format):
+    fasta = tmp_path / "sequences.fasta"
+    fasta.write_text(">first\nACGACG\n>invalid\nACGXCG\n>second\nACGACC\nATTAAA\n")
+    cli(
+        [
+            "optimize-batch",
+            str(fasta),
+            "--sequence-type",
+            "nucleic-acid",
+            "--random-seed",
+            "1",
+            "--workers",
+            "1",
+            "--format",
+            output_format,
+        ]
+    )
+    output = capsys.readouterr()
+    assert "Skipping invalid" in output.err
+    lines = output.out.splitlines()
+    if output_format == "csv":
+        assert lines[0].startswith("name,success,sequence")
+        assert lines[1].startswith("first,True,ACCACC,")
+        assert lines[2].startswith("second,True,ACCACCATCAAG,")
+    else:
+        records = [json.loads(it) for it in lines]
+        assert [it["name"] for it in records] == ["first", "second"]
+        sequence = records[1]["result"]["result"]["sequence"]
+        assert sequence["nucleic_acid_sequence"] == "ACCACCATCAAG"
+
+
+def test_cli_sweep(capsys, tmp_path):
+    cli(
+        [
+            "sweep",
+            "ACGACGATTAAA",
+            "--grid",
+            '{"avoid_repeat_length": [8, 10]}',
+            "--random-seed",
+            "1",
+            "--workers",
+            "1",
+            "--cache-db",
+            str(tmp_path / "cache.db"),
+            "--format",
+            "csv",
+        ]
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("avoid_repeat_length,success,cached,pareto")
+    assert lines[1].startswith("8,True,False,")
+    assert lines[2].startswith("10,True,False,")
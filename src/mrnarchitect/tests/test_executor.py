@@ -0,0 +1,64 @@
+import asyncio
+import concurrent.futures
+import time
+
+import pytest
+
+from mrnarchitect.app.executor import (
+    ExecutorSaturatedError,
+    ExecutorTimeoutError,
+    ProcessExecutor,
+)
+
+
+@pytest.fixture(params=[1, 0], ids=["process", "thread"])
+def executor(request):
+    executor = ProcessExecutor(max_workers=request.param, max_pending=1, timeout=10)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def test_executor_saturated(executor):
+    async def _run():
+        tasks = [asyncio.create_task(executor.run(time.sleep, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        stats = executor.stats()
+        assert (stats.running, stats.queued, stats.utilization) == (1, 1, 1.0)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(time.sleep, 0.5)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(_run())
+    stats = executor.stats()
+    assert (stats.completed, stats.rejected, stats.running, stats.queued) == (
+        2,
+        1,
+        0,
+        0,
+    )
+
+
+def test_executor_timeout(executor):
+    async def _run():
+        with pytest.raises(ExecutorTimeoutError):
+            await executor.run(time.sleep, 0.5, timeout=0.1)
+        assert await executor.run(divmod, 7, 2) == (3, 1)
+
+    asyncio.run(_run())
+    assert executor.stats().timed_out == 1
+
+
+def test_executor_fallback(monkeypatch):
+    def _unavailable(*args, **kwargs):
+        raise OSError("Function not implemented")
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", _unavailable)
+    executor = ProcessExecutor(max_workers=2, timeout=10)
+    executor.start()
+    try:
+        assert asyncio.run(executor.run(divmod, 7, 2)) == (3, 1)
+        stats = executor.stats()
+        assert (stats.in_process, stats.max_workers, stats.completed) == (True, 1, 1)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,116 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from mrnarchitect.app.executor import ProcessExecutor
+from mrnarchitect.app.jobs import JobRequest, JobRunner, JobStore
+from mrnarchitect.cache import LRUCache
+from mrnarchitect.optimize import (
+    EarlyStopping,
+    OptimizationCache,
+    OptimizationParameter,
+)
+
+PARAMETERS = [OptimizationParameter(organism="homo-sapiens", optimize_cai=True)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs.db", ttl=60)
+
+
+def test_job_store_lifecycle(store):
+    job = store.create("MIL", PARAMETERS)
+    assert store.get(job.id) == job
+    assert store.request(job.id) == JobRequest(sequence="MIL", parameters=PARAMETERS)
+
+    assert store.claim(10) == [job.id]
+    assert store.claim(10) == []
+    store.set_progress(job.id, 0.5)
+    assert store.get(job.id).status == "running"
+    assert store.get(job.id).progress == 0.5
+
+    store.fail(job.id, "Oops")
+    failed = store.get(job.id)
+    assert (failed.status, failed.progress, failed.error) == ("failed", 1.0, "Oops")
+    assert failed.expires_at == pytest.approx(failed.updated_at + 60)
+    assert store.get("not-a-job") is None
+
+
+@pytest.mark.parametrize("early_stopping", [EarlyStopping(patience=50), None])
+def test_job_store_request(store, early_stopping):
+    job = store.create("MIL", PARAMETERS, 1, 5.0, early_stopping, "beam", 8)
+    assert store.request(job.id) == JobRequest(
+        sequence="MIL",
+        parameters=PARAMETERS,
+        random_seed=1,
+        time_budget_seconds=5.0,
+        early_stopping=early_stopping,
+        engine="beam",
+        beam_width=8,
+    )
+
+
+def test_job_store_recover(store):
+    running, queued = store.create("MIL", PARAMETERS), store.create("MIL", PARAMETERS)
+    assert store.claim(1) == [running.id]
+
+    # A new store on the same file sees the jobs of the previous one
+    store = JobStore(store.path, ttl=60)
+    assert store.recover() == 1
+    assert store.claim(10) == [running.id, queued.id]
+
+
+def test_job_store_compact(store):
+    job = store.create("MIL", PARAMETERS)
+    store.claim(1)
+    store.ttl = 0
+    store.fail(job.id, "Oops")
+    assert store.get(job.id) is None
+    assert store.compact() == 1
+    assert store.compact() == 0
+
+
+def test_job_runner(store, monkeypatch):
+    executor = ProcessExecutor(max_workers=1, timeout=60)
+    executor.start()
+    cache = OptimizationCache(LRUCache())
+    runner = JobRunner(store, executor, poll_interval=0.1, cache=cache)
+
+    # An error in the store does not stop the dispatcher
+    # (patched on the class, as the store is sent to the workers)
+    claim, errors = JobStore.claim, iter([sqlite3.OperationalError("locked")])
+
+    def _claim(self, limit):
+        if error := next(errors, None):
+            raise error
+        return claim(self, limit)
+
+    monkeypatch.setattr(JobStore, "claim", _claim)
+
+    async def _run():
+        await runner.start()
+        jobs = []
+        for random_seed in (None, 1, 1):
+            job = await runner.submit("MIL", PARAMETERS, random_seed)
+            while store.get(job.id).status in ("queued", "running"):
+                await asyncio.sleep(0.1)
+            jobs.append(store.get(job.id))
+        await runner.stop()
+        return jobs
+
+    try:
+        start = time.monotonic()
+        jobs = asyncio.run(_run())
+    finally:
+        executor.shutdown()
+    assert time.monotonic() - start < 60
+    for job in jobs:
+        assert job.status == "completed"
+        assert job.progress == 1.0
+        assert str(job.result.result.sequence) == "ATGATCCTG"
+    # Only the seeded job is cached, and its rerun completed from the cache
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses) == (1, 1, 1)
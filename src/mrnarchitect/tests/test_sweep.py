@@ -0,0 +1,52 @@
+from mrnarchitect.cache import LRUCache
+from mrnarchitect.optimize import OptimizationCache, OptimizationParameter
+from mrnarchitect.sequence import Sequence
+from mrnarchitect.sweep import sweep
+
+PARAMETERS = [
+    OptimizationParameter(
+        organism="homo-sapiens",
+        optimize_cai=True,
+        gc_content_global_min=0.4,
+        gc_content_global_max=0.7,
+    )
+]
+
+
+def test_sweep():
+    sequence = Sequence.create("MVSKGEELFTGVVPILVELDGDVNGHKFSV", "amino-acid")
+    grid = {"gc_content_global_min": [0.4, 0.8], "gc_content_global_max": [0.6, 0.7]}
+    cache = OptimizationCache(LRUCache())
+    result = sweep(sequence, grid, PARAMETERS, random_seed=1, workers=2, cache=cache)
+    assert [it.values for it in result.points] == [
+        {"gc_content_global_min": 0.4, "gc_content_global_max": 0.6},
+        {"gc_content_global_min": 0.4, "gc_content_global_max": 0.7},
+        {"gc_content_global_min": 0.8, "gc_content_global_max": 0.6},
+        {"gc_content_global_min": 0.8, "gc_content_global_max": 0.7},
+    ]
+    # A minimum above the maximum is not a valid parameter
+    assert [it.success for it in result.points] == [True, True, False, False]
+    assert result.points[2].error is not None
+    assert result.pareto_front and set(result.pareto_front) <= {0, 1}
+    for point in result.points[:2]:
+        assert point.sequence is not None
+        assert point.sequence.amino_acid_sequence == sequence.amino_acid_sequence
+        assert point.gc_deviation == abs(point.sequence.gc_ratio - 0.55)
+        assert not point.cached
+
+    # The optimized points are reused from the cache
+    again = sweep(sequence, grid, PARAMETERS, random_seed=1, workers=2, cache=cache)
+    assert [it.cached for it in again.points] == [True, True, False, False]
+    assert [it.sequence for it in again.points] == [it.sequence for it in result.points]
+
+    sample = sweep(sequence, grid, PARAMETERS, samples=2, random_seed=1, workers=1)
+    assert len(sample.points) == 2
+
+
+def test_sweep_invalid_type():
+    sequence = Sequence.create("MVSKGEELFTGVVPILVELDGDVNGHKFSV", "amino-acid")
+    grid = {"avoid_repeat_length": ["8", 8]}
+    result = sweep(sequence, grid, PARAMETERS, random_seed=1, workers=1)
+    # A value of the wrong type fails its own point, not the whole sweep
+    assert [it.success for it in result.points] == [False, True]
+    assert "Expected `int | null`, got `str`" in (result.points[0].error or "")
@@ -0,0 +1,79 @@
+"""Benchmark the NumPy-backed composition metrics of `Sequence`.
+
+Compares the vectorized metrics against the original pure-python
+implementations for sequences from 1 kb to 100 kb, and checks that both
+produce the same results.
+
+    uv run python tools/scripts/benchmark_composition.py
+"""
+
+import random
+import timeit
+
+from mrnarchitect.sequence import METRIC_CACHE, Sequence
+
+LENGTHS = [1_000, 10_000, 20_000, 100_000]
+REPEATS = 5
+
+
+def _legacy_composition(sequence: str) -> dict[str, float]:
+    return {
+        "a": len([it for it in sequence if it == "A"]) / len(sequence),
+        "c": len([it for it in sequence if it == "C"]) / len(sequence),
+        "g": len([it for it in sequence if it == "G"]) / len(sequence),
+        "t": len([it for it in sequence if it == "T"]) / len(sequence),
+        "cpg": sum(
+            1
+            for i in range(len(sequence) - 1)
+            if sequence[i] == "C" and sequence[i + 1] == "G"
+        )
+        / len(sequence),
+        "slippery": sum(
+            1
+            for i in range(len(sequence) - 2)
+            if sequence[i] == "T" and sequence[i + 1] == "T" and sequence[i + 2] == "T"
+        )
+        / len(sequence),
+    }
+
+
+def _composition(sequence: str) -> dict[str, float]:
+    s = Sequence(sequence)
+    return {
+        "a": s.a_ratio,
+        "c": s.c_ratio,
+        "g": s.g_ratio,
+        "t": s.t_ratio,
+        "cpg": s.cpg_ratio,
+        "slippery": s.slippery_site_ratio,
+    }
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'length':>8} {'legacy (ms)':>12} {'numpy (ms)':>12} {'speedup':>8}")
+    for length in LENGTHS:
+        sequence = "".join(rng.choice("ACGT") for _ in range(length))
+
+        METRIC_CACHE.clear()
+        assert _legacy_composition(sequence) == _composition(sequence)
+
+        legacy = min(
+            timeit.repeat(
+                lambda: _legacy_composition(sequence), number=1, repeat=REPEATS
+            )
+        )
+
+        def _run():
+            METRIC_CACHE.clear()
+            _composition(sequence)
+
+        vectorized = min(timeit.repeat(_run, number=1, repeat=REPEATS))
+        print(
+            f"{length:>8} {legacy * 1e3:>12.3f} {vectorized * 1e3:>12.3f}"
+            f" {legacy / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark early stopping of the objective optimization.
+
+Optimizes each of the reference sequences for CAI and tAI (an objective over the
+whole sequence, so optimized by a random search) under several `EarlyStopping`
+policies, and reports the time, number of iterations and total objective score of
+each run against running every iteration.
+
+    uv run python tools/scripts/benchmark_early_stopping.py
+"""
+
+import re
+
+import msgspec
+
+from mrnarchitect.constants.sequences import SEQUENCES
+from mrnarchitect.optimize import (
+    DEFAULT_EARLY_STOPPING,
+    DEFAULT_OPTIMIZATION_PARAMETER,
+    EarlyStopping,
+    OptimizationResult,
+    optimize,
+)
+from mrnarchitect.sequence import Sequence
+
+PARAMETERS = [msgspec.structs.replace(DEFAULT_OPTIMIZATION_PARAMETER, optimize_tai=1.0)]
+POLICIES = {
+    "none": None,
+    "patience=1000": EarlyStopping(patience=1_000),
+    "delta=0.1/1000": EarlyStopping(patience=1_000, min_delta=0.1),
+    "default": DEFAULT_EARLY_STOPPING,
+}
+RANDOM_SEED = 1
+
+
+def _score(result: OptimizationResult) -> float:
+    assert result.result is not None and result.result.objectives is not None
+    match = re.search(r"TOTAL OBJECTIVES SCORE:\s+(\S+)", result.result.objectives)
+    assert match is not None
+    return float(match.group(1))
+
+
+def main():
+    print(
+        f"{'sequence':>16} {'policy':>14} {'time (s)':>9} {'iterations':>10}"
+        f" {'score':>9} {'saved':>7} {'score diff':>10}"
+    )
+    for name, amino_acid_sequence in SEQUENCES.items():
+        sequence = Sequence.create(amino_acid_sequence, "amino-acid")
+        baseline = None
+        for policy, early_stopping in POLICIES.items():
+            result = optimize(
+                sequence,
+                PARAMETERS,
+                random_seed=RANDOM_SEED,
+                early_stopping=early_stopping,
+            )
+            assert result.success, result.error
+            score = _score(result)
+            if baseline is None:
+                baseline = (result.time_in_seconds, score)
+            print(
+                f"{name:>16} {policy:>14} {result.time_in_seconds:>9.2f}"
+                f" {result.iterations:>10} {score:>9.2f}"
+                f" {1 - result.time_in_seconds / baseline[0]:>7.0%}"
+                f" {score - baseline[1]:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the codon and beam engines against DnaChisel.
+
+Optimizes each of the reference sequences with each engine, under the default
+parameters (whose hairpin and repeat constraints the codon engines leave to
+DnaChisel) and under parameters the codon engines fully support, and reports the
+time and total objective score of each run.
+
+    uv run python tools/scripts/benchmark_engines.py
+"""
+
+import re
+
+import msgspec
+
+from mrnarchitect.constants.sequences import SEQUENCES
+from mrnarchitect.optimize import (
+    DEFAULT_OPTIMIZATION_PARAMETER,
+    Engine,
+    OptimizationResult,
+    optimize,
+)
+from mrnarchitect.sequence import Sequence
+
+PARAMETERS = {
+    "default": [DEFAULT_OPTIMIZATION_PARAMETER],
+    "supported": [
+        msgspec.structs.replace(
+            DEFAULT_OPTIMIZATION_PARAMETER,
+            avoid_repeat_length=None,
+            hairpin_stem_size=None,
+            avoid_micro_rna_seed_sites=True,
+            avoid_manufacture_restriction_sites=True,
+        )
+    ],
+}
+ENGINES: list[Engine] = ["dnachisel", "codon", "beam"]
+RANDOM_SEED = 1
+
+
+def _score(result: OptimizationResult) -> float:
+    assert result.result is not None and result.result.objectives is not None
+    match = re.search(r"TOTAL OBJECTIVES SCORE:\s+(\S+)", result.result.objectives)
+    assert match is not None
+    return float(match.group(1))
+
+
+def main():
+    print(
+        f"{'sequence':>16} {'parameters':>10} {'engine':>9} {'time (s)':>9}"
+        f" {'score':>9} {'speedup':>7}"
+    )
+    for name, amino_acid_sequence in SEQUENCES.items():
+        sequence = Sequence.create(amino_acid_sequence, "amino-acid")
+        for parameters_name, parameters in PARAMETERS.items():
+            baseline = None
+            for engine in ENGINES:
+                result = optimize(
+                    sequence, parameters, random_seed=RANDOM_SEED, engine=engine
+                )
+                assert result.success, result.error
+                if baseline is None:
+                    baseline = result.time_in_seconds
+                print(
+                    f"{name:>16} {parameters_name:>10} {engine:>9}"
+                    f" {result.time_in_seconds:>9.2f} {_score(result):>9.2f}"
+                    f" {baseline / result.time_in_seconds:>6.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark the prefix-sum windowed GC ratio of `Sequence`.
+
+Compares `Sequence.gc_ratio_window` against the original slice-per-window
+implementation for sequences from 1 kb to 100 kb, and checks that both
+produce the same results.
+
+    uv run python tools/scripts/benchmark_gc_window.py
+"""
+
+import random
+import timeit
+
+from mrnarchitect.sequence import METRIC_CACHE, GCWindowStats, Sequence
+
+LENGTHS = [1_000, 10_000, 20_000, 100_000]
+WINDOW_SIZE = 40
+REPEATS = 3
+
+
+def _legacy_gc_ratio_window(sequence: Sequence, window_size: int) -> GCWindowStats:
+    gcs = [
+        {"start": i, "gc_ratio": sequence[i : i + window_size].gc_ratio}
+        for i in range(0, max(len(sequence) - window_size, 1))
+    ]
+    min_gc = min(gcs, key=lambda s: s["gc_ratio"])
+    max_gc = max(gcs, key=lambda s: s["gc_ratio"])
+    return GCWindowStats(
+        window_size=window_size,
+        min_gc_ratio=min_gc["gc_ratio"],
+        min_gc_start=min_gc["start"],
+        max_gc_ratio=max_gc["gc_ratio"],
+        max_gc_start=max_gc["start"],
+    )
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'length':>8} {'legacy (ms)':>12} {'prefix (ms)':>12} {'speedup':>8}")
+    for length in LENGTHS:
+        sequence = Sequence("".join(rng.choice("ACGT") for _ in range(length)))
+
+        METRIC_CACHE.clear()
+        assert _legacy_gc_ratio_window(
+            sequence, WINDOW_SIZE
+        ) == sequence.gc_ratio_window(WINDOW_SIZE)
+
+        def _run_legacy():
+            METRIC_CACHE.clear()
+            _legacy_gc_ratio_window(sequence, WINDOW_SIZE)
+
+        def _run():
+            METRIC_CACHE.clear()
+            sequence.gc_ratio_window(WINDOW_SIZE)
+
+        legacy = min(timeit.repeat(_run_legacy, number=1, repeat=REPEATS))
+        prefix = min(timeit.repeat(_run, number=1, repeat=REPEATS))
+        print(
+            f"{length:>8} {legacy * 1e3:>12.3f} {prefix * 1e3:>12.3f}"
+            f" {legacy / prefix:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark the pseudo-MFE of `Sequence`.
+
+Compares `Sequence.pseudo_minimum_free_energy` against the original
+block-by-block implementation for increasing sequence lengths, and checks
+that both produce the same results.
+
+    uv run python tools/scripts/benchmark_pseudo_mfe.py
+"""
+
+import math
+import random
+import timeit
+
+from mrnarchitect.sequence import METRIC_CACHE, Sequence
+
+LENGTHS = [500, 1_000, 2_000, 4_000, 8_000]
+REPEATS = 3
+
+
+def _legacy_pseudo_minimum_free_energy(sequence: str) -> float:
+    def _get_energy(seq1: str, seq2: str) -> float:
+        bond_energy = 0
+        for i in range(min(len(seq1), len(seq2))):
+            n1, n2 = seq1[i], seq2[i]
+            match (n1, n2):
+                case ("G", "C") | ("C", "G"):
+                    e = 3.12
+                case ("A", "T") | ("T", "A"):
+                    e = 1
+                case ("G", "T") | ("T", "G"):
+                    e = 1
+                case _:
+                    e = 0
+            bond_energy += e
+        return bond_energy
+
+    sequence_size = len(sequence)
+    c_energy = 0
+    for s in [sequence, sequence[::-1]]:
+        b = 2
+        while b < sequence_size / 2 and sequence_size >= (3 + 2 * b):
+            b += 1
+            c_energy += _get_energy(s[0:b], s[3 + b : 3 + 2 * b])
+    return -c_energy / sequence_size
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'length':>8} {'legacy (ms)':>12} {'prefix (ms)':>12} {'speedup':>8}")
+    for length in LENGTHS:
+        sequence = "".join(rng.choice("ACGT") for _ in range(length))
+
+        METRIC_CACHE.clear()
+        assert math.isclose(
+            _legacy_pseudo_minimum_free_energy(sequence),
+            Sequence(sequence).pseudo_minimum_free_energy,
+            rel_tol=1e-12,
+        )
+
+        legacy = min(
+            timeit.repeat(
+                lambda: _legacy_pseudo_minimum_free_energy(sequence),
+                number=1,
+                repeat=REPEATS,
+            )
+        )
+
+        def _run():
+            METRIC_CACHE.clear()
+            Sequence(sequence).pseudo_minimum_free_energy
+
+        prefix = min(timeit.repeat(_run, number=1, repeat=REPEATS))
+        print(
+            f"{length:>8} {legacy * 1e3:>12.3f} {prefix * 1e3:>12.3f}"
+            f" {legacy / prefix:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
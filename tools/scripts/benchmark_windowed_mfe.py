@@ -0,0 +1,35 @@
+"""Benchmark the modes of `Sequence.windowed_minimum_free_energy`.
+
+Compares the per-window folding ("window") and the process pool ("parallel")
+modes for sequences up to the size of a Cas9 construct.
+
+    uv run python tools/scripts/benchmark_windowed_mfe.py
+"""
+
+import random
+import time
+
+from mrnarchitect.sequence import METRIC_CACHE, Sequence
+
+LENGTHS = [1_000, 2_000, 4_200]
+MODES = ["window", "parallel"]
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'length':>8}" + "".join(f" {mode + ' (s)':>14}" for mode in MODES))
+    for length in LENGTHS:
+        sequence = Sequence("".join(rng.choice("ACGT") for _ in range(length)))
+
+        timings, results = {}, {}
+        for mode in MODES:
+            METRIC_CACHE.clear()
+            start = time.perf_counter()
+            results[mode] = sequence.windowed_minimum_free_energy(mode=mode)
+            timings[mode] = time.perf_counter() - start
+        assert results["parallel"] == results["window"]
+        print(f"{length:>8}" + "".join(f" {timings[mode]:>14.3f}" for mode in MODES))
+
+
+if __name__ == "__main__":
+    main()